@@ -1,144 +1,509 @@
-from flask import Flask, render_template, request, flash, redirect, url_for
-import pandas as pd
+import logging
+import os
 
-from utils.tabelas import (
-    gerar_tabela_areas_principais,
-    gerar_tabela_aferecao_indireta,
-    generate_financial_table,
-    gerar_tabela_inss_detalhado
-)
-from utils.calculos import calcular_inss
+from flask import (Flask, render_template, request, flash, redirect, url_for, jsonify, Response, stream_with_context, g,
+                   make_response, send_from_directory, abort)
+
+from utils import metricas
+from utils.metricas import medir, incrementar
+
+# Os módulos de cálculo (pandas, NumPy, dateutil etc.) são importados apenas pelas rotas que os usam,
+# de modo que o worker sobe e atende `GET /` sem carregá-los. Com INSS_PRECARREGAR=1 eles são
+# importados na inicialização (ex.: gunicorn --preload, para compartilhar a memória entre workers).
+PRECARREGAR = os.environ.get('INSS_PRECARREGAR', '0') == '1'
+# Validade, no navegador, das páginas de resultado em /resultado/<chave> (o conteúdo de uma chave não muda)
+MAX_AGE_RESULTADO = int(os.environ.get('INSS_RESULTADO_MAX_AGE', 3600))
+# Threads que processam a fila de jobs em segundo plano neste processo (0: apenas `python -m utils.jobs`)
+JOBS_WORKERS = int(os.environ.get('INSS_JOBS_WORKERS', 1))
+
+logger = logging.getLogger('inss.app')
 
 app = Flask(__name__)
 app.secret_key = "sua_chave_secreta"
 
+
+def precarregar():
+    """
+    Importa antecipadamente os módulos de cálculo usados pelas rotas.
+    """
+    import utils.tabelas
+    import utils.pipeline
+    import utils.lote
+    import utils.exportacao
+    import utils.serializacao
+    import utils.cache
+    import utils.renderizacao
+
+
+if PRECARREGAR:
+    precarregar()
+
+
+_jobs_pid = None
+
+
+@app.before_request
+def iniciar_jobs():
+    """
+    Inicia as threads da fila de jobs neste processo (`INSS_JOBS_WORKERS`; com 0, nenhuma), retomando
+    os jobs pendentes ou abandonados de uma execução anterior da aplicação.
+
+    Importar `app` não inicia a fila: ela é iniciada na primeira requisição de cada processo (em cada
+    worker do gunicorn, também com --preload) ou, no modo ASGI, na subida da aplicação (lifespan).
+    """
+    global _jobs_pid
+    if JOBS_WORKERS <= 0 or _jobs_pid == os.getpid():
+        return
+    _jobs_pid = os.getpid()
+    from utils.jobs import get_fila
+    get_fila().iniciar(JOBS_WORKERS)
+
+
+@app.before_request
+def iniciar_metricas():
+    g.inicio_requisicao = metricas.iniciar_requisicao()
+
+
+@app.after_request
+def registrar_metricas(response):
+    rota = request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+    metricas.finalizar_requisicao(g.inicio_requisicao, rota, request.method, response.status_code)
+    return response
+
+
+@app.after_request
+def comprimir_resposta(response):
+    from utils.respostas import comprimir
+    return comprimir(response, request.accept_encodings)
+
+
+def estatico(arquivo):
+    """
+    URL de um arquivo estático com impressão digital (ver `utils.estaticos`).
+    """
+    from utils.estaticos import get_manifesto, url_estatico
+    return url_estatico(get_manifesto(app.static_folder, recarregar=app.debug), arquivo)
+
+
+app.jinja_env.globals['estatico'] = estatico
+
+
+def pre_busca_selic(formato):
+    """
+    Marca uma rota que calcula obras com as taxas SELIC. No modo ASGI (`asgi.py`), as taxas do
+    período das obras do corpo são buscadas de forma assíncrona antes de a rota ser executada.
+
+    Args:
+        formato (str): Onde estão as obras no corpo da requisição: "formulario" (campos do
+                       formulário), "obra" (uma obra em JSON), "aninhada" ({"obra": {...}}) ou
+                       "lote" (lista JSON, {"obras": [...]}, uma obra ou NDJSON).
+    """
+    def marcar(view):
+        view.pre_busca_selic = formato
+        return view
+    return marcar
+
+
+@app.route('/assets/<path:nome>')
+def assets(nome):
+    """
+    Arquivo estático pelo nome com impressão digital (ex.: /assets/styles.1a2b3c4d5e.css), com cache
+    de longa duração: a URL muda sempre que o conteúdo muda.
+    """
+    from utils.estaticos import get_manifesto, MAX_AGE_IMUTAVEL
+
+    arquivo = get_manifesto(app.static_folder, recarregar=app.debug).original(nome)
+    if arquivo is None:
+        abort(404)
+    response = send_from_directory(app.static_folder, arquivo, max_age=MAX_AGE_IMUTAVEL)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.route('/')
 def index():
-    # Gera a lista de UFs dinamicamente a partir dos dados percentuais
-    from data.dados_percentuais import dados_percentuais
-    ufs = sorted(dados_percentuais.keys())
-    return render_template('index.html', ufs=ufs)
+    # Lista de UFs pré-calculada a partir dos dados percentuais
+    from data.ufs import UFS
+    return render_template('index.html', ufs=UFS)
 
 @app.route('/submit', methods=['POST'])
+@pre_busca_selic('formulario')
 def submit():
+    from utils.pipeline import obra_do_formulario, chave_resultado
+    from utils.cache import get_cache
+    from utils.esquema import ErroValidacao
+
     try:
-        # 1) Extrair dados do formulário principal
-        identificacoes = request.form.getlist('identificacao[]')
-        categorias = request.form.getlist('categoria[]')
-        materiais = request.form.getlist('material[]')
-        tipo_areas = request.form.getlist('tipoArea[]')
-        areas_totais = request.form.getlist('areaTotal[]')
-        cubs = request.form.getlist('CUB[]')
-        ufs = request.form.getlist('uf[]')
-        concretos = request.form.getlist('concretoUsinado[]')
-        destinacoes = request.form.getlist('destinacao[]')
-        valores_notas_fiscais = request.form.getlist('valorNotasFiscais[]')
-        areas_aferidas = request.form.getlist('areaAferida[]')
-
-        # 2) Ler os valores de mês de início e mês de fim (que vêm como listas)
-        mes_inicios = request.form.getlist('mesInicio[]')  # lista de strings no formato YYYY-MM
-        mes_fins = request.form.getlist('mesFim[]')        # idem
-
-        # 3) Se desejar usar um único range [start_date, end_date] para toda a obra,
-        #    podemos usar o mínimo de mes_inicios e o máximo de mes_fins:
-        if mes_inicios:
-            start_date = min(mes_inicios)  # earliest
-        else:
-            start_date = '2022-10'  # fallback
+        # 1) Montar a obra a partir do formulário (áreas, meses, fator de ajuste e meses de execução)
+        obra = obra_do_formulario(request.form)
 
-        if mes_fins:
-            end_date = max(mes_fins)  # latest
-        else:
-            end_date = '2023-09'  # fallback
-
-        # 4) Ler também outros campos (fatorAjuste, mesesExecucao), se existirem num <input> fora do loop
-        fator_ajuste_str = request.form.get('fatorAjuste', '50')
-        meses_execucao_str = request.form.get('mesesExecucao', '12')
-
-        fator_de_ajuste = float(fator_ajuste_str) / 100.0
-        meses_execucao = int(meses_execucao_str)
-
-        # 5) Montar lista de dicionários para gerar_tabela_areas_principais
-        dados = []
-        for i in range(len(identificacoes)):
-            try:
-                dado = {
-                    'Identificação': identificacoes[i],
-                    'Categoria': categorias[i],
-                    'Material': materiais[i],
-                    'Tipo area': tipo_areas[i],
-                    'Área Total': float(areas_totais[i]),
-                    'CUB': float(cubs[i]),
-                    'UF': ufs[i],
-                    'Concreto usinado': concretos[i],
-                    'destinacao': destinacoes[i],
-                    'valor_notas_fiscais': float(valores_notas_fiscais[i]),
-                    'Área Total Aferida para Cálculo': float(areas_aferidas[i])
-                }
-                dados.append(dado)
-            except ValueError as e:
-                flash(f'Erro na conversão dos dados: {str(e)}', 'danger')
-                return redirect(url_for('index'))
-
-        # 6) Gerar tabela de áreas
-        tabela_areas = gerar_tabela_areas_principais(dados)
-        tabela_areas_html = tabela_areas.to_html(classes='table table-striped', index=False)
-
-        # 7) Calcular RMT total
-        if 'RMT' in tabela_areas.columns:
-            rmt_total = tabela_areas['RMT'].sum()
-        else:
-            rmt_total = 0.0
+        # 2) Calcular e renderizar a página, reaproveitando a do cache se a mesma obra já foi enviada
+        #    com as mesmas regras, percentuais e taxas SELIC
+        try:
+            chave, selic_rates = chave_resultado(obra)
+            pagina = get_cache().obter_ou_calcular(chave, _renderizar_resultado, obra, selic_rates)
+        except ErroValidacao as e:
+            # Todos os campos inválidos de uma vez
+            incrementar('inss_erros_total', rota='/submit', tipo='validacao')
+            flash(f'Dados inválidos: {e}', 'danger')
+            return redirect(url_for('index'))
+        except ValueError as e:
+            incrementar('inss_erros_total', rota='/submit', tipo='conversao')
+            flash(f'Erro na conversão dos dados: {str(e)}', 'danger')
+            return redirect(url_for('index'))
 
-        # 8) Gera tabela de aferição indireta
-        tabela_afericao = gerar_tabela_aferecao_indireta(rmt_total, fator_de_ajuste, meses_execucao)
-        tabela_afericao_html = tabela_afericao.to_html(classes='table table-striped', index=False)
+        # 3) A chave identifica o resultado: ETag e endereço da página em /resultado/<chave>
+        response = make_response(pagina)
+        response.set_etag(chave)
+        response.headers['Content-Location'] = url_for('resultado', chave=chave)
+        return response
+    except Exception as e:
+        incrementar('inss_erros_total', rota='/submit', tipo='inesperado')
+        logger.exception("Exceção em submit: %s", e)
+        flash(f'Ocorreu um erro inesperado: {str(e)}', 'danger')
+        return redirect(url_for('index'))
 
-        # 9) Extrair RMT ajustado (caso queira usá-lo para a Tabela Financeira)
-        try:
-            rmt_ajustado_str = tabela_afericao.iloc[2, 1]  # busca "RMT PARA O Fator de ajuste" na tabela
-            # Dependendo do formato, será necessário tratar a string adequadamente:
-            rmt_ajustado = float(
-                rmt_ajustado_str
-                .replace('R$', '')
-                .replace('.', '')
-                .replace(',', '.')
-            )
-        except Exception as ex:
-            print("Erro ao extrair RMT ajustado:", ex)
-            rmt_ajustado = rmt_total * fator_de_ajuste
-
-        # 10) Gera Tabela Financeira usando as datas do formulário
-        tabela_financeira = generate_financial_table(start_date, end_date, rmt_ajustado)
-        tabela_financeira_html = tabela_financeira.to_html(classes='table table-striped', index=False)
-
-        # 11) Calcular INSS devido
-        from utils.calculos import calcular_inss_economizado, calcular_inss
-        inss_devido = calcular_inss(rmt_total)
-
-        # 12) Determinar percentual de redução (exemplo simples)
-        reducao_percentual = 0
-        if categorias and categorias[0] == "Reforma":
-            reducao_percentual = 65
-        elif categorias and categorias[0] == "Demolição":
-            reducao_percentual = 90
-
-        # 13) Gera a tabela detalhada de INSS
-        tabela_inss = gerar_tabela_inss_detalhado(rmt_total, reducao_percentual, honorarios_percentual=30)
-        tabela_inss_html = tabela_inss.to_html(classes='table table-striped', index=False)
 
+def _renderizar_resultado(obra, selic_rates):
+    """
+    Calcula a obra e renderiza a página de resultado.
+    """
+    from utils.tabelas import (
+        formatar_tabela_areas,
+        gerar_tabela_aferecao_indireta,
+        formatar_tabela_financeira,
+        formatar_tabela_inss
+    )
+    from utils.pipeline import calcular_obra
+    from utils.cache import get_cache
+    from utils.renderizacao import tabela_html
+
+    resultado = calcular_obra(obra, selic_rates=selic_rates, detalhado=True, cache=get_cache())
+
+    # Montar as tabelas de exibição a partir dos valores numéricos
+    tabela_areas = formatar_tabela_areas(resultado['tabela_areas'])
+    tabela_afericao = gerar_tabela_aferecao_indireta(
+        resultado['rmt_total'], resultado['fator_ajuste'], resultado['meses_execucao'])
+    tabela_financeira = formatar_tabela_financeira(resultado['tabela_financeira'])
+    tabela_inss = formatar_tabela_inss(resultado['inss'])
+
+    with medir('html'):
+        tabela_areas_html = tabela_html(tabela_areas, 'table table-striped')
+        tabela_afericao_html = tabela_html(tabela_afericao, 'table table-striped')
+        tabela_financeira_html = tabela_html(tabela_financeira, 'table table-striped')
+        tabela_inss_html = tabela_html(tabela_inss, 'table table-striped')
+
+    with medir('template'):
         return render_template('resultado.html',
                                tabela_areas_html=tabela_areas_html,
                                tabela_afericao_html=tabela_afericao_html,
                                tabela_financeira_html=tabela_financeira_html,
                                tabela_inss_html=tabela_inss_html,
-                               rmt_total=rmt_total,
-                               fator_de_ajuste=fator_de_ajuste,
-                               meses_execucao=meses_execucao)
-    except Exception as e:
-        print("Exceção em submit:", e)
-        flash(f'Ocorreu um erro inesperado: {str(e)}', 'danger')
-        return redirect(url_for('index'))
+                               rmt_total=resultado['rmt_total'],
+                               fator_de_ajuste=resultado['fator_ajuste'],
+                               meses_execucao=resultado['meses_execucao'])
+
+
+@app.route('/resultado/<chave>')
+def resultado(chave):
+    """
+    Página de resultado já calculada, pela chave do resultado (cabeçalho Content-Location de /submit).
+    Como a chave resume todas as entradas, a página pode ser guardada pelo navegador; com
+    If-None-Match igual ao ETag, responde 304 sem consultar o cache.
+    """
+    if request.if_none_match.contains_weak(chave):
+        response = Response(status=304)
+    else:
+        from utils.cache import get_cache
+        achou, pagina = get_cache().obter(chave)
+        if not achou:
+            abort(404)
+        response = make_response(pagina)
+    response.set_etag(chave)
+    response.cache_control.private = True
+    response.cache_control.max_age = MAX_AGE_RESULTADO
+    return response
+
+
+@app.route('/api/calcular', methods=['POST'])
+@pre_busca_selic('obra')
+def api_calcular():
+    """
+    Calcula uma obra (JSON no formato de `utils.pipeline.calcular_obra`) e retorna os resultados
+    numéricos em JSON, incluindo as colunas da tabela de áreas e os valores mensais da tabela
+    financeira, sem montar DataFrames nem HTML.
+    """
+    from utils.pipeline import calcular_obra
+    from utils.serializacao import dumps
+    from utils.cache import get_cache
+    from utils.esquema import ErroValidacao
+
+    obra = request.get_json(force=True, silent=True)
+    if not isinstance(obra, dict):
+        return jsonify({'erro': 'Entrada inválida: o corpo deve conter uma obra em JSON'}), 400
+    try:
+        resultado = calcular_obra(obra, detalhado=True, cache=get_cache())
+    except ErroValidacao as e:
+        return _entrada_invalida(e)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'erro': f'Entrada inválida: {type(e).__name__}: {e}'}), 400
+    return Response(dumps(resultado), mimetype='application/json')
+
+
+@app.route('/api/financeira', methods=['POST'])
+@pre_busca_selic('obra')
+def api_financeira():
+    """
+    Tabela financeira de uma obra em páginas de meses: ?cursor=YYYY-MM (primeiro mês da página; por
+    padrão, o início do período) e ?limite=N (meses por página). Apenas os meses da página são
+    calculados e serializados. A resposta traz os totais do período, os subtotais da página, os
+    totais acumulados até o fim da página e o cursor da próxima ("proximo", nulo na última).
+    """
+    from utils.pipeline import pagina_financeira_obra
+    from utils.financeiro import LIMITE_PAGINA
+    from utils.serializacao import dumps
+    from utils.cache import get_cache
+    from utils.esquema import ErroValidacao
+
+    obra = request.get_json(force=True, silent=True)
+    if not isinstance(obra, dict):
+        return jsonify({'erro': 'Entrada inválida: o corpo deve conter uma obra em JSON'}), 400
+    try:
+        resultado = pagina_financeira_obra(obra, cursor=request.args.get('cursor') or None,
+                                           limite=request.args.get('limite', LIMITE_PAGINA, type=int),
+                                           cache=get_cache())
+    except ErroValidacao as e:
+        return _entrada_invalida(e)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'erro': f'Entrada inválida: {type(e).__name__}: {e}'}), 400
+    return Response(dumps(resultado), mimetype='application/json')
+
+
+@app.route('/api/whatif', methods=['POST'])
+@pre_busca_selic('aninhada')
+def api_whatif():
+    """
+    Recalcula uma obra dentro de uma sessão de cálculo: {"sessao": "...", "obra": {...}}.
+    Somente as etapas cujas entradas mudaram desde o cálculo anterior da sessão são recalculadas.
+    Sem "sessao" (ou com uma sessão expirada), uma nova é criada. A resposta traz os resultados
+    numéricos, o id da sessão e a lista de etapas recalculadas.
+    """
+    from utils.pipeline import calcular_obra
+    from utils.serializacao import dumps
+    from utils.cache import get_cache
+    from utils.grafo import get_sessoes
+    from utils.esquema import ErroValidacao
+
+    corpo = request.get_json(force=True, silent=True)
+    if not isinstance(corpo, dict) or not isinstance(corpo.get('obra'), dict):
+        return jsonify({'erro': 'Entrada inválida: o corpo deve conter {"sessao": ..., "obra": {...}}'}), 400
+    sessao = get_sessoes().obter(corpo.get('sessao'))
+    try:
+        resultado = calcular_obra(corpo['obra'], cache=get_cache(), sessao=sessao)
+    except ErroValidacao as e:
+        return _entrada_invalida(e, sessao=sessao.id)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'erro': f'Entrada inválida: {type(e).__name__}: {e}', 'sessao': sessao.id}), 400
+    resultado['sessao'] = sessao.id
+    resultado['recalculadas'] = sessao.recalculadas
+    return Response(dumps(resultado), mimetype='application/json')
+
+
+@app.route('/api/cenarios', methods=['POST'])
+@pre_busca_selic('aninhada')
+def api_cenarios():
+    """
+    Simula uma grade de cenários de uma obra:
+    {"obra": {...}, "fatoresAjuste": [...], "honorarios": [...], "reducoes": [...]}.
+    Cada eixo aceita uma lista, um número ou {"inicio": ..., "fim": ..., "passo": ...}; os eixos
+    omitidos usam os valores da obra. A resposta traz uma matriz com uma linha por cenário
+    (ver `utils.cenarios.simular_cenarios`).
+    """
+    from utils.cenarios import simular_cenarios
+    from utils.serializacao import dumps
+    from utils.cache import get_cache
+    from utils.esquema import ErroValidacao
+
+    corpo = request.get_json(force=True, silent=True)
+    if not isinstance(corpo, dict) or not isinstance(corpo.get('obra'), dict):
+        return jsonify({'erro': 'Entrada inválida: o corpo deve conter {"obra": {...}} e as grades'}), 400
+    try:
+        resultado = simular_cenarios(corpo['obra'], fatores=corpo.get('fatoresAjuste'),
+                                     honorarios=corpo.get('honorarios'), reducoes=corpo.get('reducoes'),
+                                     cache=get_cache())
+    except ErroValidacao as e:
+        return _entrada_invalida(e)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'erro': f'Entrada inválida: {type(e).__name__}: {e}'}), 400
+    return Response(dumps(resultado), mimetype='application/json')
+
+
+@app.route('/api/estimativa', methods=['POST'])
+def api_estimativa():
+    """
+    Estimativa instantânea do RMT e do INSS de uma obra de área única, a partir das tabelas de
+    coeficientes pré-compiladas (ver `utils.estimativa`):
+    {"destinacao", "material", "categoria", "uf", "areaAferida", "CUB" ou "mes", "concretoUsinado"}.
+    """
+    from utils.estimativa import estimar
+
+    corpo = request.get_json(force=True, silent=True)
+    if not isinstance(corpo, dict):
+        return jsonify({'erro': 'Entrada inválida: o corpo deve conter os dados da área em JSON'}), 400
+    try:
+        cub = corpo.get('CUB')
+        resultado = estimar(corpo['destinacao'], corpo['material'], corpo['categoria'], corpo['uf'],
+                            float(corpo['areaAferida']), cub=float(cub) if cub not in (None, '') else None,
+                            mes=corpo.get('mes'), concreto=corpo.get('concretoUsinado') or 'Não')
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'erro': f'Entrada inválida: {type(e).__name__}: {e}'}), 400
+    return jsonify(resultado)
+
+
+def _entrada_invalida(erro, **extras):
+    """
+    Resposta 400 para uma obra inválida, com a lista de todos os campos inválidos em "erros"
+    (ver `utils.esquema.ErroValidacao`).
+    """
+    return jsonify({'erro': f'Entrada inválida: {erro}', 'erros': erro.erros, **extras}), 400
+
+
+def _requisicao_ndjson():
+    return request.mimetype in ('application/x-ndjson', 'application/jsonl')
+
+
+def _obras_json():
+    """
+    Lê as obras de um corpo JSON: uma lista, {"obras": [...]} ou uma única obra.
+    """
+    obras = request.get_json(force=True, silent=True)
+    if isinstance(obras, dict):
+        obras = obras['obras'] if 'obras' in obras else [obras]
+    if not isinstance(obras, list):
+        raise ValueError("o corpo deve conter uma lista de obras")
+    return obras
+
+
+@app.route('/api/batch', methods=['POST'])
+@pre_busca_selic('lote')
+def api_batch():
+    """
+    Calcula um lote de obras. Aceita uma lista JSON (ou {"obras": [...]}) ou NDJSON
+    (Content-Type application/x-ndjson), respondendo no mesmo formato recebido.
+    O número de processos pode ser informado em ?workers=N.
+    """
+    from utils.lote import calcular_lote, ler_ndjson
+    from utils.serializacao import dumps
+
+    ndjson = _requisicao_ndjson()
+    try:
+        obras = ler_ndjson(request.get_data(as_text=True).splitlines()) if ndjson else _obras_json()
+    except ValueError as e:
+        return jsonify({'erro': f'Entrada inválida: {e}'}), 400
+
+    resultados = calcular_lote(obras, workers=request.args.get('workers', type=int))
+
+    if ndjson:
+        corpo = b''.join(dumps(resultado) + b'\n' for resultado in resultados)
+        return Response(corpo, mimetype='application/x-ndjson')
+    return Response(dumps({'resultados': resultados}), mimetype='application/json')
+
+
+@app.route('/api/jobs', methods=['POST'])
+@pre_busca_selic('lote')
+def api_jobs_submeter():
+    """
+    Enfileira um cálculo em segundo plano: uma obra (como em /api/calcular) ou um lote (lista JSON,
+    {"obras": [...]} ou NDJSON, como em /api/batch). Responde 202 com o id do job; um job idêntico
+    ainda pendente ou em execução é reaproveitado ("duplicado": true).
+    """
+    from utils.jobs import get_fila
+    from utils.lote import ler_ndjson
+
+    corpo = None if _requisicao_ndjson() else request.get_json(force=True, silent=True)
+    try:
+        if _requisicao_ndjson():
+            tipo, entrada = 'lote', ler_ndjson(request.get_data(as_text=True).splitlines())
+        elif isinstance(corpo, dict) and 'obras' not in corpo:
+            tipo, entrada = 'calcular', corpo
+        else:
+            tipo, entrada = 'lote', _obras_json()
+        fila = get_fila()
+        id, duplicado = fila.submeter(tipo, entrada)
+    except ValueError as e:
+        return jsonify({'erro': f'Entrada inválida: {e}'}), 400
+    fila.iniciar()
+    resposta = jsonify({'id': id, 'tipo': tipo, 'duplicado': duplicado, **_links_job(id)})
+    resposta.headers['Location'] = url_for('api_jobs_estado', id=id)
+    return resposta, 202
+
+
+def _links_job(id):
+    return {'estado_url': url_for('api_jobs_estado', id=id), 'resultado_url': url_for('api_jobs_resultado', id=id)}
+
+
+@app.route('/api/jobs/<id>')
+def api_jobs_estado(id):
+    """
+    Estado e progresso de um job ("pendente", "executando", "concluido" ou "erro").
+    """
+    from utils.jobs import get_fila
+
+    estado = get_fila().estado(id)
+    if estado is None:
+        return jsonify({'erro': 'Job não encontrado'}), 404
+    return jsonify({**estado, **_links_job(id)})
+
+
+@app.route('/api/jobs/<id>/resultado')
+def api_jobs_resultado(id):
+    """
+    Resultado de um job concluído (mesmo formato de /api/calcular ou /api/batch). Enquanto o job
+    não termina, responde 409 com o estado atual.
+    """
+    from utils.jobs import get_fila, CONCLUIDO
+
+    fila = get_fila()
+    estado = fila.estado(id)
+    if estado is None:
+        return jsonify({'erro': 'Job não encontrado'}), 404
+    if estado['estado'] != CONCLUIDO:
+        return jsonify({'erro': f"Job ainda não concluído ({estado['estado']})", **estado}), 409
+    return Response(fila.resultado(id), mimetype='application/json')
+
+
+@app.route('/api/exportar/<tabela>.<formato>', methods=['POST'])
+@pre_busca_selic('lote')
+def api_exportar(tabela, formato):
+    """
+    Exporta uma tabela ("areas", "afericao", "financeira" ou "inss") em CSV, XLSX ou Parquet.
+    Aceita uma obra, uma lista JSON (ou {"obras": [...]}) ou NDJSON. A resposta é gerada em fluxo:
+    as obras são calculadas em blocos e escritas à medida que ficam prontas.
+    O número de processos pode ser informado em ?workers=N.
+    """
+    from utils.exportacao import exportar, TABELAS, FORMATOS, TIPOS_MIME
+    from utils.lote import iterar_lote, iterar_ndjson
+
+    if tabela not in TABELAS or formato not in FORMATOS:
+        return jsonify({'erro': f'Use /api/exportar/<{"|".join(TABELAS)}>.<{"|".join(FORMATOS)}>'}), 404
+    try:
+        obras = iterar_ndjson(request.stream) if _requisicao_ndjson() else _obras_json()
+    except ValueError as e:
+        return jsonify({'erro': f'Entrada inválida: {e}'}), 400
+
+    resultados = iterar_lote(obras, workers=request.args.get('workers', type=int), detalhado=True)
+    return Response(stream_with_context(exportar(resultados, tabela, formato)), mimetype=TIPOS_MIME[formato],
+                    headers={'Content-Disposition': f'attachment; filename={tabela}.{formato}'})
+
+
+@app.route('/metrics')
+def metrics():
+    """
+    Métricas do processo no formato de exposição do Prometheus (tempos por etapa e por rota,
+    acertos e faltas do armazenamento SELIC e do cache, latência da API do Banco Central e erros).
+    """
+    return Response(metricas.exportar_prometheus(), mimetype='text/plain; version=0.0.4')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,198 @@
+"""
+Entrada ASGI da calculadora (modo de serviço assíncrono).
+
+    uvicorn asgi:app --workers 2
+
+As rotas continuam sendo as da aplicação Flask (`app.py`), executadas em um pool de threads. Antes
+de repassar uma requisição a uma rota que calcula obras (as marcadas com `app.pre_busca_selic`, como
+`/submit`, `/api/calcular`, `/api/financeira`, `/api/cenarios`, `/api/batch` e `/api/jobs`), o
+período das obras é lido do corpo e as taxas SELIC faltantes são buscadas de forma assíncrona
+(`utils.selic_async`), com pool de conexões, timeout e buscas compartilhadas entre requisições
+concorrentes. Assim, o
+handler síncrono encontra as taxas já em memória e não bloqueia uma thread aguardando a API do
+Banco Central. Se a pré-busca falhar, a falha fica registrada no armazenamento (`SELIC_BACKOFF`) e
+o handler serve os dados locais de imediato, sem repetir a busca.
+
+Requer os pacotes opcionais `httpx` e um servidor ASGI (ex.: `uvicorn`).
+"""
+
+import asyncio
+import contextvars
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RoutingException
+
+from app import app as flask_app, iniciar_jobs
+from utils.selic_async import SelicAsync
+
+THREADS = int(os.environ.get('INSS_ASGI_THREADS', 32))
+
+
+def formato_pre_busca(wsgi_app, metodo, caminho):
+    """
+    Formato das obras no corpo da rota que atende a requisição (ver `app.pre_busca_selic`), ou None
+    se a rota não calcula obras.
+    """
+    try:
+        endpoint, _ = wsgi_app.url_map.bind('localhost').match(caminho, method=metodo)
+    except (HTTPException, RoutingException):
+        return None
+    return getattr(wsgi_app.view_functions.get(endpoint), 'pre_busca_selic', None)
+
+
+def _obras_da_requisicao(formato, tipo, corpo):
+    """
+    Extrai as obras do corpo de uma requisição de cálculo, no formato de `utils.pipeline`.
+    """
+    from utils.lote import ler_ndjson
+    from utils.pipeline import obra_do_formulario
+
+    if formato == 'formulario':
+        return [obra_do_formulario(MultiDict(parse_qsl(corpo.decode('utf-8'), keep_blank_values=True)))]
+    if formato == 'lote' and tipo in ('application/x-ndjson', 'application/jsonl'):
+        return ler_ndjson(corpo.decode('utf-8').splitlines())
+    dados = json.loads(corpo)
+    if formato == 'obra':
+        return [dados]
+    if formato == 'aninhada':
+        return [dados['obra']]
+    if isinstance(dados, dict):
+        return dados.get('obras', [dados])
+    return dados
+
+
+class AppAsgi:
+    """
+    Adaptador ASGI para a aplicação WSGI, com pré-busca assíncrona das taxas SELIC.
+
+    Args:
+        wsgi_app: Aplicação WSGI (Flask).
+        selic (SelicAsync, opcional): Cliente SELIC assíncrono.
+        threads (int): Tamanho do pool de threads que executa a aplicação WSGI.
+        ao_iniciar (callable, opcional): Executada na subida da aplicação (lifespan startup).
+    """
+
+    def __init__(self, wsgi_app, selic=None, threads=THREADS, ao_iniciar=None):
+        self.wsgi_app = wsgi_app
+        self.ao_iniciar = ao_iniciar
+        self.selic = selic if selic is not None else SelicAsync()
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                if self.ao_iniciar is not None:
+                    self.ao_iniciar()
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                await self.selic.fechar()
+                self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _pre_buscar_selic(self, scope, corpo):
+        formato = formato_pre_busca(self.wsgi_app, scope['method'], scope['path'])
+        if formato is None:
+            return
+        from utils.lote import intervalo_selic_bloco
+
+        cabecalhos = dict(scope['headers'])
+        tipo = cabecalhos.get(b'content-type', b'').decode('latin-1').split(';')[0].strip()
+        try:
+            intervalo = intervalo_selic_bloco(_obras_da_requisicao(formato, tipo, corpo))
+        except Exception:
+            return  # Entrada inválida: o erro é reportado pela própria rota
+        if intervalo is not None:
+            await self.selic.obter(*intervalo)
+
+    async def _http(self, scope, receive, send):
+        partes = []
+        while True:
+            mensagem = await receive()
+            partes.append(mensagem.get('body', b''))
+            if not mensagem.get('more_body'):
+                break
+        corpo = b''.join(partes)
+
+        await self._pre_buscar_selic(scope, corpo)
+
+        loop = asyncio.get_running_loop()
+        resposta = {}
+
+        def start_response(status, cabecalhos, exc_info=None):
+            resposta['status'] = int(status.split(' ', 1)[0])
+            resposta['cabecalhos'] = [(nome.lower().encode('latin-1'), valor.encode('latin-1'))
+                                      for nome, valor in cabecalhos]
+
+        # As chamadas da requisição podem cair em threads diferentes do pool, mas compartilham o mesmo
+        # contexto (as respostas com `stream_with_context` dependem das variáveis de contexto do Flask)
+        contexto = contextvars.copy_context()
+
+        def executar(funcao, *args):
+            return loop.run_in_executor(self._executor, contexto.run, funcao, *args)
+
+        iteravel = await executar(self.wsgi_app, self._environ(scope, corpo), start_response)
+        try:
+            iterador = iter(iteravel)
+            # O corpo é repassado em partes, sem acumular respostas longas em memória
+            parte = await executar(next, iterador, None)
+            await send({'type': 'http.response.start', 'status': resposta['status'],
+                        'headers': resposta['cabecalhos']})
+            while parte is not None:
+                if parte:
+                    await send({'type': 'http.response.body', 'body': parte, 'more_body': True})
+                parte = await executar(next, iterador, None)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iteravel, 'close'):
+                await executar(iteravel.close)
+
+    @staticmethod
+    def _environ(scope, corpo):
+        servidor = scope.get('server') or ('localhost', 80)
+        cliente = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(servidor[0]),
+            'SERVER_PORT': str(servidor[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': str(cliente[0]),
+            'CONTENT_LENGTH': str(len(corpo)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(corpo),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for nome, valor in scope['headers']:
+            nome = nome.decode('latin-1').upper().replace('-', '_')
+            valor = valor.decode('latin-1')
+            if nome == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = valor
+            elif nome != 'CONTENT_LENGTH':
+                chave = f'HTTP_{nome}'
+                environ[chave] = f"{environ[chave]},{valor}" if chave in environ else valor
+        return environ
+
+
+# A fila de jobs é iniciada na subida, e não na primeira requisição, para retomar logo os jobs pendentes
+app = AppAsgi(flask_app, ao_iniciar=iniciar_jobs)
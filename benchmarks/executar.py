@@ -0,0 +1,274 @@
+"""
+Benchmarks das etapas do cálculo de INSS, com comparação contra uma baseline em JSON.
+
+    python -m benchmarks.executar                     # executa e compara com benchmarks/baseline.json
+    python -m benchmarks.executar --salvar-baseline   # grava os tempos atuais como nova baseline
+    python -m benchmarks.executar -k financeira       # apenas os benchmarks cujo nome contém "financeira"
+
+Cada benchmark é medido em várias repetições (cada uma com o número de chamadas necessário para
+durar ao menos `DURACAO_MINIMA`), e o tempo registrado é a mediana por chamada. Um benchmark
+regride quando o tempo atual passa de `limite` vezes o da baseline (padrão `LIMITE_PADRAO`,
+ajustável por benchmark no próprio arquivo de baseline). Sem `-k`, também é verificado o orçamento
+do tempo de inicialização (`benchmarks.importacao`). O processo termina com código 1 se houver
+regressão ou se o orçamento de inicialização for excedido, para uso antes do deploy.
+
+A API do Banco Central nunca é consultada: as taxas SELIC vêm de um armazenamento em memória,
+offline, preenchido com taxas sintéticas.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.gerador import gerar_obra, formulario_da_obra, taxas_selic
+
+CAMINHO_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+LIMITE_PADRAO = 1.30
+REPETICOES = 7
+DURACAO_MINIMA = 0.05  # segundos por repetição
+
+# (nome, parâmetros de `gerar_obra`)
+TAMANHOS_AREAS = [
+    ('pequena', dict(n_areas=4, n_destinacoes=2, n_ufs=2)),
+    ('media', dict(n_areas=40, n_destinacoes=5, n_ufs=8)),
+    ('grande', dict(n_areas=400, n_destinacoes=7, n_ufs=27)),
+]
+TAMANHOS_MESES = [12, 60, 240]
+
+
+def medir(funcao, repeticoes=REPETICOES, duracao_minima=DURACAO_MINIMA):
+    """
+    Mede o tempo por chamada de `funcao`.
+
+    Returns:
+        dict: Mediana e mínimo (em milissegundos) por chamada e o número de chamadas por repetição.
+    """
+    funcao()  # Aquecimento (imports preguiçosos, caches de regras etc.)
+    chamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= duracao_minima:
+            break
+        chamadas *= 2
+    tempos = [decorrido / chamadas]
+    for _ in range(repeticoes - 1):
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / chamadas)
+    return {
+        'mediana_ms': statistics.median(tempos) * 1000,
+        'minimo_ms': min(tempos) * 1000,
+        'chamadas': chamadas,
+    }
+
+
+def _instalar_selic():
+    """
+    Substitui o armazenamento SELIC por um em memória, offline, com taxas sintéticas.
+    """
+    from utils.selic import SelicStore, set_selic_store
+    store = SelicStore(':memory:', offline=True)
+    store.importar(taxas_selic('2019-01', '2040-12'))
+    set_selic_store(store)
+    return store
+
+
+def montar_benchmarks():
+    """
+    Monta os benchmarks.
+
+    Returns:
+        dict: Nome do benchmark -> função sem argumentos a ser medida.
+    """
+    from app import app
+    from utils.cache import get_cache
+    from utils.cenarios import simular_cenarios
+    from utils.estimativa import estimar
+    from utils.financeiro import totais_financeiros, totais_carteira, pagina_financeira, remuneracoes_cronograma
+    from utils.pipeline import montar_dados_areas, etapa_areas, intervalo_selic
+    from utils.selic import mes_para_indice, indice_para_mes
+    from utils.renderizacao import tabela_html
+    from utils.tabelas import (
+        gerar_tabela_areas_principais,
+        gerar_tabela_aferecao_indireta,
+        generate_financial_table,
+        gerar_tabela_inss_detalhado,
+        formatar_tabela_areas
+    )
+
+    _instalar_selic()
+    app.config['TESTING'] = True
+    cliente = app.test_client()
+    cache = get_cache()
+    benchmarks = {}
+
+    for nome, parametros in TAMANHOS_AREAS:
+        obra = gerar_obra(**parametros)
+        dados = montar_dados_areas(obra['areas'])
+        tabela_areas, rmt_total = etapa_areas(dados)
+        benchmarks[f'areas[{nome}]'] = lambda dados=dados: gerar_tabela_areas_principais(dados)
+        # Renderização da tabela de áreas em HTML (utils.renderizacao, sem DataFrame.to_html)
+        benchmarks[f'html[{nome}]'] = lambda tabela=formatar_tabela_areas(tabela_areas): tabela_html(
+            tabela, 'table table-striped')
+        # Validação e conversão das áreas recebidas (utils.esquema)
+        benchmarks[f'esquema[{nome}]'] = lambda areas=obra['areas']: montar_dados_areas(areas)
+
+        formulario = formulario_da_obra(obra)
+
+        def submeter(formulario=formulario):
+            cache.limpar()  # Mede o cálculo completo, não o acerto no cache de resultados
+            resposta = cliente.post('/submit', data=formulario)
+            assert resposta.status_code == 200, resposta.status_code
+
+        benchmarks[f'submit[{nome}]'] = submeter
+        benchmarks[f'submit_cache[{nome}]'] = lambda formulario=formulario: cliente.post('/submit', data=formulario)
+
+    benchmarks['afericao'] = lambda: gerar_tabela_aferecao_indireta(rmt_total, 0.5, 12)
+    benchmarks['inss'] = lambda: gerar_tabela_inss_detalhado(rmt_total, 65, 30)
+    benchmarks['estimativa'] = lambda: estimar('Residencial Unifamiliar', 'Alvenaria', 'Obra Nova', 'SP', 250.0,
+                                               2100.0, concreto='Sim')
+
+    for n_meses in TAMANHOS_MESES:
+        obra = gerar_obra(n_meses=n_meses)
+        inicio, fim = obra['mesInicio'], obra['mesFim']
+        selic_rates = taxas_selic(*intervalo_selic([(inicio, fim)]))
+        # Com a busca da SELIC (armazenamento em memória) e com as taxas já informadas
+        benchmarks[f'financeira[{n_meses}m]'] = lambda i=inicio, f=fim: generate_financial_table(i, f, 100000.0)
+        benchmarks[f'financeira_taxas[{n_meses}m]'] = (
+            lambda i=inicio, f=fim, t=selic_rates: generate_financial_table(i, f, 100000.0, t))
+        benchmarks[f'financeira_totais[{n_meses}m]'] = (
+            lambda i=inicio, f=fim, t=selic_rates: totais_financeiros(i, f, 100000.0, t))
+        # Última página de 12 meses (/api/financeira), sem calcular os meses anteriores
+        benchmarks[f'financeira_pagina[{n_meses}m]'] = (
+            lambda i=inicio, f=fim, t=selic_rates, n=n_meses: pagina_financeira(
+                i, f, 100000.0, t, cursor=indice_para_mes(mes_para_indice(i) + max(n - 12, 0))))
+
+    # Totais de uma carteira de 10000 obras (períodos de 1 a 61 meses), sem montar as tabelas
+    aleatorio = random.Random(0)
+    inicios = [indice_para_mes(mes_para_indice('2020-01') + aleatorio.randint(0, 150)) for _ in range(10000)]
+    fins = [indice_para_mes(mes_para_indice(inicio) + aleatorio.randint(0, 60)) for inicio in inicios]
+    remuneracoes = [round(aleatorio.uniform(1e3, 1e6), 2) for _ in inicios]
+    taxas_carteira = taxas_selic('2019-12', '2037-12')
+    benchmarks['financeira_carteira[10000]'] = (
+        lambda i=inicios, f=fins, r=remuneracoes, t=taxas_carteira: totais_carteira(i, f, r, t))
+
+    # Cronograma por área: 400 fases escalonadas de 13 meses em 10 anos, combinadas mês a mês
+    inicio = mes_para_indice('2020-01')
+    fases = [(indice_para_mes(inicio + i % 108), indice_para_mes(inicio + i % 108 + 12)) for i in range(400)]
+    inicios, fins = zip(*fases)
+    valores = [1000.0 + i for i in range(400)]
+    benchmarks['cronograma[400]'] = lambda: remuneracoes_cronograma('2020-01', '2029-12', inicios, fins, valores)
+
+    # Grade de cenários (fator 10% a 100% × 11 honorários × 3 reduções), com o cálculo das áreas em cache
+    obra = gerar_obra(**dict(TAMANHOS_AREAS)['media'])
+    benchmarks['cenarios[570]'] = lambda: simular_cenarios(obra, {'inicio': 10, 'fim': 100, 'passo': 5},
+                                                             {'inicio': 0, 'fim': 50, 'passo': 5}, [0, 65, 90],
+                                                             cache=cache)
+
+    return benchmarks
+
+
+def comparar(resultados, baseline, limite_padrao=LIMITE_PADRAO):
+    """
+    Compara os resultados com a baseline.
+
+    Returns:
+        list: Tuplas (nome, tempo atual, tempo da baseline, razão, limite, regrediu).
+    """
+    comparacoes = []
+    for nome, resultado in resultados.items():
+        referencia = baseline.get('benchmarks', {}).get(nome)
+        if referencia is None:
+            continue
+        limite = referencia.get('limite', limite_padrao)
+        razao = resultado['mediana_ms'] / referencia['mediana_ms']
+        comparacoes.append((nome, resultado['mediana_ms'], referencia['mediana_ms'], razao, limite, razao > limite))
+    return comparacoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.executar', description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='filtro', help="Executa apenas benchmarks cujo nome contém o texto")
+    parser.add_argument('--baseline', default=CAMINHO_BASELINE, help="Arquivo JSON da baseline")
+    parser.add_argument('--salvar-baseline', action='store_true', help="Grava os resultados como nova baseline")
+    parser.add_argument('--limite', type=float, default=LIMITE_PADRAO,
+                        help="Razão máxima sobre a baseline antes de acusar regressão")
+    parser.add_argument('--saida', help="Grava os resultados desta execução em JSON")
+    parser.add_argument('--sem-importacao', action='store_true',
+                        help="Não verifica o orçamento do tempo de inicialização")
+    args = parser.parse_args(argv)
+
+    benchmarks = montar_benchmarks()
+    resultados = {}
+    for nome, funcao in benchmarks.items():
+        if args.filtro and args.filtro not in nome:
+            continue
+        resultados[nome] = medir(funcao)
+        print(f"{nome:32s} {resultados[nome]['mediana_ms']:10.3f} ms", flush=True)
+
+    execucao = {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': resultados,
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(execucao, arquivo, indent=2, ensure_ascii=False)
+
+    if args.salvar_baseline:
+        anterior = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as arquivo:
+                anterior = json.load(arquivo).get('benchmarks', {})
+        for nome, resultado in resultados.items():
+            # Preserva limites ajustados manualmente
+            if 'limite' in anterior.get(nome, {}):
+                resultado['limite'] = anterior[nome]['limite']
+        execucao['benchmarks'] = {**anterior, **resultados}
+        with open(args.baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump(execucao, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write('\n')
+        print(f"Baseline gravada em {args.baseline}")
+        return 0
+
+    regressoes = 0
+    if not args.filtro and not args.sem_importacao:
+        from benchmarks.importacao import verificar
+
+        linhas, falhas = verificar()
+        print("\nTempo de inicialização:")
+        for linha in linhas:
+            print(linha)
+        for falha in falhas:
+            print(f"FALHA: {falha}")
+        regressoes += len(falhas)
+
+    if not os.path.exists(args.baseline):
+        print(f"Sem baseline em {args.baseline}; use --salvar-baseline para criar.")
+        return 1 if regressoes else 0
+    with open(args.baseline, encoding='utf-8') as arquivo:
+        baseline = json.load(arquivo)
+
+    print(f"\nComparação com a baseline ({baseline.get('data', '?')}):")
+    for nome, atual, referencia, razao, limite, regrediu in comparar(resultados, baseline, args.limite):
+        regressoes += regrediu
+        marcador = 'REGRESSÃO' if regrediu else 'ok'
+        print(f"{nome:32s} {atual:10.3f} ms  baseline {referencia:10.3f} ms  x{razao:5.2f} (limite x{limite:.2f})  {marcador}")
+    if regressoes:
+        print(f"\n{regressoes} benchmark(s) ou verificação(ões) de inicialização acima do limite.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
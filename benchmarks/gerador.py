@@ -0,0 +1,87 @@
+"""
+Gerador de obras sintéticas para os benchmarks.
+
+As obras seguem o formato de `utils.pipeline.calcular_obra` e são reprodutíveis: a mesma semente
+produz sempre a mesma obra. O tamanho é controlado pelo número de áreas, de destinações e de UFs
+distintas e pela quantidade de meses do período.
+"""
+
+import random
+
+from data.dados_percentuais import dados_percentuais
+from utils.selic import indice_para_mes, mes_para_indice
+
+CATEGORIAS = ['Obra Nova', 'Acréscimo', 'Reforma', 'Demolição']
+MATERIAIS = ['Alvenaria', 'Madeira', 'Mista']
+TIPOS_AREA = ['Principal', 'Complementar']
+DESTINACOES = ['Residencial Unifamiliar', 'Residencial Multifamiliar', 'Comercial Salas e Lojas',
+               'Edifício de Garagens', 'Galpão Industrial', 'Casa Popular', 'Conjunto Habitacional Popular']
+UFS = sorted(dados_percentuais)
+MES_INICIO = '2020-01'
+
+
+def gerar_obra(n_areas=4, n_destinacoes=2, n_ufs=2, n_meses=12, semente=0):
+    """
+    Gera uma obra sintética.
+
+    Args:
+        n_areas (int): Quantidade de áreas.
+        n_destinacoes (int): Quantidade de destinações distintas (até 7).
+        n_ufs (int): Quantidade de UFs distintas (até 27).
+        n_meses (int): Quantidade de meses do período da obra.
+        semente (int): Semente do gerador aleatório.
+
+    Returns:
+        dict: Obra no formato de `utils.pipeline.calcular_obra`.
+    """
+    aleatorio = random.Random(semente)
+    destinacoes = aleatorio.sample(DESTINACOES, min(n_destinacoes, len(DESTINACOES)))
+    ufs = aleatorio.sample(UFS, min(n_ufs, len(UFS)))
+    areas = []
+    for i in range(n_areas):
+        area_total = round(aleatorio.uniform(30, 2500), 2)
+        areas.append({
+            'identificacao': f'Área {i + 1}',
+            'categoria': aleatorio.choice(CATEGORIAS),
+            'material': aleatorio.choice(MATERIAIS),
+            'tipoArea': aleatorio.choice(TIPOS_AREA),
+            'areaTotal': area_total,
+            'CUB': round(aleatorio.uniform(1500, 3000), 2),
+            'uf': ufs[i % len(ufs)],
+            'concretoUsinado': aleatorio.choice(['Sim', 'Não']),
+            'destinacao': destinacoes[i % len(destinacoes)],
+            'valorNotasFiscais': round(aleatorio.choice([0, 0, aleatorio.uniform(0, 50000)]), 2),
+            'areaAferida': round(area_total * aleatorio.uniform(0.5, 1), 2),
+        })
+    return {
+        'identificacao': f'Obra sintética {semente}',
+        'mesInicio': MES_INICIO,
+        'mesFim': indice_para_mes(mes_para_indice(MES_INICIO) + n_meses - 1),
+        'fatorAjuste': 50,
+        'mesesExecucao': 12,
+        'honorarios': 30,
+        'areas': areas,
+    }
+
+
+def formulario_da_obra(obra):
+    """
+    Converte uma obra nos campos do formulário HTML enviados para `/submit`.
+    """
+    campos = ['identificacao', 'categoria', 'material', 'tipoArea', 'areaTotal', 'CUB', 'uf',
+              'concretoUsinado', 'destinacao', 'valorNotasFiscais', 'areaAferida']
+    formulario = {f'{campo}[]': [str(area[campo]) for area in obra['areas']] for campo in campos}
+    formulario['mesInicio[]'] = [obra['mesInicio']] * len(obra['areas'])
+    formulario['mesFim[]'] = [obra['mesFim']] * len(obra['areas'])
+    formulario['fatorAjuste'] = str(obra['fatorAjuste'])
+    formulario['mesesExecucao'] = str(obra['mesesExecucao'])
+    return formulario
+
+
+def taxas_selic(inicio, fim, semente=0):
+    """
+    Gera taxas SELIC sintéticas ("YYYY-MM" -> taxa) para o período, usadas no lugar da API.
+    """
+    aleatorio = random.Random(semente)
+    return {indice_para_mes(i): round(aleatorio.uniform(0.5, 1.2), 2)
+            for i in range(mes_para_indice(inicio), mes_para_indice(fim) + 1)}
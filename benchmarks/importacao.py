@@ -0,0 +1,99 @@
+"""
+Verificação do tempo de inicialização (importação da aplicação).
+
+    python -m benchmarks.importacao
+
+A mesma verificação é executada por `python -m benchmarks.executar` (junto da comparação com a
+baseline) e pelos testes (`tests/test_importacao.py`). Cada medição é feita em um processo Python novo. A verificação falha (código de saída 1) quando:
+    - a mediana do tempo de `import app` passa de `ORCAMENTO_MS` acima do tempo de importar apenas o
+      Flask (medido na mesma máquina, para que o orçamento não dependa da velocidade do ambiente);
+    - algum módulo pesado (`MODULOS_PESADOS`) é carregado por `import app` ou por `GET /`;
+    - a lista de UFs pré-calculada (`data/ufs.py`) diverge das chaves de `dados_percentuais`.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORCAMENTO_MS = 50
+REPETICOES = 5
+MODULOS_PESADOS = ('pandas', 'numpy', 'dateutil', 'requests', 'pyarrow', 'openpyxl', 'utils.tabelas',
+                   'utils.pipeline')
+
+_MEDIR = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+carregados_import = sorted(m for m in {pesados!r} if m in sys.modules)
+carregados_get = []
+if {get_index!r}:
+    from app import app
+    resposta = app.test_client().get('/')
+    assert resposta.status_code == 200, resposta.status_code
+    carregados_get = sorted(m for m in {pesados!r} if m in sys.modules)
+print(json.dumps({{'ms': duracao * 1000, 'import': carregados_import, 'get': carregados_get}}))
+"""
+
+
+def medir_importacao(modulo, get_index=False):
+    """
+    Importa `modulo` em um processo novo e retorna o tempo (ms) e os módulos pesados carregados.
+    """
+    codigo = _MEDIR.format(modulo=modulo, pesados=MODULOS_PESADOS, get_index=get_index)
+    # Fila de jobs vazia: um job deixado no SQLite local carregaria os módulos de cálculo na thread da fila
+    ambiente = {**os.environ, 'INSS_JOBS_DB': ':memory:'}
+    saida = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=ambiente, capture_output=True, text=True,
+                           check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def verificar():
+    """
+    Mede o tempo de inicialização e confere os módulos carregados e a lista de UFs.
+
+    Returns:
+        tuple: (linhas do relatório, lista de falhas).
+    """
+    tempos_flask, medicoes_app = [], []
+    for _ in range(REPETICOES):  # Alternadas, para que variações da máquina afetem as duas medições
+        tempos_flask.append(medir_importacao('flask')['ms'])
+        medicoes_app.append(medir_importacao('app', get_index=True))
+    flask_ms = statistics.median(tempos_flask)
+    app_ms = statistics.median(m['ms'] for m in medicoes_app)
+    excedente = app_ms - flask_ms
+
+    falhas = []
+    if excedente > ORCAMENTO_MS:
+        falhas.append(f"import app levou {excedente:.1f} ms além do Flask (orçamento: {ORCAMENTO_MS} ms)")
+    if medicoes_app[0]['import']:
+        falhas.append(f"import app carregou: {', '.join(medicoes_app[0]['import'])}")
+    if medicoes_app[0]['get']:
+        falhas.append(f"GET / carregou: {', '.join(medicoes_app[0]['get'])}")
+
+    from data.dados_percentuais import dados_percentuais
+    from data.ufs import UFS
+    if UFS != tuple(sorted(dados_percentuais)):
+        falhas.append("data/ufs.py diverge das UFs de data/dados_percentuais.py")
+
+    linhas = [
+        f"import flask: {flask_ms:8.1f} ms",
+        f"import app:   {app_ms:8.1f} ms  ({excedente:+.1f} ms; orçamento +{ORCAMENTO_MS} ms)",
+    ]
+    return linhas, falhas
+
+
+def main():
+    linhas, falhas = verificar()
+    for linha in linhas:
+        print(linha)
+    for falha in falhas:
+        print(f"FALHA: {falha}")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
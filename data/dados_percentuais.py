@@ -1,84 +1,4 @@
-# Dados de percentuais por tipo de obra e UF
-dados_percentuais = {
-    "AC": {"Casa Popular": 4.69, "Comercial Salas e Lojas": 13.33, "Conjunto Habitacional Popular": 4.69,
-           "Edifício de Garagens": 13.33, "Galpão Industrial": 4.52, "Residencial Multifamiliar": 9.61,
-           "Residencial Unifamiliar": 7.43},
-    "AL": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-           "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-           "Residencial Unifamiliar": 6.11},
-    "AM": {"Casa Popular": 4.69, "Comercial Salas e Lojas": 13.33, "Conjunto Habitacional Popular": 4.69,
-              "Edifício de Garagens": 13.33, "Galpão Industrial": 4.52, "Residencial Multifamiliar": 9.61,
-              "Residencial Unifamiliar": 7.43},
-    "AP": {"Casa Popular": 4.88, "Comercial Salas e Lojas": 12.93, "Conjunto Habitacional Popular": 4.88,
-                "Edifício de Garagens": 12.93, "Galpão Industrial": 4.38, "Residencial Multifamiliar": 9.41,
-                "Residencial Unifamiliar": 7.48},
-    "BA": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "CE": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "DF": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "ES": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "GO": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "MA": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},   
-    "MG": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "MS": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "MT": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "PA": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "PB": {"Casa Popular": 4.12, "Comercial Salas e Lojas": 11.81, "Conjunto Habitacional Popular": 4.12,
-                "Edifício de Garagens": 11.81, "Galpão Industrial": 3.81, "Residencial Multifamiliar": 8.58,
-                "Residencial Unifamiliar": 6.32},
-    "PE": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "PI": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "PR": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "RJ": {"Casa Popular": 4.69, "Comercial Salas e Lojas": 13.33, "Conjunto Habitacional Popular": 4.69,
-                "Edifício de Garagens": 13.33, "Galpão Industrial": 4.52, "Residencial Multifamiliar": 9.61,
-                "Residencial Unifamiliar": 7.43},   
-    "RN": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "RO": {"Casa Popular": 4.69, "Comercial Salas e Lojas": 13.33, "Conjunto Habitacional Popular": 4.69,
-                "Edifício de Garagens": 13.33, "Galpão Industrial": 4.52, "Residencial Multifamiliar": 9.61,
-                "Residencial Unifamiliar": 7.43},
-    "RR": {"Casa Popular": 4.69, "Comercial Salas e Lojas": 13.33, "Conjunto Habitacional Popular": 4.69,
-                "Edifício de Garagens": 13.33, "Galpão Industrial": 4.52, "Residencial Multifamiliar": 9.61,
-                "Residencial Unifamiliar": 7.43},
-    "RS": {"Casa Popular": 3.25, "Comercial Salas e Lojas": 8.77, "Conjunto Habitacional Popular": 3.25,
-                "Edifício de Garagens": 8.77, "Galpão Industrial": 3.23, "Residencial Multifamiliar": 6.54,
-                "Residencial Unifamiliar": 5.01},
-    "SC": {"Casa Popular": 3.25, "Comercial Salas e Lojas": 8.77, "Conjunto Habitacional Popular": 3.25,
-                "Edifício de Garagens": 8.77, "Galpão Industrial": 3.23, "Residencial Multifamiliar": 6.54,
-                "Residencial Unifamiliar": 5.01},
-    "SE": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11},
-    "SP": {"Casa Popular": 4.69, "Comercial Salas e Lojas": 13.33, "Conjunto Habitacional Popular": 4.69,
-                "Edifício de Garagens": 13.33, "Galpão Industrial": 4.52, "Residencial Multifamiliar": 9.61,
-                "Residencial Unifamiliar": 7.43},
-    "TO": {"Casa Popular": 3.98, "Comercial Salas e Lojas": 11.35, "Conjunto Habitacional Popular": 3.98,
-                "Edifício de Garagens": 11.35, "Galpão Industrial": 3.82, "Residencial Multifamiliar": 8.12,
-                "Residencial Unifamiliar": 6.11}
-}
\ No newline at end of file
+# Dados de percentuais por tipo de obra e UF.
+# Os valores ficam em data/percentuais_uf.csv e são carregados em forma compacta (ver utils/percentuais.py);
+# `dados_percentuais` continua acessível como {UF: {destinação: percentual}}.
+from utils.percentuais import dados_percentuais
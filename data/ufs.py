@@ -0,0 +1,4 @@
+# UFs disponíveis no formulário, pré-calculadas a partir das chaves de `dados_percentuais`
+# (evita carregar a tabela de percentuais para exibir o formulário).
+UFS = ('AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA', 'PB', 'PE', 'PI', 'PR',
+       'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO')
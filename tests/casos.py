@@ -0,0 +1,28 @@
+"""
+Geradores de casos aleatórios compartilhados pelos testes.
+"""
+
+from utils.selic import indice_para_mes, mes_para_indice
+
+
+def gerar_caso(aleatorio):
+    """
+    Gera um caso aleatório: (início, fim, remuneração, taxas SELIC). O período tem de 0 a 300 meses e
+    começa antes, dentro ou depois das taxas, que têm meses faltando; as remunerações vão de centavos
+    a dezenas de milhões.
+    """
+    base = mes_para_indice('2015-01')
+    selic_rates = {indice_para_mes(base + i): round(aleatorio.uniform(0.0, 2.0), 2)
+                   for i in range(aleatorio.randint(0, 200)) if aleatorio.random() > 0.1}
+    inicio = base + aleatorio.randint(-24, 220)
+    fim = inicio + aleatorio.randint(-1, 300)
+    remuneracao = round(10 ** aleatorio.uniform(-2, 7.5), 2)
+    return indice_para_mes(inicio), indice_para_mes(fim), remuneracao, selic_rates
+
+
+def taxas_aleatorias(aleatorio, inicio='2014-01', fim='2025-12'):
+    """
+    Taxas SELIC aleatórias para todos os meses de `inicio` a `fim`.
+    """
+    primeiro, ultimo = mes_para_indice(inicio), mes_para_indice(fim)
+    return {indice_para_mes(i): round(aleatorio.uniform(0.0, 2.0), 2) for i in range(primeiro, ultimo + 1)}
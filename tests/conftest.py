@@ -0,0 +1,32 @@
+"""
+Configuração comum dos testes: a fila de jobs padrão fica em memória, sem threads trabalhadoras, para
+que as requisições dos testes não usem `data/jobs.sqlite3`.
+"""
+
+import os
+import random
+
+import pytest
+
+os.environ.setdefault('INSS_JOBS_DB', ':memory:')
+os.environ.setdefault('INSS_JOBS_WORKERS', '0')
+
+
+@pytest.fixture
+def selic_local(monkeypatch):
+    """
+    Taxas SELIC aleatórias de 2014 a 2025 no armazenamento padrão, em memória. Os meses fechados já
+    gravados não são consultados, e a API aponta para uma porta fechada.
+
+    Returns:
+        dict: As taxas gravadas.
+    """
+    from utils import selic
+    from tests.casos import taxas_aleatorias
+
+    taxas = taxas_aleatorias(random.Random(0))
+    store = selic.SelicStore(':memory:')
+    store.importar(taxas)
+    monkeypatch.setattr(selic, '_store_padrao', store)
+    monkeypatch.setattr(selic, 'SGS_URL', 'http://127.0.0.1:9/')
+    return taxas
@@ -0,0 +1,67 @@
+"""
+Servidor HTTP local que imita a série SGS 4189 do Banco Central, para os testes do armazenamento
+SELIC (`utils.selic`) e da consulta assíncrona (`utils.selic_async`).
+
+Uso:
+
+    with ServidorSgsFalso({'2023-01': 1.12}) as servidor:
+        monkeypatch.setattr(selic, 'SGS_URL', servidor.url)
+        ...
+        servidor.consultas  # [("2023-01", "2023-03"), ...]
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class ServidorSgsFalso:
+    """
+    Servidor da série SGS em uma porta livre de 127.0.0.1, executado em uma thread.
+
+    Args:
+        taxas (dict): Taxas publicadas, com chave "YYYY-MM".
+        status (int): Status HTTP das respostas (ex.: 500 para simular a API fora do ar).
+        atraso (float): Espera, em segundos, antes de cada resposta.
+    """
+
+    def __init__(self, taxas, status=200, atraso=0.0):
+        self.taxas = dict(taxas)
+        self.status = status
+        self.atraso = atraso
+        self.consultas = []  # (inicio, fim) de cada requisição recebida, em "YYYY-MM"
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parametros = parse_qs(urlparse(self.path).query)
+                inicio = datetime.strptime(parametros['dataInicial'][0], "%d/%m/%Y").strftime("%Y-%m")
+                fim = datetime.strptime(parametros['dataFinal'][0], "%d/%m/%Y").strftime("%Y-%m")
+                servidor.consultas.append((inicio, fim))
+                time.sleep(servidor.atraso)
+                corpo = json.dumps([
+                    {'data': f"01/{mes[5:]}/{mes[:4]}", 'valor': str(valor)}
+                    for mes, valor in sorted(servidor.taxas.items()) if inicio <= mes <= fim
+                ]).encode()
+                self.send_response(servidor.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._http.server_address[1]}/dados"
+
+    def __enter__(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._http.shutdown()
+        self._http.server_close()
@@ -0,0 +1,51 @@
+"""
+Testes da API JSON (`POST /api/calcular`) e da serialização dos resultados numéricos
+(`utils.serializacao`).
+"""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from app import app
+from benchmarks.gerador import gerar_obra
+from utils import serializacao
+from utils.pipeline import calcular_obra
+from utils.tabelas import format_currency, formatar_tabela_financeira
+
+
+def test_api_calcular_devolve_o_resultado_numerico(selic_local):
+    obra = gerar_obra(n_areas=5, n_meses=24)
+
+    resposta = app.test_client().post('/api/calcular', json=obra)
+
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'application/json'
+    dados = resposta.get_json()
+    esperado = calcular_obra(obra, selic_local, detalhado=True)
+    assert dados == json.loads(serializacao.dumps(esperado))
+    assert len(dados['tabela_areas']['RMT']) == len(obra['areas'])
+
+    # Os valores mensais são os números da tabela exibida, sem formatação
+    tabela = formatar_tabela_financeira(esperado['tabela_financeira']).iloc[:-1]
+    assert len(dados['tabela_financeira']['meses']) == len(tabela) == 24
+    assert [format_currency(valor) for valor in dados['tabela_financeira']['total']] == list(tabela['Total'])
+
+
+@pytest.mark.parametrize('corpo', ['', '[1, 2]', 'não é json'])
+def test_api_calcular_rejeita_corpo_que_nao_e_uma_obra(corpo):
+    resposta = app.test_client().post('/api/calcular', data=corpo, content_type='application/json')
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'].startswith('Entrada inválida')
+
+
+def test_serializacao_de_arrays_e_nan(monkeypatch):
+    valor = {'a': np.array([1.5, np.nan]), 'b': np.int64(3), 'c': [math.nan, 'ção'], 'd': np.float64(2.25)}
+    esperado = {'a': [1.5, None], 'b': 3, 'c': [None, 'ção'], 'd': 2.25}
+
+    assert json.loads(serializacao.dumps(valor)) == esperado
+    # Sem o orjson (dependência opcional), a biblioteca padrão produz o mesmo documento
+    monkeypatch.setattr(serializacao, 'orjson', None)
+    assert json.loads(serializacao.dumps(valor)) == esperado
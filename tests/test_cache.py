@@ -0,0 +1,82 @@
+"""
+Testes do cache de resultados (`utils.cache`): estabilidade das chaves, descarte LRU em memória e no
+SQLite compartilhado, e reaproveitamento do cálculo de obras idênticas.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.gerador import gerar_obra
+from utils.cache import CacheResultados, chave_canonica
+from utils.pipeline import calcular_obra
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_chave_independe_da_ordem_das_chaves():
+    obra = gerar_obra()
+    reordenada = json.loads(json.dumps(obra, sort_keys=True))
+    reordenada['areas'] = [dict(reversed(list(area.items()))) for area in reordenada['areas']]
+
+    assert chave_canonica('obra', obra) == chave_canonica('obra', reordenada)
+    assert chave_canonica('obra', obra) != chave_canonica('obra', {**obra, 'fatorAjuste': 51})
+    assert chave_canonica('obra', obra) != chave_canonica('areas', obra)
+    # A ordem das áreas faz parte da obra
+    assert chave_canonica('obra', obra) != chave_canonica('obra', {**obra, 'areas': obra['areas'][::-1]})
+
+
+def test_chave_estavel_entre_processos():
+    # Workers diferentes (e o SQLite compartilhado) precisam da mesma chave para as mesmas entradas
+    obra = gerar_obra(semente=3)
+    codigo = ("import json, sys; from utils.cache import chave_canonica; "
+              "print(chave_canonica('obra', json.loads(sys.stdin.read())))")
+    chaves = {subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, input=json.dumps(obra), text=True,
+                             capture_output=True, check=True, env={**os.environ, 'PYTHONHASHSEED': semente}
+                             ).stdout.strip()
+              for semente in ('1', '2')}
+    assert chaves == {chave_canonica('obra', obra)}
+
+
+def test_descarte_lru_em_memoria():
+    cache = CacheResultados(tamanho=2)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    assert cache.obter('a') == (True, 1)  # "a" passa a ser o mais recente
+
+    cache.guardar('c', 3)
+
+    assert cache.obter('b') == (False, None)
+    assert cache.obter('a') == (True, 1)
+    assert cache.obter('c') == (True, 3)
+
+
+def test_descarte_lru_no_sqlite_compartilhado(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite3')
+    worker1 = CacheResultados(tamanho=2, caminho=caminho)
+    worker2 = CacheResultados(tamanho=2, caminho=caminho)
+
+    worker1.guardar('a', {'valor': 1})
+    worker1.guardar('b', {'valor': 2})
+    assert worker2.obter('a') == (True, {'valor': 1})  # Lido do SQLite, e "a" passa a ser o mais recente
+    worker2.guardar('c', {'valor': 3})
+
+    novo = CacheResultados(tamanho=2, caminho=caminho)
+    assert novo.obter('b') == (False, None)
+    assert novo.obter('a') == (True, {'valor': 1})
+    assert novo.obter('c') == (True, {'valor': 3})
+
+
+def test_obras_identicas_reaproveitam_o_calculo(selic_local):
+    cache = CacheResultados()
+    obra = gerar_obra(n_areas=3)
+    primeiro = calcular_obra(obra, selic_local, cache=cache)
+    guardados = len(cache._memoria)
+
+    reordenada = json.loads(json.dumps(obra, sort_keys=True))
+    assert calcular_obra(reordenada, selic_local, cache=cache) == primeiro
+    assert len(cache._memoria) == guardados
+
+    calcular_obra({**obra, 'fatorAjuste': 40}, selic_local, cache=cache)
+    assert len(cache._memoria) > guardados
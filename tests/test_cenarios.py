@@ -0,0 +1,100 @@
+"""
+Testes da simulação de cenários (`utils.cenarios` e `POST /api/cenarios`): cada linha da matriz deve
+ser, exatamente, o resultado do pipeline para a obra com o fator, os honorários e a redução do cenário.
+"""
+
+import numpy as np
+import pytest
+
+from app import app
+from benchmarks.gerador import gerar_obra
+from utils import cenarios
+from utils.cenarios import COLUNAS, grade, simular_cenarios
+from utils.pipeline import calcular_obra, etapa_inss
+from utils.selic import indice_para_mes, mes_para_indice
+
+
+def obra_com_cronograma(cronograma):
+    obra = {**gerar_obra(n_areas=5, n_meses=30, semente=7), 'cronograma': cronograma}
+    for i, area in enumerate(obra['areas']):
+        # Fases escalonadas (ignoradas no cronograma único, que usa o período da obra)
+        area['mesInicio'] = indice_para_mes(mes_para_indice(obra['mesInicio']) + 5 * i)
+    return obra
+
+
+def esperado(obra, fator, honorarios, reducao, selic_rates):
+    resultado = calcular_obra({**obra, 'fatorAjuste': fator, 'honorarios': honorarios}, selic_rates)
+    inss = etapa_inss(resultado['rmt_total'], reducao, honorarios)
+    return {
+        'fator_ajuste': fator,
+        'honorarios_percentual': honorarios,
+        'reducao_percentual': reducao,
+        'rmt_ajustado': resultado['rmt_ajustado'],
+        'remuneracao_mensal': resultado['remuneracao_mensal'],
+        'financeira_remuneracao': resultado['financeiro']['remuneracao'],
+        'financeira_valor_atualizado': resultado['financeiro']['valor_atualizado'],
+        'financeira_total': resultado['financeiro']['total'],
+        **{chave: inss[chave] for chave in ('inss_devido', 'inss_a_pagar', 'economia_gerada', 'honorarios',
+                                           'economia_real')},
+    }
+
+
+@pytest.mark.parametrize('cronograma', ['obra', 'areas'])
+def test_cada_cenario_igual_ao_pipeline(selic_local, cronograma):
+    obra = obra_com_cronograma(cronograma)
+
+    simulacao = simular_cenarios(obra, fatores={'inicio': 10, 'fim': 100, 'passo': 15}, honorarios=[0, 12.5, 30],
+                                 reducoes=[0, 65, 90], selic_rates=selic_local)
+
+    matriz = simulacao['matriz']
+    assert simulacao['colunas'] == list(COLUNAS)
+    assert matriz.shape == (7 * 3 * 3, len(COLUNAS))
+    for linha in matriz:
+        fator, honorarios, reducao = linha[:3]
+        assert dict(zip(COLUNAS, linha.tolist())) == esperado(obra, fator, honorarios, reducao, selic_local)
+
+
+def test_eixos_omitidos_usam_os_valores_da_obra(selic_local):
+    obra = {**gerar_obra(), 'fatorAjuste': 35, 'honorarios': 15}
+
+    simulacao = simular_cenarios(obra, selic_rates=selic_local)
+
+    resultado = calcular_obra(obra, selic_local)
+    assert len(simulacao['matriz']) == 1
+    linha = dict(zip(COLUNAS, simulacao['matriz'][0].tolist()))
+    assert (linha['fator_ajuste'], linha['honorarios_percentual']) == (35, 15)
+    assert linha['reducao_percentual'] == resultado['inss']['reducao_percentual']
+    assert linha['economia_real'] == resultado['inss']['economia_real']
+
+
+def test_grade():
+    np.testing.assert_array_equal(grade({'inicio': 10, 'fim': 20, 'passo': 5}, 50), [10, 15, 20])
+    np.testing.assert_array_equal(grade({'inicio': 0, 'fim': 1, 'passo': 0.1}, 50), np.arange(11) * 0.1)
+    np.testing.assert_array_equal(grade([30, '40'], 50), [30, 40])
+    np.testing.assert_array_equal(grade(None, 50), [50])
+    np.testing.assert_array_equal(grade(45, 50), [45])
+    for invalida in ([], {'inicio': 10, 'fim': 5}, {'inicio': 0, 'fim': 10, 'passo': 0}, ['x']):
+        with pytest.raises(ValueError):
+            grade(invalida, 50)
+
+
+def test_limite_de_cenarios(monkeypatch, selic_local):
+    monkeypatch.setattr(cenarios, 'MAXIMO_CENARIOS', 20)
+    with pytest.raises(ValueError, match='21 cenários'):
+        simular_cenarios(gerar_obra(), fatores=[10, 20, 30], honorarios=list(range(7)), selic_rates=selic_local)
+
+
+def test_api_cenarios(selic_local):
+    cliente = app.test_client()
+    obra = gerar_obra()
+
+    resposta = cliente.post('/api/cenarios', json={'obra': obra, 'fatoresAjuste': [40, 50], 'reducoes': 65})
+    assert resposta.status_code == 200
+    dados = resposta.get_json()
+    assert dados['eixos'] == {'fator_ajuste': [40, 50], 'honorarios_percentual': [30], 'reducao_percentual': [65]}
+    assert dados['matriz'] == simular_cenarios(obra, [40, 50], reducoes=65, selic_rates=selic_local)['matriz'].tolist()
+
+    for corpo in ({'obra': obra, 'fatoresAjuste': []}, {'obra': {**obra, 'fatorAjuste': 'x'}}, {'fatores': [1]}):
+        resposta = cliente.post('/api/cenarios', json=corpo)
+        assert resposta.status_code == 400
+        assert resposta.get_json()['erro'].startswith('Entrada inválida')
@@ -0,0 +1,103 @@
+"""
+Testes da linha de comando (`utils.cli`): resultados gravados e códigos de saída.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.gerador import gerar_obra
+from utils import selic
+from utils.cli import SAIDA_OBRAS_COM_ERRO, SAIDA_OK, SAIDA_USO, main
+from utils.pipeline import calcular_obra
+from utils.serializacao import dumps
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def arquivos(tmp_path, selic_local, monkeypatch):
+    """
+    Grava as taxas SELIC (CSV "mes,valor", para --offline) e uma carteira em JSONL com uma obra inválida.
+    """
+    # O armazenamento padrão é substituído pelo do --offline; ele volta ao do teste ao final
+    monkeypatch.setattr(selic, '_store_padrao', selic.get_selic_store())
+    taxas = tmp_path / 'selic.csv'
+    taxas.write_text('mes,valor\n' + ''.join(f'{mes},{valor}\n' for mes, valor in selic_local.items()))
+    obras = [gerar_obra(n_areas=2, n_meses=6 + i, semente=i) for i in range(3)]
+    validas = tmp_path / 'validas.jsonl'
+    validas.write_text(''.join(json.dumps(obra) + '\n' for obra in obras))
+    com_erro = tmp_path / 'com_erro.jsonl'
+    com_erro.write_text(''.join(json.dumps(obra) + '\n' for obra in obras[:2] + [{**obras[2], 'fatorAjuste': 'x'}]))
+    return {'selic': str(taxas), 'validas': str(validas), 'com_erro': str(com_erro), 'obras': obras,
+            'taxas': selic_local, 'pasta': tmp_path}
+
+
+def calcular(arquivos, entrada, *extras):
+    saida = arquivos['pasta'] / 'resultados.jsonl'
+    codigo = main(['calcular', entrada, '-o', str(saida), '--offline', arquivos['selic'], '--workers', '1',
+                   '--sem-progresso', *extras])
+    linhas = saida.read_text().splitlines() if saida.exists() else []
+    return codigo, [json.loads(linha) for linha in linhas]
+
+
+def test_calcular_todas_validas(arquivos):
+    codigo, resultados = calcular(arquivos, arquivos['validas'])
+
+    assert codigo == SAIDA_OK
+    assert resultados == [json.loads(dumps(calcular_obra(obra, arquivos['taxas']))) for obra in arquivos['obras']]
+
+
+def test_obra_invalida_grava_as_demais_e_termina_com_1(arquivos):
+    codigo, resultados = calcular(arquivos, arquivos['com_erro'])
+
+    assert codigo == SAIDA_OBRAS_COM_ERRO
+    assert len(resultados) == 3
+    assert 'erro' not in resultados[0] and 'erro' not in resultados[1]
+    assert [erro['campo'] for erro in resultados[2]['erros']] == ['fatorAjuste']
+
+
+def test_entrada_ilegivel_termina_com_2(arquivos, capsys):
+    assert calcular(arquivos, str(arquivos['pasta'] / 'inexistente.jsonl'))[0] == SAIDA_USO
+    assert 'inexistente.jsonl' in capsys.readouterr().err
+
+    malformado = arquivos['pasta'] / 'malformado.jsonl'
+    malformado.write_text('{"areas": [\n')
+    assert calcular(arquivos, str(malformado))[0] == SAIDA_USO
+
+
+def test_argumentos_invalidos_terminam_com_2(arquivos):
+    with pytest.raises(SystemExit) as saida:
+        main(['calcular'])
+    assert saida.value.code == SAIDA_USO
+    with pytest.raises(SystemExit) as saida:
+        main(['exportar', arquivos['validas'], '--tabela', 'resumo', '-o', 'x.csv'])
+    assert saida.value.code == SAIDA_USO
+
+    # Formato deduzido da extensão do arquivo de saída
+    assert main(['exportar', arquivos['validas'], '--tabela', 'areas', '-o', str(arquivos['pasta'] / 'x.ods'),
+                 '--offline', arquivos['selic']]) == SAIDA_USO
+
+
+@pytest.mark.parametrize('entrada, esperado', [('validas', SAIDA_OK), ('com_erro', SAIDA_OBRAS_COM_ERRO)])
+def test_exportar(arquivos, entrada, esperado):
+    destino = arquivos['pasta'] / 'financeira.csv'
+    codigo = main(['exportar', arquivos[entrada], '--tabela', 'financeira', '-o', str(destino),
+                   '--offline', arquivos['selic'], '--workers', '1', '--sem-progresso'])
+
+    assert codigo == esperado
+    assert destino.read_text().startswith('obra,mes,')
+
+
+def test_codigo_de_saida_do_processo(arquivos):
+    def executar(entrada):
+        return subprocess.run([sys.executable, '-m', 'utils.cli', 'calcular', entrada, '-o', os.devnull,
+                               '--offline', arquivos['selic'], '--workers', '1', '--sem-progresso'],
+                              cwd=RAIZ, capture_output=True, text=True).returncode
+
+    assert executar(arquivos['validas']) == SAIDA_OK
+    assert executar(arquivos['com_erro']) == SAIDA_OBRAS_COM_ERRO
+    assert executar(str(arquivos['pasta'] / 'inexistente.jsonl')) == SAIDA_USO
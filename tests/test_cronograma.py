@@ -0,0 +1,65 @@
+"""
+Testes do cronograma por área (`utils.financeiro.remuneracoes_cronograma` e o campo "cronograma" da
+obra): a varredura dos períodos deve dar a soma período a período, e uma obra com todas as áreas no
+período da obra deve ter a mesma tabela financeira do cronograma único.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.gerador import gerar_obra
+from utils.financeiro import remuneracoes_cronograma
+from utils.pipeline import calcular_obra
+from utils.selic import indice_para_mes, mes_para_indice
+from utils.tabelas import formatar_tabela_financeira
+
+BASE = mes_para_indice('2020-01')
+
+
+def soma_periodo_a_periodo(fim, inicios, fins, valores):
+    esperado = np.zeros(fim - BASE + 1)
+    for inicio_periodo, fim_periodo, valor in zip(inicios, fins, valores):
+        esperado[max(inicio_periodo, BASE) - BASE:max(min(fim_periodo, fim) - BASE + 1, 0)] += valor
+    return esperado
+
+
+@pytest.mark.parametrize('semente', range(20))
+def test_varredura_igual_a_soma_periodo_a_periodo(semente):
+    aleatorio = random.Random(semente)
+    for _ in range(50):
+        # Períodos vazios (fim antes do início) e fora do cronograma incluídos
+        n = aleatorio.randint(0, 40)
+        inicios = [BASE + aleatorio.randint(-6, 60) for _ in range(n)]
+        fins = [inicio + aleatorio.randint(-2, 36) for inicio in inicios]
+        valores = [round(10 ** aleatorio.uniform(-2, 7), 2) for _ in range(n)]
+        fim = BASE + aleatorio.randint(0, 72)
+
+        obtido = remuneracoes_cronograma(indice_para_mes(BASE), indice_para_mes(fim), map(indice_para_mes, inicios),
+                                         map(indice_para_mes, fins), valores)
+
+        esperado = soma_periodo_a_periodo(fim, inicios, fins, valores)
+        np.testing.assert_allclose(obtido, esperado, rtol=1e-12, atol=1e-9)
+        # Sem resíduo de arredondamento nos meses em que todos os períodos já terminaram
+        assert (obtido[esperado == 0] == 0).all()
+
+
+def test_cronograma_com_fases():
+    obtido = remuneracoes_cronograma('2020-01', '2020-06', ['2020-01', '2020-03', '2019-11', '2020-05'],
+                                     ['2020-03', '2020-08', '2020-01', '2020-04'], [0.1, 0.2, 1.0, 5.0])
+    assert obtido.tolist() == [1.1, 0.1, 0.1 + 0.2, 0.2, 0.2, 0.2]
+
+
+@pytest.mark.parametrize('semente', range(8))
+def test_areas_no_periodo_da_obra_igual_ao_cronograma_unico(semente):
+    aleatorio = random.Random(semente)
+    obra = gerar_obra(n_areas=aleatorio.randint(1, 60), n_meses=aleatorio.randint(1, 120), semente=semente)
+    selic_rates = {indice_para_mes(BASE + k - 1): round(aleatorio.uniform(0.0, 2.0), 2) for k in range(121)}
+
+    unico = calcular_obra(obra, selic_rates=selic_rates, detalhado=True)
+    por_area = calcular_obra({**obra, 'cronograma': 'areas'}, selic_rates=selic_rates, detalhado=True)
+
+    assert formatar_tabela_financeira(por_area['tabela_financeira']).equals(
+        formatar_tabela_financeira(unico['tabela_financeira']))
+    assert por_area['financeiro'] == unico['financeiro']
@@ -0,0 +1,119 @@
+"""
+Testes do histórico local do CUB (`utils.cub`): consulta por UF, destinação (ou padrão) e mês, o mês
+de referência (anterior ao da aferição) e o preenchimento das áreas sem CUB no pipeline.
+"""
+
+import numpy as np
+import pytest
+
+from app import app
+from utils import cub
+from utils.cub import HistoricoCub, carregar_historico, mes_referencia_cub, preencher_cub
+from utils.esquema import ErroValidacao
+from utils.pipeline import calcular_obra
+
+REGISTROS = [
+    ('SP', 'R1-N', '2023-07', 1900.0),
+    ('SP', 'R1-N', '2023-08', 1985.32),
+    ('SP', 'Residencial Unifamiliar', '2023-08', 2000.0),
+    ('SP', 'R8-N', '2023-08', 1800.5),
+    ('RJ', 'R1-N', '2023-08', 2100.0),
+    ('RJ', 'R1-N', '2023-12', 2150.0),
+]
+
+
+@pytest.fixture
+def historico(monkeypatch):
+    historico = HistoricoCub(REGISTROS)
+    monkeypatch.setattr(cub, '_historico_padrao', historico)
+    return historico
+
+
+def obra_sem_cub(**campos):
+    area = {'identificacao': 'Casa', 'categoria': 'Obra Nova', 'material': 'Alvenaria', 'tipoArea': 'Principal',
+            'areaTotal': 150, 'uf': 'RJ', 'concretoUsinado': 'Não', 'destinacao': 'Residencial Unifamiliar',
+            'valorNotasFiscais': 0, 'areaAferida': 150}
+    return {'mesInicio': '2023-01', 'mesFim': '2023-08', 'mesesExecucao': 8, 'areas': [area], **campos}
+
+
+def test_consulta_por_destinacao_e_padrao(historico):
+    assert len(historico) == len(REGISTROS)
+    # O nome da destinação tem precedência sobre o padrão correspondente
+    assert historico.valor('SP', 'Residencial Unifamiliar', '2023-08') == 2000.0
+    # Sem série pelo nome da destinação, vale a do padrão (R1-N)
+    assert historico.valor('RJ', 'Residencial Unifamiliar', '2023-08') == 2100.0
+    assert historico.valor('SP', 'R8-N', '2023-08') == historico.valor('SP', 'Residencial Multifamiliar', '2023-08')
+    assert historico.valor('RJ', 'Residencial Unifamiliar', '2023-09') is None
+    assert historico.valor('RJ', 'Residencial Multifamiliar', '2023-08') is None
+    assert historico.valor('RJ', 'Desconhecida', '2023-08') is None
+
+
+def test_consulta_em_colunas_igual_a_consulta_escalar(historico):
+    linhas = [(uf, destinacao, mes) for uf in ('SP', 'RJ', 'MG')
+              for destinacao in ('Residencial Unifamiliar', 'Residencial Multifamiliar', 'R1-N', 'Galpão Industrial')
+              for mes in ('2023-07', '2023-08', '2023-12', '2024-01')]
+
+    valores = historico.valores(*zip(*linhas))
+
+    esperados = [historico.valor(*linha) for linha in linhas]
+    np.testing.assert_array_equal(valores, [np.nan if valor is None else valor for valor in esperados])
+
+
+def test_mes_de_referencia_anterior_a_afericao():
+    assert mes_referencia_cub({'mesAfericao': '2023-09'}, '2023-06') == '2023-08'
+    assert mes_referencia_cub({'mesAfericao': '2024-01'}, '2023-06') == '2023-12'
+    # Sem mês de aferição, a aferição é no mês seguinte ao fim da obra
+    assert mes_referencia_cub({}, '2023-06') == '2023-06'
+
+
+@pytest.mark.parametrize('campos, cub_esperado', [
+    ({'mesAfericao': '2024-01'}, 2150.0),
+    ({}, 2100.0),
+])
+def test_pipeline_usa_o_cub_do_mes_anterior_a_afericao(historico, selic_local, campos, cub_esperado):
+    obra = obra_sem_cub(**campos)
+    informado = {**obra, 'areas': [{**obra['areas'][0], 'CUB': cub_esperado}]}
+
+    assert calcular_obra(obra, selic_local) == calcular_obra(informado, selic_local)
+
+
+def test_preencher_cub_do_lote(historico):
+    obras = [obra_sem_cub(), obra_sem_cub(mesAfericao='2024-01'), {**obra_sem_cub(), 'areas': [{'uf': 'MG'}]}]
+    originais = [obra['areas'][0].copy() for obra in obras]
+
+    preenchidas = preencher_cub(obras, ['2023-08', '2023-12', '2023-08'])
+
+    assert [obra['areas'][0].get('CUB') for obra in preenchidas] == [2100.0, 2150.0, None]
+    # As obras recebidas não são alteradas; as que não foram preenchidas são devolvidas como estão
+    assert [obra['areas'][0] for obra in obras] == originais
+    assert preenchidas[2] is obras[2]
+
+
+def test_carregar_historico(tmp_path):
+    (tmp_path / 'sp.csv').write_text('uf,padrao,mes,valor\nSP,R1-N,2023-08,1985.32\n', encoding='utf-8')
+    (tmp_path / 'rj.csv').write_text('uf,padrao,mes,valor\nRJ,R1-N,2023-08,2100\n', encoding='utf-8')
+
+    historico = carregar_historico(str(tmp_path))
+
+    assert len(historico) == 2
+    assert historico.valor('RJ', 'Residencial Unifamiliar', '2023-08') == 2100.0
+    assert len(carregar_historico(str(tmp_path / 'inexistente'))) == 0
+
+
+def test_historico_vazio_da_erro_claro(monkeypatch, selic_local):
+    monkeypatch.setattr(cub, '_historico_padrao', HistoricoCub())
+
+    with pytest.raises(ErroValidacao, match='histórico do CUB está vazio') as erro:
+        calcular_obra(obra_sem_cub(), selic_local)
+    assert [(e['area'], e['campo']) for e in erro.value.erros] == [(1, 'CUB')]
+
+    resposta = app.test_client().post('/api/estimativa', json={
+        'destinacao': 'Residencial Unifamiliar', 'material': 'Alvenaria', 'categoria': 'Obra Nova', 'uf': 'RJ',
+        'areaAferida': 150, 'mes': '2023-08'})
+    assert resposta.status_code == 400
+    assert 'histórico do CUB está vazio' in resposta.get_json()['erro']
+
+
+def test_cub_ausente_do_historico(historico, selic_local):
+    with pytest.raises(ErroValidacao, match='não encontrado no histórico para MG'):
+        calcular_obra(obra_sem_cub(areas=[{**obra_sem_cub()['areas'][0], 'uf': 'MG'}]), selic_local)
@@ -0,0 +1,127 @@
+"""
+Testes do esquema de entrada (`utils.esquema`): a mesma obra vinda do JSON, do CSV ou do formulário é
+convertida da mesma forma, e uma obra inválida é rejeitada com todos os campos inválidos de uma vez.
+"""
+
+import csv
+import io
+
+import numpy as np
+import pytest
+from flask import request
+
+from app import app
+from benchmarks.gerador import formulario_da_obra, gerar_obra
+from utils.cli import ler_obras_csv
+from utils.esquema import CAMPOS_AREA, ErroValidacao, validar_obra
+from utils.pipeline import obra_do_formulario
+
+
+def assert_mesma_obra(validada, esperada):
+    assert (validada.fator_ajuste, validada.meses_execucao, validada.honorarios, validada.cronograma) == \
+           (esperada.fator_ajuste, esperada.meses_execucao, esperada.honorarios, esperada.cronograma)
+    assert len(validada.areas) == len(esperada.areas)
+    for campo in CAMPOS_AREA:
+        if isinstance(esperada.areas[campo.nome], np.ndarray):
+            np.testing.assert_array_equal(validada.areas[campo.nome], esperada.areas[campo.nome])
+        else:
+            assert validada.areas[campo.nome] == esperada.areas[campo.nome]
+
+
+def obra_em_csv(obra):
+    arquivo = io.StringIO()
+    campos = ['obra', 'fatorAjuste', 'mesesExecucao', 'honorarios', *obra['areas'][0]]
+    escritor = csv.DictWriter(arquivo, campos)
+    escritor.writeheader()
+    for i, area in enumerate(obra['areas']):
+        # Campos da obra apenas na primeira linha
+        da_obra = {campo: obra[campo] for campo in ('fatorAjuste', 'mesesExecucao', 'honorarios')} if i == 0 else {}
+        escritor.writerow({'obra': obra['identificacao'], **da_obra, **area})
+    arquivo.seek(0)
+    return arquivo
+
+
+def test_json_csv_e_formulario_dao_a_mesma_obra():
+    obra = gerar_obra(n_areas=6, semente=3)
+    # O CSV e o formulário trazem o período em cada área
+    for area in obra['areas']:
+        area.update(mesInicio=obra['mesInicio'], mesFim=obra['mesFim'])
+    esperada = validar_obra(obra)
+
+    [do_csv] = ler_obras_csv(obra_em_csv(obra))
+    assert_mesma_obra(validar_obra(do_csv), esperada)
+
+    with app.test_request_context('/submit', method='POST', data=formulario_da_obra(obra)):
+        assert_mesma_obra(validar_obra(obra_do_formulario(request.form)), esperada)
+
+
+def test_areas_em_colunas_e_padroes():
+    obra = gerar_obra(n_areas=3)
+    colunas = {campo.nome: [area.get(campo.nome) for area in obra['areas']] for campo in CAMPOS_AREA}
+    assert_mesma_obra(validar_obra({**obra, 'areas': colunas}), validar_obra(obra))
+
+    minima = {'areas': [{'categoria': 'Obra Nova', 'material': 'Alvenaria', 'areaTotal': '100', 'uf': 'SP',
+                         'destinacao': 'Casa Popular', 'areaAferida': '50'}]}
+    validada = validar_obra(minima)
+    assert (validada.fator_ajuste, validada.meses_execucao, validada.honorarios, validada.cronograma) == \
+           (50, 12, 30, 'obra')
+    assert np.isnan(validada.areas['CUB'][0]) and validada.areas['valorNotasFiscais'][0] == 0
+    assert validada.areas['tipoArea'] == ['Principal']
+
+
+def test_obra_invalida_reporta_todos_os_campos():
+    obra = gerar_obra(n_areas=3)
+    obra.update(fatorAjuste='cinquenta', mesesExecucao='1.5', cronograma='mensal', mesAfericao='2021/03')
+    obra['areas'][0].update(areaTotal='', uf=None)
+    obra['areas'][2].update(areaAferida='-1', CUB='abc', mesInicio='2021-13')
+
+    with pytest.raises(ErroValidacao) as erro:
+        validar_obra(obra)
+
+    assert [(e['area'], e['campo']) for e in erro.value.erros] == [
+        (None, 'fatorAjuste'), (None, 'mesesExecucao'), (None, 'mesAfericao'), (None, 'cronograma'),
+        (1, 'areaTotal'), (1, 'uf'),
+        (3, 'CUB'), (3, 'areaAferida'), (3, 'mesInicio'),
+    ]
+    por_campo = {(e['area'], e['campo']): e for e in erro.value.erros}
+    assert por_campo[(3, 'CUB')]['valor'] == 'abc'
+    assert por_campo[(1, 'areaTotal')]['mensagem'] == 'campo obrigatório não informado'
+    assert por_campo[(3, 'areaAferida')]['mensagem'] == 'deve ser maior ou igual a 0'
+    assert 'área 3, CUB: valor inválido' in str(erro.value)
+
+
+@pytest.mark.parametrize('obra', [None, [], {'areas': 'uma área'}, {'areas': [1, 2]}])
+def test_estrutura_invalida(obra):
+    with pytest.raises(ErroValidacao) as erro:
+        validar_obra(obra)
+    assert [e['campo'] for e in erro.value.erros] in (['obra'], ['areas'])
+
+
+def test_api_calcular_devolve_os_erros_por_campo():
+    obra = gerar_obra(n_areas=2)
+    obra['fatorAjuste'] = 'x'
+    obra['areas'][1]['areaTotal'] = 'muito'
+
+    resposta = app.test_client().post('/api/calcular', json=obra)
+
+    assert resposta.status_code == 400
+    dados = resposta.get_json()
+    assert dados['erro'].startswith('Entrada inválida')
+    assert [(e['area'], e['campo'], e['valor']) for e in dados['erros']] == \
+           [(None, 'fatorAjuste', 'x'), (2, 'areaTotal', 'muito')]
+
+
+def test_submit_invalido_volta_ao_formulario_com_todos_os_campos():
+    obra = gerar_obra(n_areas=3)
+    formulario = formulario_da_obra(obra)
+    formulario['areaTotal[]'][0] = 'cem'
+    formulario['areaAferida[]'][2] = ''
+    cliente = app.test_client()
+
+    resposta = cliente.post('/submit', data=formulario)
+
+    assert resposta.status_code == 302
+    with cliente.session_transaction() as sessao:
+        [(categoria, mensagem)] = sessao['_flashes']
+    assert categoria == 'danger'
+    assert 'área 1, areaTotal' in mensagem and 'área 3, areaAferida' in mensagem
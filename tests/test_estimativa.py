@@ -0,0 +1,87 @@
+"""
+Testes da estimativa instantânea (`utils.estimativa` e `POST /api/estimativa`): para uma obra de área
+única, o RMT e o INSS estimados coincidem ao centavo com os do pipeline completo.
+"""
+
+import random
+
+import pytest
+
+from app import app
+from utils.estimativa import CONCRETO_USINADO, estimar, get_tabela_estimativas
+from utils.pipeline import calcular_obra
+from utils.tabelas import format_currency
+
+
+def obra_de_area_unica(destinacao, material, categoria, uf, area, cub, concreto):
+    return {'areas': [{'categoria': categoria, 'material': material, 'areaTotal': area, 'CUB': cub, 'uf': uf,
+                       'concretoUsinado': concreto, 'destinacao': destinacao, 'areaAferida': area}]}
+
+
+def casos_aleatorios(quantidade, semente=0):
+    """
+    Combinações, áreas e CUBs aleatórios, incluindo destinações e categorias fora das regras e áreas
+    nos limites das faixas.
+    """
+    aleatorio = random.Random(semente)
+    tabela = get_tabela_estimativas()
+    destinacoes = list(tabela.regras.destinacoes) + ['Desconhecida']
+    materiais = list(tabela.regras.materiais)
+    categorias = list(tabela.regras.categorias) + ['Desconhecida']
+    ufs = list(tabela.percentuais.ufs)
+    for _ in range(quantidade):
+        combinacao = (aleatorio.choice(destinacoes), aleatorio.choice(materiais), aleatorio.choice(categorias),
+                      aleatorio.choice(ufs))
+        concreto = aleatorio.choice(CONCRETO_USINADO)
+        limites = tabela.faixas(*combinacao, concreto)[0]
+        area = aleatorio.choice(limites) if limites and aleatorio.random() < 0.2 \
+            else round(10 ** aleatorio.uniform(0, 4.5), 2)
+        yield (*combinacao, area, round(aleatorio.uniform(500, 4000), 2), concreto)
+
+
+def test_estimativa_igual_ao_pipeline_ao_centavo():
+    divergencias = []
+    for caso in casos_aleatorios(2000):
+        estimativa = get_tabela_estimativas().estimar(*caso)
+        resultado = calcular_obra(obra_de_area_unica(*caso), selic_rates={})
+        esperados = {'rmt': resultado['rmt_total'], **{chave: resultado['inss'][chave] for chave in
+                                                       ('inss_devido', 'inss_a_pagar', 'economia_gerada')}}
+        divergencias += [(caso, chave) for chave, esperado in esperados.items()
+                         if format_currency(estimativa[chave]) != format_currency(esperado)]
+    assert divergencias == []
+
+
+def test_faixa_da_area():
+    tabela = get_tabela_estimativas()
+    destinacao, material, categoria, uf = next(
+        (d, m, c, u) for d in tabela.regras.destinacoes for m in tabela.regras.materiais
+        for c in tabela.regras.categorias for u in tabela.percentuais.ufs if tabela.faixas(d, m, c, u)[0])
+    limites, coeficientes = tabela.faixas(destinacao, material, categoria, uf)
+
+    # O limite pertence à faixa que ele encerra
+    primeira = tabela.estimar(destinacao, material, categoria, uf, limites[0], 1000)
+    assert primeira['faixa'] == [0, limites[0]] and primeira['coeficiente'] == coeficientes[0]
+    ultima = tabela.estimar(destinacao, material, categoria, uf, limites[-1] + 1, 1000)
+    assert ultima['faixa'] == [limites[-1], None] and ultima['coeficiente'] == coeficientes[-1]
+
+
+def test_area_negativa_ou_sem_cub():
+    with pytest.raises(ValueError, match='área'):
+        estimar('Casa Popular', 'Alvenaria', 'Obra Nova', 'SP', -1, 1000)
+    with pytest.raises(ValueError, match='CUB'):
+        estimar('Casa Popular', 'Alvenaria', 'Obra Nova', 'SP', 100)
+
+
+def test_api_estimativa():
+    cliente = app.test_client()
+    corpo = {'destinacao': 'Casa Popular', 'material': 'Alvenaria', 'categoria': 'Obra Nova', 'uf': 'SP',
+             'areaAferida': 250, 'CUB': 2100, 'concretoUsinado': 'Sim'}
+
+    resposta = cliente.post('/api/estimativa', json=corpo)
+
+    assert resposta.status_code == 200
+    assert resposta.get_json() == estimar('Casa Popular', 'Alvenaria', 'Obra Nova', 'SP', 250, 2100, concreto='Sim')
+    for invalido in ({**corpo, 'areaAferida': 'x'}, {**corpo, 'CUB': None}, {'uf': 'SP'}):
+        resposta = cliente.post('/api/estimativa', json=invalido)
+        assert resposta.status_code == 400
+        assert resposta.get_json()['erro'].startswith('Entrada inválida')
@@ -0,0 +1,89 @@
+"""
+Testes da exportação (`utils.exportacao` e `POST /api/exportar/<tabela>.<formato>`): o arquivo gerado
+em fluxo, lido de volta, deve ser a concatenação das tabelas numéricas das obras.
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from app import app
+from benchmarks.gerador import gerar_obra
+from utils.exportacao import FORMATOS, TABELAS, exportar, gerar_csv, tabela_da_obra
+from utils.pipeline import calcular_obra
+
+LEITORES = {
+    'csv': lambda dados: pd.read_csv(io.BytesIO(dados), float_precision='round_trip'),
+    'xlsx': lambda dados: pd.read_excel(io.BytesIO(dados)),
+    'parquet': lambda dados: pd.read_parquet(io.BytesIO(dados)),
+}
+DEPENDENCIAS = {'csv': None, 'xlsx': 'openpyxl', 'parquet': 'pyarrow'}
+
+
+def assert_mesma_tabela(lido, esperado, formato):
+    if formato == 'xlsx':
+        # As planilhas guardam 15 algarismos significativos
+        pd.testing.assert_frame_equal(lido, esperado, check_dtype=False, rtol=1e-14)
+    else:
+        pd.testing.assert_frame_equal(lido, esperado, check_dtype=False, check_exact=True)
+
+
+def carteira():
+    return [gerar_obra(n_areas=2 + i, n_meses=6 + 3 * i, semente=i) for i in range(3)]
+
+
+def resultados_detalhados(obras, selic_rates):
+    resultados = [calcular_obra(obra, selic_rates, detalhado=True) for obra in obras]
+    # Obras com erro ficam fora do arquivo
+    resultados.insert(1, {'identificacao': 'inválida', 'erro': 'ErroValidacao: fatorAjuste'})
+    return resultados
+
+
+def esperado(resultados, tabela):
+    return pd.concat([df for df in (tabela_da_obra(r, tabela) for r in resultados) if df is not None],
+                     ignore_index=True)
+
+
+@pytest.mark.parametrize('formato', FORMATOS)
+@pytest.mark.parametrize('tabela', TABELAS)
+def test_arquivo_exportado_volta_igual(selic_local, tabela, formato):
+    if DEPENDENCIAS[formato]:
+        pytest.importorskip(DEPENDENCIAS[formato])
+    resultados = resultados_detalhados(carteira(), selic_local)
+
+    lido = LEITORES[formato](b''.join(exportar(iter(resultados), tabela, formato)))
+
+    assert_mesma_tabela(lido, esperado(resultados, tabela), formato)
+
+
+def test_csv_escrito_uma_obra_por_vez(selic_local):
+    resultados = resultados_detalhados(carteira(), selic_local)
+    partes = list(gerar_csv(tabela_da_obra(r, 'financeira') for r in resultados if 'erro' not in r))
+
+    assert len(partes) == 3
+    assert partes[0].startswith(b'obra,mes,remuneracao,')
+    assert not any(parte.startswith(b'obra,') for parte in partes[1:])
+
+
+def test_tabela_ou_formato_desconhecido():
+    with pytest.raises(ValueError):
+        next(exportar([], 'resumo', 'csv'))
+    with pytest.raises(ValueError):
+        next(exportar([], 'areas', 'ods'))
+    resposta = app.test_client().post('/api/exportar/resumo.csv', json=[])
+    assert resposta.status_code == 404
+
+
+@pytest.mark.parametrize('formato', ['csv', 'xlsx'])
+def test_api_exportar(selic_local, formato):
+    pytest.importorskip('openpyxl')
+    obras = carteira()
+
+    resposta = app.test_client().post(f'/api/exportar/financeira.{formato}', json={'obras': obras})
+
+    assert resposta.status_code == 200
+    assert resposta.is_streamed
+    assert resposta.headers['Content-Disposition'] == f'attachment; filename=financeira.{formato}'
+    resultados = [calcular_obra(obra, selic_local, detalhado=True) for obra in obras]
+    assert_mesma_tabela(LEITORES[formato](resposta.get_data()), esperado(resultados, 'financeira'), formato)
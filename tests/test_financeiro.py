@@ -0,0 +1,120 @@
+"""
+Testes dos totais da tabela financeira (`utils.financeiro.totais_financeiros`): devem ser, ao centavo,
+a linha "Total" da tabela exibida (`utils.tabelas.formatar_tabela_financeira`).
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.gerador import gerar_obra
+from utils.financeiro import calcular_financeiro, pagina_financeira, totais_carteira, totais_financeiros
+from utils.pipeline import calcular_obra
+from utils.selic import indice_para_mes, mes_para_indice
+from utils.tabelas import formatar_tabela_financeira
+
+from tests.casos import gerar_caso, taxas_aleatorias
+
+COLUNAS_TOTAIS = (('Remuneração', 'remuneracao'), ('Valor Atualizado', 'valor_atualizado'), ('Total', 'total'))
+
+
+def centavos_exibidos(texto):
+    """
+    Converte um valor formatado em reais ("R$ 1.245,50") de volta para centavos inteiros.
+    """
+    return int(texto.replace('R$ ', '').replace('.', '').replace(',', ''))
+
+
+def centavos(valor):
+    return int(round(valor * 100))
+
+
+def assert_igual_a_tabela(totais, financeiro):
+    tabela = formatar_tabela_financeira(financeiro)
+    mensais, linha_total = tabela.iloc[:-1], tabela.iloc[-1]
+    for coluna, chave in COLUNAS_TOTAIS:
+        exibido = centavos_exibidos(linha_total[coluna])
+        assert exibido == sum(map(centavos_exibidos, mensais[coluna])), coluna
+        assert centavos(totais[chave]) == exibido, coluna
+
+
+@pytest.mark.parametrize('semente', range(4))
+def test_totais_iguais_a_linha_total_da_tabela(semente):
+    aleatorio = random.Random(semente)
+    for _ in range(100):
+        inicio, fim, remuneracao, selic_rates = gerar_caso(aleatorio)
+        totais = totais_financeiros(inicio, fim, remuneracao, selic_rates)
+        assert_igual_a_tabela(totais, calcular_financeiro(inicio, fim, remuneracao, selic_rates))
+
+
+def test_periodo_longo_com_muitas_remuneracoes():
+    aleatorio = random.Random(0)
+    selic_rates = taxas_aleatorias(aleatorio)
+    remuneracoes = [round(10 ** aleatorio.uniform(2, 7), 2) for _ in range(200)]
+    totais = totais_financeiros('2015-02', '2024-12', remuneracoes, selic_rates)
+    for i, remuneracao in enumerate(remuneracoes):
+        assert_igual_a_tabela({chave: totais[chave][i] for _, chave in COLUNAS_TOTAIS},
+                              calcular_financeiro('2015-02', '2024-12', remuneracao, selic_rates))
+
+
+def test_remuneracoes_mes_a_mes():
+    aleatorio = random.Random(1)
+    selic_rates = taxas_aleatorias(aleatorio)
+    remuneracoes = np.round(np.array([[aleatorio.uniform(0, 1e5) for _ in range(36)] for _ in range(5)]), 2)
+    totais = totais_financeiros('2020-01', '2022-12', remuneracoes, selic_rates)
+    for i, linha in enumerate(remuneracoes):
+        assert_igual_a_tabela({chave: totais[chave][i] for _, chave in COLUNAS_TOTAIS},
+                              calcular_financeiro('2020-01', '2022-12', linha, selic_rates))
+
+    with pytest.raises(ValueError):
+        totais_financeiros('2020-01', '2022-11', remuneracoes, selic_rates)
+
+
+def test_totais_da_carteira():
+    aleatorio = random.Random(2)
+    selic_rates = taxas_aleatorias(aleatorio)
+    inicios, fins, remuneracoes = [], [], []
+    for _ in range(500):
+        inicio = mes_para_indice('2015-01') + aleatorio.randint(-12, 150)
+        inicios.append(indice_para_mes(inicio))
+        fins.append(indice_para_mes(inicio + aleatorio.randint(-1, 60)))
+        remuneracoes.append(round(aleatorio.uniform(1e3, 1e6), 2))
+
+    totais = totais_carteira(inicios, fins, remuneracoes, selic_rates)
+    for i in range(len(inicios)):
+        esperado = totais_financeiros(inicios[i], fins[i], remuneracoes[i], selic_rates)
+        assert totais['meses'][i] == esperado['meses']
+        for _, chave in COLUNAS_TOTAIS:
+            assert totais[chave][i] == esperado[chave]
+
+
+@pytest.mark.parametrize('remuneracao', [123456.78, np.round(np.linspace(1000, 9000, 120), 2)])
+def test_acumulado_das_paginas(remuneracao):
+    selic_rates = taxas_aleatorias(random.Random(3))
+    financeiro = calcular_financeiro('2015-01', '2024-12', remuneracao, selic_rates)
+    tabela = formatar_tabela_financeira(financeiro).iloc[:-1]
+    cursor, paginas = None, 0
+    while True:
+        pagina = pagina_financeira('2015-01', '2024-12', remuneracao, selic_rates, cursor=cursor, limite=25)
+        fim_pagina = pagina['acumulado']['meses']
+        for coluna, chave in COLUNAS_TOTAIS:
+            assert centavos(pagina['acumulado'][chave]) == sum(map(centavos_exibidos, tabela[coluna][:fim_pagina]))
+        paginas += 1
+        cursor = pagina['proximo']
+        if cursor is None:
+            break
+    assert paginas == 5
+
+
+@pytest.mark.parametrize('cronograma', ['obra', 'areas'])
+def test_totais_da_obra_iguais_aos_da_tabela(cronograma):
+    obra = {**gerar_obra(n_areas=6, n_meses=48), 'cronograma': cronograma}
+    for i, area in enumerate(obra['areas']):
+        # Fases escalonadas (ignoradas no cronograma único, que usa o período da obra)
+        area['mesInicio'] = indice_para_mes(mes_para_indice(obra['mesInicio']) + 6 * i)
+    selic_rates = taxas_aleatorias(random.Random(4), '2015-01', '2030-12')
+    resumo = calcular_obra(obra, selic_rates)
+    detalhado = calcular_obra(obra, selic_rates, detalhado=True)
+    assert resumo['financeiro'] == detalhado['financeiro']
+    assert_igual_a_tabela(resumo['financeiro'], detalhado['tabela_financeira'])
@@ -0,0 +1,102 @@
+"""
+Testes do grafo de etapas com recálculo incremental (`utils.grafo`) e das simulações em sessão
+(`POST /api/whatif`).
+"""
+
+import pytest
+
+from app import app
+from benchmarks.gerador import gerar_obra
+from utils.grafo import Etapa, Grafo, Sessao, SessoesCalculo
+from utils.pipeline import calcular_obra
+
+
+def grafo_contado(chamadas):
+    def contar(nome, funcao):
+        def executar(*argumentos):
+            chamadas.append(nome)
+            return funcao(*argumentos)
+        return executar
+
+    # Declaradas fora de ordem: o grafo as executa em ordem topológica
+    return Grafo([
+        Etapa('total', contar('total', lambda arredondado, taxa: arredondado * taxa), ('arredondado', 'taxa')),
+        Etapa('arredondado', contar('arredondado', round), ('valor',)),
+    ])
+
+
+def test_ordem_topologica_e_parametros():
+    grafo = grafo_contado([])
+    assert [etapa.nome for etapa in grafo.etapas] == ['arredondado', 'total']
+    assert grafo.parametros == ('taxa', 'valor')
+    assert grafo.executar({'valor': 2.4, 'taxa': 10})['total'] == 20
+    with pytest.raises(ValueError, match='taxa'):
+        grafo.executar({'valor': 2.4})
+
+
+def test_grafo_invalido():
+    with pytest.raises(ValueError, match='repetida'):
+        Grafo([Etapa('a', int, ('x',)), Etapa('a', int, ('y',))])
+    with pytest.raises(ValueError, match='Ciclo'):
+        Grafo([Etapa('a', int, ('b',)), Etapa('b', int, ('a',))])
+
+
+def test_sessao_recalcula_apenas_as_etapas_alteradas():
+    chamadas = []
+    grafo = grafo_contado(chamadas)
+    sessao = Sessao()
+
+    grafo.executar({'valor': 2.4, 'taxa': 10}, sessao=sessao)
+    assert sessao.recalculadas == ['arredondado', 'total']
+
+    grafo.executar({'valor': 2.4, 'taxa': 10}, sessao=sessao)
+    assert sessao.recalculadas == []
+
+    grafo.executar({'valor': 2.4, 'taxa': 20}, sessao=sessao)
+    assert sessao.recalculadas == ['total']
+
+    # O valor muda, mas o arredondado não: a etapa seguinte é poupada
+    assert grafo.executar({'valor': 2.2, 'taxa': 20}, sessao=sessao)['total'] == 40
+    assert sessao.recalculadas == ['arredondado']
+    assert chamadas == ['arredondado', 'total', 'total', 'arredondado']
+
+
+def test_sessao_da_obra_da_o_mesmo_resultado_do_calculo_completo(selic_local):
+    obra = gerar_obra()
+    sessao = Sessao()
+    calcular_obra(obra, sessao=sessao)
+
+    variacoes = [
+        ({**obra, 'fatorAjuste': 40}, ['afericao', 'rmt_ajustado', 'totais_financeiros']),
+        ({**obra, 'fatorAjuste': 40, 'honorarios': 20}, ['inss']),
+        # O período muda as taxas e a tabela financeira, não a aferição (que usa os meses de execução)
+        ({**obra, 'fatorAjuste': 40, 'honorarios': 20, 'mesFim': '2021-06'}, ['selic', 'totais_financeiros']),
+    ]
+    for variacao, recalculadas in variacoes:
+        assert calcular_obra(variacao, sessao=sessao) == calcular_obra(variacao)
+        assert sessao.recalculadas == recalculadas
+
+
+def test_api_whatif_mantem_a_sessao(selic_local):
+    cliente = app.test_client()
+    obra = gerar_obra()
+
+    primeira = cliente.post('/api/whatif', json={'obra': obra}).get_json()
+    segunda = cliente.post('/api/whatif', json={'sessao': primeira['sessao'],
+                                                'obra': {**obra, 'honorarios': 10}}).get_json()
+
+    assert segunda['sessao'] == primeira['sessao']
+    assert segunda['recalculadas'] == ['inss']
+    assert segunda['inss'] != primeira['inss'] and segunda['financeiro'] == primeira['financeiro']
+
+    invalida = cliente.post('/api/whatif', json={'sessao': primeira['sessao'], 'obra': {**obra, 'fatorAjuste': 'x'}})
+    assert invalida.status_code == 400
+    assert invalida.get_json()['sessao'] == primeira['sessao']
+
+
+def test_sessoes_com_descarte_lru():
+    sessoes = SessoesCalculo(tamanho=2)
+    a, b = sessoes.obter(), sessoes.obter()
+    assert sessoes.obter(a.id) is a
+    sessoes.obter()
+    assert sessoes.obter(b.id) is not b  # Descartada: uma nova sessão é criada
@@ -0,0 +1,10 @@
+"""
+Orçamento do tempo de inicialização da aplicação (ver `benchmarks/importacao.py`).
+"""
+
+from benchmarks.importacao import verificar
+
+
+def test_importacao_dentro_do_orcamento():
+    linhas, falhas = verificar()
+    assert not falhas, '\n'.join(linhas + falhas)
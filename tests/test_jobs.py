@@ -0,0 +1,98 @@
+"""
+Testes da fila de jobs em SQLite (`utils.jobs`): retomada dos jobs abandonados por um worker que parou
+e início das threads trabalhadoras pela aplicação.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils.jobs import CONCLUIDO, ERRO, EXECUTANDO, TENTATIVAS_MAXIMAS, FilaJobs
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def executor(tipo, entrada, progresso):
+    return json.dumps(entrada).encode()
+
+
+def abandonar(fila, id, tentativas):
+    """
+    Deixa o job como se o worker que o executava tivesse parado há 10 segundos.
+    """
+    fila._atualizar("UPDATE jobs SET estado = ?, tentativas = ?, iniciado_em = ?, sinal_em = ? WHERE id = ?",
+                    (EXECUTANDO, tentativas, time.time() - 10, time.time() - 10, id))
+
+
+def esperar_estado(fila, id, estado, limite=10.0):
+    fim = time.monotonic() + limite
+    while fila.estado(id)['estado'] != estado and time.monotonic() < fim:
+        time.sleep(0.05)
+    return fila.estado(id)
+
+
+def test_job_abandonado_volta_para_a_fila_e_executa(tmp_path):
+    caminho = str(tmp_path / 'jobs.sqlite3')
+    anterior = FilaJobs(caminho, timeout=1, executor=executor)
+    abandonado, _ = anterior.submeter('calcular', {'obra': 1})
+    abandonar(anterior, abandonado, 1)
+    pendente, _ = anterior.submeter('calcular', {'obra': 2})
+
+    # Reinício: uma nova fila sobre o mesmo arquivo retoma os dois jobs sem nova submissão
+    fila = FilaJobs(caminho, timeout=1, executor=executor)
+    fila.iniciar(1)
+    try:
+        estado = esperar_estado(fila, abandonado, CONCLUIDO)
+        assert estado['tentativas'] == 2
+        assert json.loads(fila.resultado(abandonado)) == {'obra': 1}
+        assert esperar_estado(fila, pendente, CONCLUIDO)['tentativas'] == 1
+    finally:
+        fila.parar()
+
+
+def test_job_com_sinal_de_vida_recente_nao_e_retomado():
+    fila = FilaJobs(':memory:', timeout=60, executor=executor)
+    id, _ = fila.submeter('calcular', {'obra': 1})
+    abandonar(fila, id, 1)
+
+    assert fila.recuperar() == 0
+    assert not fila.processar_proximo()
+    assert fila.estado(id)['estado'] == EXECUTANDO
+
+
+@pytest.mark.parametrize('retomar', [FilaJobs.recuperar, FilaJobs.processar_proximo])
+def test_job_que_esgotou_as_tentativas_termina_com_erro(retomar):
+    fila = FilaJobs(':memory:', timeout=1, executor=executor)
+    id, _ = fila.submeter('calcular', {'obra': 1})
+    abandonar(fila, id, TENTATIVAS_MAXIMAS)
+
+    assert not retomar(fila)
+    estado = fila.estado(id)
+    assert estado['estado'] == ERRO
+    assert estado['erro'] == "Job interrompido repetidamente"
+    assert estado['tentativas'] == TENTATIVAS_MAXIMAS
+    assert fila.resultado(id) is None
+
+
+_THREADS_DA_FILA = """
+import json, threading
+import app
+antes = [t.name for t in threading.enumerate() if t.name.startswith('jobs-')]
+app.app.test_client().get('/')
+depois = [t.name for t in threading.enumerate() if t.name.startswith('jobs-')]
+print(json.dumps({'antes': antes, 'depois': sorted(depois)}))
+"""
+
+
+@pytest.mark.parametrize('workers, esperadas', [('0', []), ('2', ['jobs-0', 'jobs-1'])])
+def test_importar_app_nao_inicia_a_fila(tmp_path, workers, esperadas):
+    ambiente = {**os.environ, 'INSS_JOBS_DB': str(tmp_path / 'jobs.sqlite3'), 'INSS_JOBS_WORKERS': workers}
+    saida = subprocess.run([sys.executable, '-c', _THREADS_DA_FILA], cwd=RAIZ, env=ambiente, capture_output=True,
+                           text=True, check=True)
+    threads = json.loads(saida.stdout.strip().splitlines()[-1])
+    assert threads['antes'] == []
+    assert threads['depois'] == esperadas
@@ -0,0 +1,77 @@
+"""
+Testes do cálculo em lote (`utils.lote` e `POST /api/batch`): os resultados de uma carteira devem ser
+os do cálculo obra a obra, na mesma ordem, com as obras inválidas reportadas sem interromper o lote.
+"""
+
+import json
+
+import pytest
+
+from app import app
+from benchmarks.gerador import gerar_obra
+from utils import lote
+from utils.lote import calcular_lote, iterar_lote
+from utils.pipeline import calcular_obra
+
+
+def carteira(n):
+    obras = [gerar_obra(n_areas=1 + i % 4, n_meses=6 + i % 30, semente=i) for i in range(n)]
+    obras[3] = {**obras[3], 'fatorAjuste': 'cinquenta'}
+    obras[5] = {**obras[5], 'mesInicio': '2021/01'}
+    return obras
+
+
+def assert_resultado_da_obra(resultado, obra, selic_rates):
+    esperado = calcular_obra(obra, selic_rates)
+    assert json.dumps(resultado, sort_keys=True) == json.dumps(esperado, sort_keys=True)
+
+
+def assert_obra_invalida(resultado, obra, campo):
+    assert resultado['identificacao'] == obra['identificacao']
+    assert resultado['erro'].startswith('ErroValidacao')
+    assert [erro['campo'] for erro in resultado['erros']] == [campo]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_lote_igual_ao_calculo_obra_a_obra(monkeypatch, selic_local, workers):
+    monkeypatch.setattr(lote, 'LOTE_MINIMO_PARALELO', 4)
+    obras = carteira(12)
+
+    resultados = calcular_lote(obras, workers=workers)
+
+    assert len(resultados) == len(obras)
+    assert_obra_invalida(resultados[3], obras[3], 'fatorAjuste')
+    assert_obra_invalida(resultados[5], obras[5], 'mesInicio')
+    for i, (resultado, obra) in enumerate(zip(resultados, obras)):
+        if i not in (3, 5):
+            assert_resultado_da_obra(resultado, obra, selic_local)
+
+
+def test_iterar_lote_em_blocos_preserva_a_ordem(selic_local):
+    obras = carteira(10)
+    assert list(iterar_lote(iter(obras), workers=1, bloco=3)) == calcular_lote(obras, workers=1)
+
+
+@pytest.mark.parametrize('ndjson', [False, True])
+def test_api_batch(selic_local, ndjson):
+    obras = carteira(6)
+    if ndjson:
+        resposta = app.test_client().post('/api/batch', data=''.join(json.dumps(obra) + '\n' for obra in obras),
+                                          content_type='application/x-ndjson')
+        resultados = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    else:
+        resposta = app.test_client().post('/api/batch', json={'obras': obras})
+        resultados = resposta.get_json()['resultados']
+
+    assert resposta.status_code == 200
+    assert len(resultados) == len(obras)
+    assert_obra_invalida(resultados[3], obras[3], 'fatorAjuste')
+    assert_obra_invalida(resultados[5], obras[5], 'mesInicio')
+    assert_resultado_da_obra(resultados[0], obras[0], selic_local)
+
+
+@pytest.mark.parametrize('corpo', ['"texto"', '{"obras": 1}', '[{"areas": []}'])
+def test_api_batch_rejeita_corpo_invalido(corpo):
+    resposta = app.test_client().post('/api/batch', data=corpo, content_type='application/json')
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro'].startswith('Entrada inválida')
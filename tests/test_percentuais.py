@@ -0,0 +1,73 @@
+"""
+Testes da tabela compacta de percentuais por UF e destinação (`utils.percentuais`): as consultas devem
+dar os mesmos valores de um dicionário {UF: {destinação: percentual}} lido do CSV.
+"""
+
+import csv
+
+import numpy as np
+import pytest
+
+from utils.percentuais import CAMINHO_PADRAO, TabelaPercentuais, carregar_percentuais, dados_percentuais
+
+
+def ler_dicionario(caminho):
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        return {linha.pop('UF'): {destinacao: float(valor) for destinacao, valor in linha.items() if valor}
+                for linha in csv.DictReader(arquivo)}
+
+
+ORIGINAL = ler_dicionario(CAMINHO_PADRAO)
+PARCIAL = {
+    'AA': {'Casa': 1.5, 'Galpão': 2.0},
+    'BB': {'Casa': 1.5, 'Galpão': 2.0},
+    'CC': {'Casa': 3.25},
+    'DD': {'Galpão': 2.0, 'Casa': 1.5},
+}
+
+
+@pytest.mark.parametrize('original', [ORIGINAL, PARCIAL])
+def test_acesso_como_dicionario(original):
+    tabela = dados_percentuais if original is ORIGINAL else TabelaPercentuais(original)
+
+    assert list(tabela) == list(original)
+    assert {uf: dict(tabela[uf]) for uf in tabela} == original
+    for uf, linha in original.items():
+        assert len(tabela[uf]) == len(linha)
+        assert tabela.get(uf, {}).get('Inexistente', 0) == 0
+    with pytest.raises(KeyError):
+        tabela['ZZ']
+    with pytest.raises(KeyError):
+        TabelaPercentuais(PARCIAL)['CC']['Galpão']
+
+
+def test_linhas_iguais_armazenadas_uma_vez():
+    tabela = TabelaPercentuais(PARCIAL)
+
+    assert tabela.matriz.shape == (2, 2)
+    assert tabela.linha_da_uf[0] == tabela.linha_da_uf[1] == tabela.linha_da_uf[3] != tabela.linha_da_uf[2]
+    assert len(dados_percentuais.matriz) <= len(ORIGINAL)
+
+
+@pytest.mark.parametrize('original', [ORIGINAL, PARCIAL])
+def test_consultas_escalares_e_por_coluna(original):
+    tabela = dados_percentuais if original is ORIGINAL else TabelaPercentuais(original)
+    ufs = list(original) + ['ZZ']
+    destinacoes = sorted({d for linha in original.values() for d in linha}) + ['Inexistente']
+    pares = [(uf, destinacao) for uf in ufs for destinacao in destinacoes]
+
+    esperados = [original.get(uf, {}).get(destinacao, -1.0) for uf, destinacao in pares]
+    assert [tabela.percentual(uf, destinacao, padrao=-1.0) for uf, destinacao in pares] == esperados
+    obtidos = tabela.percentuais([uf for uf, _ in pares], [destinacao for _, destinacao in pares], padrao=-1.0)
+    np.testing.assert_array_equal(obtidos, esperados)
+
+
+def test_csv_e_versao(tmp_path):
+    caminho = tmp_path / 'percentuais.csv'
+    caminho.write_text('UF,Casa,Galpão\nAA,1.5,2\nCC,3.25,\n', encoding='utf-8')
+    tabela = carregar_percentuais(str(caminho))
+
+    assert {uf: dict(tabela[uf]) for uf in tabela} == {'AA': {'Casa': 1.5, 'Galpão': 2.0}, 'CC': {'Casa': 3.25}}
+    # A versão identifica os valores (entra na chave do cache): muda quando um percentual muda
+    assert tabela.versao == TabelaPercentuais({'AA': {'Casa': 1.5, 'Galpão': 2.0}, 'CC': {'Casa': 3.25}}).versao
+    assert tabela.versao != TabelaPercentuais({'AA': {'Casa': 1.5, 'Galpão': 2.5}, 'CC': {'Casa': 3.25}}).versao
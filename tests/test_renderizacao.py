@@ -0,0 +1,61 @@
+"""
+Testes da renderização das tabelas de resultado (`utils.renderizacao.tabela_html`): o HTML deve ser
+byte a byte o de `DataFrame.to_html(index=False)`.
+"""
+
+import random
+
+import pandas as pd
+import pytest
+
+from utils.financeiro import calcular_financeiro
+from utils.renderizacao import tabela_html
+from utils.tabelas import formatar_tabela_financeira
+
+from tests.casos import gerar_caso
+
+CLASSES = 'table table-striped'
+TEXTOS = ('Obra Nova', '  dois  espaços ', 'R$ 1.234,56', '<b>A & B</b>', 'a\tb\nc\r', '', 'ção', '"aspas"')
+
+
+def gerar_tabela(aleatorio):
+    """
+    Gera uma tabela aleatória com colunas de texto, inteiros e floats (com NaN, infinitos e valores
+    muito pequenos ou muito grandes).
+    """
+    def numero():
+        sorteio = aleatorio.random()
+        if sorteio < 0.1:
+            return float('nan')
+        if sorteio < 0.15:
+            return aleatorio.choice([1e-7, 1e12, -0.0, 0.0, float('inf'), 12345678901.5, 1234567890.5])
+        return round(aleatorio.uniform(-1e5, 1e7), aleatorio.randint(0, 8))
+
+    linhas = aleatorio.randint(0, 6)
+    colunas = {}
+    for i in range(aleatorio.randint(0, 5)):
+        nome = f"{aleatorio.choice(TEXTOS)}{i}"
+        sorteio = aleatorio.random()
+        if sorteio < 0.4:
+            colunas[nome] = [numero() for _ in range(linhas)]
+        elif sorteio < 0.5:
+            colunas[nome] = [aleatorio.randint(-10, 10 ** 6) for _ in range(linhas)]
+        else:
+            colunas[nome] = [aleatorio.choice(TEXTOS + (None,)) for _ in range(linhas)]
+    return pd.DataFrame(colunas)
+
+
+@pytest.mark.parametrize('semente', range(4))
+def test_tabelas_aleatorias_iguais_ao_to_html(semente):
+    aleatorio = random.Random(semente)
+    for _ in range(100):
+        tabela = gerar_tabela(aleatorio)
+        assert tabela_html(tabela, CLASSES) == tabela.to_html(classes=CLASSES, index=False), list(tabela.columns)
+
+
+def test_tabelas_financeiras_iguais_ao_to_html():
+    aleatorio = random.Random(0)
+    for _ in range(20):
+        inicio, fim, remuneracao, selic_rates = gerar_caso(aleatorio)
+        tabela = formatar_tabela_financeira(calcular_financeiro(inicio, fim, remuneracao, selic_rates))
+        assert tabela_html(tabela, CLASSES) == tabela.to_html(classes=CLASSES, index=False)
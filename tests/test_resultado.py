@@ -0,0 +1,107 @@
+"""
+Testes da página de resultado em cache (`GET /resultado/<chave>`): ETag e 304, compressão gzip/brotli
+(`utils.respostas`) e arquivos estáticos com impressão digital em `/assets/`.
+"""
+
+import gzip
+
+import pytest
+
+from app import app
+from utils import respostas
+from utils.cache import CacheResultados
+
+FORMULARIO = {
+    'identificacao[]': ['A1', 'A2'],
+    'categoria[]': ['Obra Nova', 'Reforma'],
+    'material[]': ['Alvenaria', 'Madeira'],
+    'tipoArea[]': ['Principal', 'Principal'],
+    'areaTotal[]': ['150', '320.5'],
+    'CUB[]': ['2100.5', '2300'],
+    'uf[]': ['SP', 'RJ'],
+    'concretoUsinado[]': ['Sim', 'Não'],
+    'destinacao[]': ['Residencial Unifamiliar', 'Comercial Salas e Lojas'],
+    'valorNotasFiscais[]': ['1000', '0'],
+    'areaAferida[]': ['140', '300'],
+    'fatorAjuste': '45', 'mesesExecucao': '10',
+    'mesInicio': '2022-03', 'mesFim': '2023-07',
+}
+
+
+@pytest.fixture
+def cliente(monkeypatch, selic_local):
+    monkeypatch.setattr('utils.cache._cache_padrao', CacheResultados())
+    return app.test_client()
+
+
+@pytest.fixture
+def pagina(cliente):
+    resposta = cliente.post('/submit', data=FORMULARIO)
+    assert resposta.status_code == 200
+    chave, _ = resposta.get_etag()
+    assert resposta.headers['Content-Location'] == f'/resultado/{chave}'
+    return chave, resposta.get_data()
+
+
+def test_resultado_responde_304_com_o_etag(cliente, pagina):
+    chave, html = pagina
+
+    resposta = cliente.get(f'/resultado/{chave}')
+    assert resposta.status_code == 200
+    assert resposta.get_data() == html
+    assert resposta.get_etag() == (chave, False)
+    assert resposta.cache_control.private and resposta.cache_control.max_age > 0
+
+    resposta = cliente.get(f'/resultado/{chave}', headers={'If-None-Match': f'"{chave}"'})
+    assert resposta.status_code == 304
+    assert resposta.get_data() == b''
+    assert resposta.get_etag() == (chave, False)
+
+    assert cliente.get('/resultado/inexistente').status_code == 404
+
+
+def test_resultado_comprimido_com_gzip(cliente, pagina):
+    chave, html = pagina
+
+    resposta = cliente.get(f'/resultado/{chave}', headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resposta.vary
+    assert gzip.decompress(resposta.get_data()) == html
+    # O corpo comprimido não é o representado pelo ETag forte: ele passa a ser fraco
+    assert resposta.get_etag() == (chave, True)
+
+    resposta = cliente.get(f'/resultado/{chave}', headers={'Accept-Encoding': 'gzip',
+                                                           'If-None-Match': f'W/"{chave}"'})
+    assert resposta.status_code == 304
+
+
+def test_resultado_comprimido_com_brotli(cliente, pagina):
+    brotli = pytest.importorskip('brotli')
+    chave, html = pagina
+
+    resposta = cliente.get(f'/resultado/{chave}', headers={'Accept-Encoding': 'gzip, br'})
+    assert resposta.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(resposta.get_data()) == html
+
+
+def test_sem_brotli_usa_gzip(monkeypatch, cliente, pagina):
+    monkeypatch.setattr(respostas, 'CODIFICACOES', ('gzip',))
+    chave, html = pagina
+
+    resposta = cliente.get(f'/resultado/{chave}', headers={'Accept-Encoding': 'br, gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(resposta.get_data()) == html
+
+
+def test_estaticos_com_impressao_digital(cliente):
+    html = cliente.get('/').get_data(as_text=True)
+    with app.app_context():
+        from app import estatico
+        url = estatico('styles.css')
+    assert url.startswith('/assets/styles.') and url in html
+
+    resposta = cliente.get(url)
+    assert resposta.status_code == 200
+    assert resposta.cache_control.immutable
+    with open(f'{app.static_folder}/styles.css', 'rb') as arquivo:
+        assert resposta.get_data() == arquivo.read()
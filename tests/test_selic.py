@@ -0,0 +1,96 @@
+"""
+Testes do armazenamento local das taxas SELIC (`utils.selic.SelicStore`) contra um servidor SGS falso.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from utils import selic
+from utils.selic import SelicStore
+
+from tests.sgs_falso import ServidorSgsFalso
+
+TAXAS = {f"2022-{mes:02d}": round(0.7 + mes / 100, 2) for mes in range(1, 13)}
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    with ServidorSgsFalso(TAXAS) as servidor:
+        monkeypatch.setattr(selic, 'SGS_URL', servidor.url)
+        yield servidor
+
+
+def mes_corrente():
+    return datetime.now().strftime("%Y-%m")
+
+
+def test_busca_apenas_os_meses_faltantes(servidor):
+    store = SelicStore(':memory:')
+    store.importar({mes: TAXAS[mes] for mes in ('2022-01', '2022-02', '2022-03')})
+
+    assert store.obter('2022-01', '2022-06') == {mes: TAXAS[mes] for mes in sorted(TAXAS)[:6]}
+    assert servidor.consultas == [('2022-04', '2022-06')]
+
+    # Meses fechados e publicados são definitivos: uma nova consulta não vai à API
+    assert store.obter('2022-02', '2022-05') == {mes: TAXAS[mes] for mes in sorted(TAXAS)[1:5]}
+    assert servidor.consultas == [('2022-04', '2022-06')]
+
+
+def test_meses_expirados_sao_reconsultados(servidor):
+    mes = mes_corrente()
+    servidor.taxas[mes] = 0.95
+
+    store = SelicStore(':memory:', ttl=3600)
+    store.importar({mes: 0.9})
+    assert store.obter(mes, mes) == {mes: 0.9}  # Dentro do TTL: serve o valor local
+    assert servidor.consultas == []
+
+    store.ttl = 0
+    assert store.obter(mes, mes) == {mes: 0.95}
+    assert servidor.consultas == [(mes, mes)]
+
+
+def test_mes_nao_publicado_e_gravado_e_reconsultado_apos_o_ttl(servidor):
+    mes = mes_corrente()
+    store = SelicStore(':memory:', ttl=3600)
+
+    assert store.obter(mes, mes) == {}
+    assert store.obter(mes, mes) == {}
+    assert servidor.consultas == [(mes, mes)]
+
+    store.ttl = 0
+    servidor.taxas[mes] = 0.8
+    assert store.obter(mes, mes) == {mes: 0.8}
+    assert len(servidor.consultas) == 2
+
+
+@pytest.mark.parametrize('status', [500, 503])
+def test_serve_dados_vencidos_quando_a_api_falha(monkeypatch, status):
+    mes = mes_corrente()
+    with ServidorSgsFalso({mes: 0.95}, status=status) as servidor:
+        monkeypatch.setattr(selic, 'SGS_URL', servidor.url)
+        store = SelicStore(':memory:', ttl=0)
+        store.importar({mes: 0.9})
+
+        assert store.obter(mes, mes) == {mes: 0.9}
+        assert servidor.consultas == [(mes, mes)]
+
+
+def test_serve_dados_vencidos_quando_a_api_esta_inacessivel(monkeypatch):
+    with ServidorSgsFalso({}) as servidor:
+        url = servidor.url
+    monkeypatch.setattr(selic, 'SGS_URL', url)  # Porta já fechada: conexão recusada
+    mes = mes_corrente()
+    store = SelicStore(':memory:', ttl=0, timeout=1)
+    store.importar({mes: 0.9})
+
+    assert store.obter(mes, mes) == {mes: 0.9}
+
+
+def test_offline_nunca_consulta_a_api(servidor):
+    store = SelicStore(':memory:', offline=True)
+    store.importar({'2022-01': TAXAS['2022-01']})
+
+    assert store.obter('2022-01', '2022-03') == {'2022-01': TAXAS['2022-01']}
+    assert servidor.consultas == []
@@ -0,0 +1,145 @@
+"""
+Testes da consulta assíncrona das taxas SELIC (`utils.selic_async`) e do modo ASGI contra um servidor
+SGS falso.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from utils import selic
+from utils.selic import SelicStore
+from utils.selic_async import SelicAsync
+
+from tests.sgs_falso import ServidorSgsFalso
+
+TAXAS = {f"2021-{mes:02d}": round(0.1 + mes / 10, 2) for mes in range(1, 13)}
+
+
+def executar(corrotina):
+    return asyncio.run(corrotina)
+
+
+async def obter_e_fechar(cliente, *periodos):
+    try:
+        return await asyncio.gather(*(cliente.obter(inicio, fim) for inicio, fim in periodos))
+    finally:
+        await cliente.fechar()
+
+
+def test_requisicoes_simultaneas_compartilham_uma_busca(monkeypatch):
+    with ServidorSgsFalso(TAXAS, atraso=0.2) as servidor:
+        monkeypatch.setattr(selic, 'SGS_URL', servidor.url)
+        store = SelicStore(':memory:')
+
+        resultados = executar(obter_e_fechar(SelicAsync(store), *[('2021-01', '2021-06')] * 5))
+
+        assert servidor.consultas == [('2021-01', '2021-06')]
+        assert all(resultado == {mes: TAXAS[mes] for mes in sorted(TAXAS)[:6]} for resultado in resultados)
+        # O handler síncrono encontra as taxas em memória
+        assert store.obter('2021-01', '2021-06') == resultados[0]
+        assert len(servidor.consultas) == 1
+
+
+def test_falha_assincrona_nao_repete_a_busca_no_handler_sincrono(monkeypatch):
+    mes = datetime.now().strftime("%Y-%m")
+    with ServidorSgsFalso({mes: 0.95}, status=500, atraso=0.2) as servidor:
+        monkeypatch.setattr(selic, 'SGS_URL', servidor.url)
+        store = SelicStore(':memory:', ttl=0, backoff=60)
+        store.importar({mes: 0.9})
+
+        assert executar(obter_e_fechar(SelicAsync(store), (mes, mes))) == [{mes: 0.9}]
+        assert len(servidor.consultas) == 1
+
+        antes = time.perf_counter()
+        assert store.obter(mes, mes) == {mes: 0.9}
+        assert time.perf_counter() - antes < 0.1
+        assert len(servidor.consultas) == 1
+
+        # Passado o intervalo, a API volta a ser consultada
+        store.backoff = 0
+        servidor.status = 200
+        assert store.obter(mes, mes) == {mes: 0.95}
+        assert len(servidor.consultas) == 2
+
+
+OBRA = {
+    'identificacao': 'O1', 'fatorAjuste': 50, 'mesesExecucao': 6,
+    'mesInicio': '2021-03', 'mesFim': '2021-08',
+    'areas': [{'categoria': 'Obra Nova', 'material': 'Alvenaria', 'tipoArea': 'Principal',
+               'areaTotal': 100, 'CUB': 2000, 'uf': 'SP', 'concretoUsinado': 'Sim',
+               'destinacao': 'Residencial Unifamiliar', 'areaAferida': 100}],
+}
+FORMULARIO = {'mesInicio': OBRA['mesInicio'], 'mesFim': OBRA['mesFim'], 'fatorAjuste': OBRA['fatorAjuste'],
+              'mesesExecucao': OBRA['mesesExecucao'],
+              **{f'{campo}[]': valor for campo, valor in OBRA['areas'][0].items()}}
+
+# (caminho, content-type, corpo) de cada rota que calcula obras
+REQUISICOES = [
+    ('/submit', 'application/x-www-form-urlencoded', urlencode(FORMULARIO)),
+    ('/api/calcular', 'application/json', json.dumps(OBRA)),
+    ('/api/financeira', 'application/json', json.dumps(OBRA)),
+    ('/api/whatif', 'application/json', json.dumps({'obra': OBRA})),
+    ('/api/cenarios', 'application/json', json.dumps({'obra': OBRA, 'fatoresAjuste': [40, 50]})),
+    ('/api/batch', 'application/json', json.dumps([OBRA])),
+    ('/api/batch', 'application/x-ndjson', json.dumps(OBRA) + '\n'),
+    ('/api/jobs', 'application/json', json.dumps(OBRA)),
+    ('/api/exportar/financeira.csv', 'application/json', json.dumps({'obras': [OBRA]})),
+]
+
+
+def requisitar_asgi(aplicacao, caminho, tipo, corpo):
+    mensagens = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': corpo.encode(), 'more_body': False}
+
+    async def send(mensagem):
+        mensagens.append(mensagem)
+
+    async def requisitar():
+        try:
+            await aplicacao({'type': 'http', 'method': 'POST', 'path': caminho,
+                             'headers': [(b'content-type', tipo.encode())]}, receive, send)
+        finally:
+            await aplicacao.selic.fechar()
+
+    executar(requisitar())
+    return mensagens[0]['status']
+
+
+@pytest.mark.parametrize('caminho, tipo, corpo', REQUISICOES)
+def test_asgi_pre_busca_as_taxas_do_calculo(monkeypatch, caminho, tipo, corpo):
+    import asgi
+    from utils import jobs
+
+    fila = jobs.FilaJobs(':memory:', executor=lambda tipo, entrada, progresso: b'{}')
+    monkeypatch.setattr(jobs, '_fila_padrao', fila)
+    with ServidorSgsFalso(TAXAS) as servidor:
+        monkeypatch.setattr(selic, 'SGS_URL', servidor.url)
+        store = SelicStore(':memory:')
+        monkeypatch.setattr(selic, '_store_padrao', store)
+        aplicacao = asgi.AppAsgi(asgi.flask_app, selic=SelicAsync(store), threads=2)
+
+        try:
+            status = requisitar_asgi(aplicacao, caminho, tipo, corpo)
+        finally:
+            fila.parar()
+
+        assert status < 400
+        assert servidor.consultas == [('2021-02', '2021-08')]
+
+
+def test_asgi_nao_pre_busca_fora_das_rotas_de_calculo():
+    import asgi
+
+    assert asgi.formato_pre_busca(asgi.flask_app, 'POST', '/api/estimativa') is None
+    assert asgi.formato_pre_busca(asgi.flask_app, 'GET', '/api/calcular') is None
+    assert asgi.formato_pre_busca(asgi.flask_app, 'POST', '/inexistente') is None
+    assert asgi.formato_pre_busca(asgi.flask_app, 'POST', '/api/exportar/resumo.xlsx') == 'lote'
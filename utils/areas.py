@@ -0,0 +1,187 @@
+"""
+Cálculo colunar da tabela de áreas.
+
+Processa todas as áreas de uma vez, como colunas (DataFrame ou arrays), em vez de um laço por área.
+As consultas às tabelas de percentuais são feitas uma única vez por valor distinto e espalhadas para
+as linhas por índice, e a acumulação por destinação usa um agrupamento vetorizado.
+
+O resultado é um dicionário de colunas tipadas, com os mesmos nomes da tabela exibida. A formatação
+para exibição é uma visão opcional (ver `utils.tabelas.formatar_tabela_areas`).
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.calculos import (
+    calcular_vau,
+    calcular_percentual_equivalencia,
+    calcular_fator_social,
+    calcular_percentual_mao_de_obra,
+    calcular_percentual_por_categoria,
+    calcular_percentual_categoria_remuneracao
+)
+from utils.percentuais import dados_percentuais
+
+COLUNAS_OPCIONAIS = ['Área Total', 'Área Total Aferida', 'Área em Aferição']
+
+# Colunas sem valor informado assumem o mesmo padrão usado no cálculo por área
+PADROES = {
+    'Tipo area': 'Principal',
+    'Cobertura': 'Coberta',
+    'Concreto usinado': 'Não',
+}
+
+
+def _colunas(areas, nomes):
+    """
+    Extrai as colunas `nomes` de um DataFrame, dicionário de arrays ou lista de dicionários,
+    retornando um dicionário de arrays NumPy. Colunas ausentes ficam de fora do resultado,
+    e valores ausentes em colunas com padrão recebem o padrão.
+    """
+    if isinstance(areas, pd.DataFrame):
+        colunas = {nome: areas[nome].to_numpy() for nome in nomes if nome in areas.columns}
+    elif isinstance(areas, dict):
+        # Listas (ex.: de `utils.pipeline.montar_dados_areas`) viram arrays de objetos, como no caso
+        # da lista de dicionários
+        colunas = {nome: areas[nome] if isinstance(areas[nome], np.ndarray) else np.array(areas[nome], dtype=object)
+                   for nome in nomes if nome in areas}
+    else:
+        presentes = {chave for area in areas for chave in area}
+        colunas = {nome: np.array([area.get(nome, PADROES.get(nome)) for area in areas], dtype=object)
+                   for nome in nomes if nome in presentes}
+
+    for nome, padrao in PADROES.items():
+        if nome in colunas:
+            coluna = colunas[nome].astype(object)
+            coluna[pd.isna(coluna)] = padrao
+            colunas[nome] = coluna
+    return colunas
+
+
+def _aplicar_por_valor(funcao, *colunas):
+    """
+    Aplica `funcao` uma única vez para cada combinação distinta dos valores das colunas e
+    retorna o resultado alinhado às linhas.
+    """
+    unicos = {}
+    codigos = np.fromiter((unicos.setdefault(chave, len(unicos)) for chave in zip(*colunas)),
+                          dtype=np.intp, count=len(colunas[0]))
+    return np.asarray([funcao(*chave) for chave in unicos])[codigos]
+
+
+def ordem_areas(destinacao):
+    """
+    Ordem das áreas na tabela de áreas (`calcular_areas`): agrupadas por destinação, na ordem em que
+    cada destinação aparece, preservando a ordem das áreas dentro de cada grupo.
+
+    Returns:
+        ndarray: Índices das áreas (na ordem recebida) em cada linha da tabela.
+    """
+    grupo = pd.factorize(np.asarray(destinacao, dtype=object))[0]
+    return np.argsort(grupo, kind='stable')
+
+
+def calcular_areas(areas):
+    """
+    Calcula, de forma colunar, os valores da tabela de áreas (custo da obra, RMT, crédito de
+    remuneração etc.), agrupando as áreas por destinação.
+
+    Args:
+        areas (DataFrame | dict | list): Áreas com as colunas 'Identificação', 'Categoria', 'Material',
+            'Tipo area', 'CUB', 'UF', 'Concreto usinado', 'destinacao', 'valor_notas_fiscais' e
+            'Área Total Aferida para Cálculo'. Aceita um DataFrame, um dicionário de arrays ou uma
+            lista de dicionários.
+
+    Returns:
+        dict: Colunas (arrays NumPy) com uma linha por área, na ordem da tabela exibida (agrupada
+              por destinação). Numéricas para os valores calculados; `pd.DataFrame(resultado)`
+              produz a tabela tipada. Vazio quando não há áreas.
+    """
+    colunas = _colunas(areas, ['Identificação', 'Categoria', 'Material', 'Tipo area', 'CUB', 'UF',
+                               'Concreto usinado', 'destinacao', 'valor_notas_fiscais', 'Cobertura',
+                               'Custo da Obra por Destinação', 'Área Total Aferida para Cálculo']
+                       + COLUNAS_OPCIONAIS)
+    n = len(next(iter(areas.values()), [])) if isinstance(areas, dict) else len(areas)
+    if n == 0:
+        return {}
+
+    destinacao = colunas['destinacao']
+    categoria = colunas['Categoria']
+    material = colunas['Material']
+    tipo_area = colunas.get('Tipo area', np.full(n, 'Principal', dtype=object))
+    area_aferida = colunas['Área Total Aferida para Cálculo'].astype(float)
+    cub = colunas['CUB'].astype(float)
+
+    # Agrupamento por destinação, na ordem em que cada destinação aparece
+    grupo, destinacoes = pd.factorize(destinacao)
+    grupo = grupo.astype(np.intp)
+    area_total_grupo = np.bincount(grupo, weights=area_aferida, minlength=len(destinacoes))
+    vau_grupo = np.array([calcular_vau(cub[i]) for i in np.unique(grupo, return_index=True)[1]])
+    equivalencia_grupo = np.array([calcular_percentual_equivalencia(area, dest)
+                                   for area, dest in zip(area_total_grupo.tolist(), destinacoes)])
+    fator_social_grupo = np.array([calcular_fator_social(area) for area in area_total_grupo.tolist()])
+
+    area_total_em_afericao = area_total_grupo[grupo]
+    vau = vau_grupo[grupo]
+    percentual_equivalencia = equivalencia_grupo[grupo]
+    fator_social = fator_social_grupo[grupo]
+
+    # Área principal usa a equivalência; a complementar, o redutor conforme a cobertura
+    complementar = tipo_area == 'Complementar'
+    cobertura = colunas.get('Cobertura', np.full(n, 'Coberta', dtype=object))
+    redutor = np.where(complementar, np.where(cobertura == 'Coberta', 0.50, 0.25), 1.0)
+    area_total_para_calculo = np.where(complementar, area_aferida * redutor,
+                                       area_aferida * (percentual_equivalencia / 100))
+    custo_da_obra = area_total_para_calculo * vau
+
+    percentual_mao_obra = _aplicar_por_valor(calcular_percentual_mao_de_obra, destinacao, material)
+    percentual_categoria_remu = _aplicar_por_valor(calcular_percentual_categoria_remuneracao, categoria)
+    percentual_categoria = _aplicar_por_valor(calcular_percentual_por_categoria, categoria)
+
+    # Percentual de pré-moldados: só há redução quando o custo da obra por destinação é informado
+    if 'valor_notas_fiscais' in colunas and 'Custo da Obra por Destinação' in colunas:
+        proporcao_nf = (colunas['valor_notas_fiscais'].astype(float)
+                        / colunas['Custo da Obra por Destinação'].astype(float)) * 100
+        percentual_nf = np.where(proporcao_nf >= 40, 30.0, 100.0)
+    else:
+        percentual_nf = np.full(n, 100.0)
+
+    rmt = custo_da_obra * (percentual_categoria / 100) * (fator_social / 100) \
+        * (percentual_mao_obra / 100) * (percentual_nf / 100)
+
+    percentual_uso_uf = dados_percentuais.percentuais(colunas['UF'], destinacao)
+    concreto = colunas.get('Concreto usinado', np.full(n, 'Não', dtype=object))
+    percentual_ajuste = np.where(concreto == 'Sim', 5, 0)
+
+    credito_remuneracao = custo_da_obra * (percentual_uso_uf / 100) \
+        * (percentual_categoria_remu / 100) * (percentual_ajuste / 100)
+    rmt = rmt + credito_remuneracao
+
+    # Ordena por destinação (ordem de aparição), preservando a ordem das áreas dentro de cada grupo
+    ordem = np.argsort(grupo, kind='stable')
+    resultado = {
+        'Identificação da Área': colunas['Identificação'],
+        'Categoria': categoria,
+        'Material': material,
+        'Tipo de Área': tipo_area,
+        'destinacao': destinacao,
+        'Redução de Área (%)': np.where(complementar, redutor * 100, np.nan),
+        **{coluna: (colunas[coluna].astype(float) if coluna in colunas else np.full(n, np.nan))
+           for coluna in COLUNAS_OPCIONAIS},
+        'Área Total Aferida para Cálculo': area_aferida,
+        'Área Total em Aferição': area_total_em_afericao,
+        'Percentual de Equivalência': percentual_equivalencia,
+        'Área Total para Cálculo': area_total_para_calculo,
+        'VAU': vau,
+        'Custo da Obra por Destinação': custo_da_obra,
+        'Percentual de Mão de Obra': percentual_mao_obra,
+        'Percentual de Calculo por Categoria de obra': percentual_categoria,
+        'Percentual de NF': percentual_nf,
+        'Fator Social (%)': fator_social,
+        'Percentual de uso por UF': percentual_uso_uf,
+        'Percentual de aplicação do abatimento por categoria': percentual_categoria_remu,
+        'Percentual de ajuste': percentual_ajuste,
+        'Crédito de remuneração': credito_remuneracao,
+        'RMT': rmt
+    }
+    return {coluna: valores[ordem] for coluna, valores in resultado.items()}
@@ -0,0 +1,146 @@
+"""
+Cache de resultados intermediários do pipeline, endereçado pelo conteúdo das entradas.
+
+A chave de cada resultado é o hash SHA-256 das entradas canonicalizadas (JSON com chaves
+ordenadas), de modo que submissões idênticas da mesma obra reaproveitam o cálculo.
+
+O cache em memória tem descarte LRU com tamanho limitado. Opcionalmente, os resultados também
+são gravados em um SQLite compartilhado (`INSS_CACHE_DB`), para que vários workers do gunicorn
+aproveitem o mesmo cache.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from utils.metricas import incrementar
+
+TAMANHO_PADRAO = int(os.environ.get('INSS_CACHE_TAMANHO', 256))
+CAMINHO_PADRAO = os.environ.get('INSS_CACHE_DB') or None
+
+
+def chave_canonica(*partes):
+    """
+    Gera a chave do cache para as entradas informadas.
+
+    Args:
+        *partes: Valores serializáveis em JSON (dicionários, listas, números e textos).
+
+    Returns:
+        str: Hash SHA-256 (hexadecimal) da representação canônica das entradas.
+    """
+    canonico = json.dumps(partes, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+
+class CacheResultados:
+    """
+    Cache LRU de resultados com backend SQLite opcional.
+
+    Args:
+        tamanho (int): Quantidade máxima de resultados mantidos (em memória e no SQLite).
+        caminho (str, opcional): Arquivo SQLite compartilhado. Sem ele, o cache é apenas em memória.
+    """
+
+    def __init__(self, tamanho=TAMANHO_PADRAO, caminho=CAMINHO_PADRAO):
+        self.tamanho = tamanho
+        self.caminho = caminho
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._conexao = None
+
+    def _conectar(self):
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " chave TEXT PRIMARY KEY,"
+                " valor BLOB NOT NULL,"
+                " acessado_em REAL NOT NULL)"
+            )
+            self._conexao.execute(
+                "CREATE INDEX IF NOT EXISTS resultados_acessado_em ON resultados (acessado_em)")
+            self._conexao.commit()
+        return self._conexao
+
+    def _guardar_memoria(self, chave, valor):
+        self._memoria[chave] = valor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.tamanho:
+            self._memoria.popitem(last=False)
+
+    def obter(self, chave):
+        """
+        Retorna (True, valor) se a chave estiver no cache, ou (False, None) caso contrário.
+        """
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                return True, self._memoria[chave]
+            if self.caminho is None:
+                return False, None
+            conexao = self._conectar()
+            linha = conexao.execute("SELECT valor FROM resultados WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return False, None
+            conexao.execute("UPDATE resultados SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+            conexao.commit()
+            valor = pickle.loads(linha[0])
+            self._guardar_memoria(chave, valor)
+            return True, valor
+
+    def guardar(self, chave, valor):
+        """
+        Grava um resultado no cache, descartando os menos usados quando o limite é atingido.
+        """
+        with self._lock:
+            self._guardar_memoria(chave, valor)
+            if self.caminho is None:
+                return
+            conexao = self._conectar()
+            conexao.execute("INSERT OR REPLACE INTO resultados (chave, valor, acessado_em) VALUES (?, ?, ?)",
+                            (chave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), time.time()))
+            conexao.execute(
+                "DELETE FROM resultados WHERE chave IN ("
+                " SELECT chave FROM resultados ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)",
+                (self.tamanho,))
+            conexao.commit()
+
+    def obter_ou_calcular(self, chave, funcao, *args):
+        """
+        Retorna o resultado em cache para a chave ou, se ausente, calcula `funcao(*args)` e o grava.
+        """
+        achou, valor = self.obter(chave)
+        incrementar('cache_resultados_total', resultado='acerto' if achou else 'falta')
+        if not achou:
+            valor = funcao(*args)
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        """
+        Remove todos os resultados do cache.
+        """
+        with self._lock:
+            self._memoria.clear()
+            if self.caminho is not None:
+                self._conectar().execute("DELETE FROM resultados")
+                self._conectar().commit()
+
+
+_cache_padrao = None
+
+
+def get_cache():
+    """
+    Retorna o cache de resultados compartilhado pelo processo, criando-o na primeira chamada.
+    """
+    global _cache_padrao
+    if _cache_padrao is None:
+        _cache_padrao = CacheResultados()
+    return _cache_padrao
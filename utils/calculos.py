@@ -10,9 +10,12 @@ Observação:
 Os percentuais, faixas e metodologias foram extraídos com base neste documento. Caso ocorram alterações na
 legislação ou novas orientações técnicas sejam publicadas, as funções devem ser adaptadas para refletir os novos
 parâmetros e variáveis, garantindo que os cálculos permaneçam corretos conforme a fonte oficial.
+
+Os percentuais e faixas ficam nas tabelas de regras versionadas por data de vigência (`data/regras`),
+compiladas por `utils.regras`. As funções abaixo consultam a versão vigente.
 """
 
-from data.dados_percentuais import dados_percentuais
+from utils.regras import regras_vigentes
 
 def calcular_vau(cub):
     """
@@ -43,27 +46,7 @@ def calcular_percentual_equivalencia(area_total, tipo_destinacao):
     Returns:
         int: Percentual de equivalência.
     """
-    # Destinações com percentual fixo
-    fixed_values = {
-        "Galpão Industrial": 95,
-        "Casa Popular": 98,
-        "Conjunto Habitacional Popular": 98
-    }
-    if tipo_destinacao in fixed_values:
-        return fixed_values[tipo_destinacao]
-
-    # Para as demais destinações, utiliza-se a segmentação por área
-    equivalencias = {
-        "Residencial Unifamiliar": [(1000, 89), (float('inf'), 85)],
-        "Residencial Multifamiliar": [(1000, 90), (float('inf'), 86)],
-        "Comercial Salas e Lojas": [(3000, 86), (float('inf'), 83)],
-        "Edifício de Garagens": [(3000, 86), (float('inf'), 83)]
-    }
-    percentuais = equivalencias.get(tipo_destinacao, [])
-    for limite, percentual in percentuais:
-        if area_total <= limite:
-            return percentual
-    return 0
+    return regras_vigentes().percentual_equivalencia(area_total, tipo_destinacao)
 
 def calcular_percentual_mao_de_obra(tipo_obra, material):
     """
@@ -77,16 +60,7 @@ def calcular_percentual_mao_de_obra(tipo_obra, material):
     Returns:
         int: Percentual de mão de obra.
     """
-    percentuais = {
-        "Residencial Unifamiliar": {"Alvenaria": 20, "Madeira": 15, "Mista": 15},
-        "Residencial Multifamiliar": {"Alvenaria": 20, "Madeira": 15, "Mista": 15},
-        "Comercial Salas e Lojas": {"Alvenaria": 20, "Madeira": 15, "Mista": 15},
-        "Edifício de Garagens": {"Alvenaria": 20, "Madeira": 15, "Mista": 15},
-        "Galpão Industrial": {"Alvenaria": 20, "Madeira": 15, "Mista": 15},
-        "Casa Popular": {"Alvenaria": 12, "Madeira": 7, "Mista": 7},
-        "Conjunto Habitacional Popular": {"Alvenaria": 12, "Madeira": 7, "Mista": 7}
-    }
-    return percentuais.get(tipo_obra, {}).get(material, 0)
+    return regras_vigentes().percentual_mao_de_obra(tipo_obra, material)
 
 def calcular_percentual_por_categoria(categoria):
     """
@@ -98,14 +72,7 @@ def calcular_percentual_por_categoria(categoria):
     Returns:
         int: Percentual para a categoria.
     """
-    percentuais = {
-        "Obra Nova": 100,  # 100% (sem redução)
-        "Acréscimo": 100,  # 100% (sem redução)
-        "Reforma": 35,     # 35% (redução de 65%)
-        "Demolição": 10,   # 10% (redução de 90%)
-        "Edifício de Garagens": 80  # 80% (redução de 20%)
-    }
-    return percentuais.get(categoria, 100)
+    return regras_vigentes().percentual_categoria(categoria)
 
 def calcular_fator_social(area_total):
     """
@@ -124,16 +91,7 @@ def calcular_fator_social(area_total):
     Returns:
         int: Fator social.
     """
-    if area_total <= 100:
-        return 20
-    elif area_total <= 200:
-        return 40
-    elif area_total <= 300:
-        return 55
-    elif area_total <= 400:
-        return 70
-    else:
-        return 90
+    return regras_vigentes().fator_social(area_total)
 
 def calcular_percentual_nf(dado):
     """
@@ -187,21 +145,29 @@ def calcular_rmt(area_total, cub, material):
     Returns:
         float: Valor da Remuneração da Mão de Obra Total (RMT).
     """
-    material_lower = material.lower()
-    if material_lower == "alvenaria":
-        p1, p2, p3, p4 = 0.04, 0.08, 0.14, 0.20
-    else:  # para "madeira" ou "mista"
-        p1, p2, p3, p4 = 0.02, 0.05, 0.11, 0.15
+    faixas, percentuais = regras_vigentes().faixas_rmt(material)
 
     # Cálculo por faixas de área
-    area1 = min(area_total, 100)
-    area2 = min(max(area_total - 100, 0), 100)
-    area3 = min(max(area_total - 200, 0), 100)
-    area4 = max(area_total - 300, 0)
-    
-    rmt = (area1 * cub * p1) + (area2 * cub * p2) + (area3 * cub * p3) + (area4 * cub * p4)
+    rmt = 0
+    inicio = 0
+    for limite, percentual in zip(faixas + [float('inf')], percentuais):
+        area_faixa = min(max(area_total - inicio, 0), limite - inicio)
+        rmt += area_faixa * cub * percentual
+        inicio = limite
     return rmt
 
+def calcular_percentual_categoria_remuneracao(categoria):
+    """
+    Retorna o percentual de aplicação do abatimento (crédito de remuneração) por categoria da obra.
+    
+    Args:
+        categoria (str): Categoria da obra (ex.: "Obra Nova", "Reforma").
+    
+    Returns:
+        int: Percentual de aplicação do abatimento.
+    """
+    return regras_vigentes().percentual_categoria_remuneracao(categoria)
+
 def calcular_inss(rmt):
     """
     Calcula o valor da contribuição do INSS sobre a Remuneração da Mão de Obra Total (RMT).
@@ -237,3 +203,13 @@ def calcular_inss_economizado(rmt, reducao_percentual):
     inss_a_pagar = base_reduzida * aliquota
     economia = inss_devido - inss_a_pagar
     return inss_devido, inss_a_pagar, economia
+
+def percentual_reducao(categorias):
+    """
+    Determina o percentual de redução do INSS a partir da categoria da primeira área.
+    """
+    if categorias and categorias[0] == "Reforma":
+        return 65
+    elif categorias and categorias[0] == "Demolição":
+        return 90
+    return 0
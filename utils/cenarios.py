@@ -0,0 +1,198 @@
+"""
+Simulação de cenários de uma obra: grades de fator de ajuste, honorários e redução.
+
+A tabela de áreas e o RMT total são calculados uma única vez (com o pipeline de `utils.pipeline`);
+a aferição indireta, os totais da tabela financeira e o INSS detalhado de todos os cenários são
+calculados de uma só vez com arrays NumPy, por broadcasting sobre os eixos da grade:
+
+    - aferição e financeira dependem apenas do fator de ajuste;
+    - INSS devido, a pagar e economia dependem apenas da redução;
+    - honorários e economia real dependem da redução e do percentual de honorários.
+
+O resultado é uma única matriz, com uma linha por cenário (fator × honorários × redução, nessa
+ordem de aninhamento) e uma coluna por valor (`COLUNAS`).
+
+No cronograma por área ("cronograma": "areas"), o RMT de cada mês (as áreas em execução no mês) é
+calculado uma única vez; a remuneração mensal de cada fator é esse perfil ajustado e arredondado em
+centavos, como no pipeline. Os totais financeiros de todos os fatores saem de uma única chamada a
+`utils.financeiro.totais_financeiros`, os mesmos da tabela de cada cenário, ao centavo.
+"""
+
+import os
+
+import numpy as np
+
+from utils.calculos import calcular_inss_economizado
+from utils.dinheiro import para_centavos
+from utils.esquema import validar_obra
+from utils.financeiro import totais_financeiros
+from utils.pipeline import (
+    calcular_obra,
+    periodo_obra,
+    periodos_areas,
+    intervalo_selic,
+    percentual_reducao,
+    rmt_cronograma,
+    FATOR_AJUSTE_PADRAO,
+    HONORARIOS_PADRAO,
+    CRONOGRAMA_AREAS,
+)
+from utils.selic import get_selic_store
+
+# Quantidade máxima de cenários (linhas da matriz) por simulação
+MAXIMO_CENARIOS = int(os.environ.get('INSS_CENARIOS_MAX', 100000))
+
+COLUNAS = (
+    'fator_ajuste',
+    'honorarios_percentual',
+    'reducao_percentual',
+    'rmt_ajustado',
+    'remuneracao_mensal',
+    'financeira_remuneracao',
+    'financeira_valor_atualizado',
+    'financeira_total',
+    'inss_devido',
+    'inss_a_pagar',
+    'economia_gerada',
+    'honorarios',
+    'economia_real',
+)
+
+
+def grade(valores, padrao):
+    """
+    Converte a especificação de um eixo da grade em um array de valores (em %).
+
+    Args:
+        valores: Lista de valores, um único número, {"inicio": ..., "fim": ..., "passo": ...}
+                 (intervalo fechado) ou None (usa `padrao`).
+        padrao (float): Valor usado quando o eixo não é informado.
+
+    Returns:
+        ndarray: Valores do eixo.
+
+    Raises:
+        ValueError: Se a especificação for inválida ou vazia.
+    """
+    if valores is None:
+        return np.array([float(padrao)])
+    if isinstance(valores, dict):
+        inicio, fim = float(valores['inicio']), float(valores['fim'])
+        passo = float(valores.get('passo', 1))
+        if passo <= 0:
+            raise ValueError("o passo da grade deve ser positivo")
+        eixo = inicio + passo * np.arange(int(np.floor((fim - inicio) / passo + 1e-9)) + 1)
+    elif isinstance(valores, (list, tuple)):
+        eixo = np.array([float(valor) for valor in valores])
+    else:
+        eixo = np.array([float(valores)])
+    if eixo.size == 0:
+        raise ValueError("grade vazia")
+    return eixo
+
+
+def _totais_cronograma(tabela_areas, periodos, fator, inicio, fim, selic_rates):
+    """
+    Totais financeiros de cada fator de ajuste no cronograma por área.
+
+    Returns:
+        dict: Arrays "remuneracao", "valor_atualizado" e "total", um valor por fator.
+    """
+    perfil = rmt_cronograma(tabela_areas, periodos, inicio, fim)
+    # Remuneração de cada fator (linhas) e mês (colunas), arredondada ao centavo como no pipeline
+    remuneracoes = para_centavos(fator[:, None] * perfil[None, :]) / 100
+    return totais_financeiros(inicio, fim, remuneracoes, selic_rates)
+
+
+def simular_cenarios(obra, fatores=None, honorarios=None, reducoes=None, selic_rates=None, cache=None):
+    """
+    Calcula todos os cenários da grade para uma obra.
+
+    Args:
+        obra (dict): Dados da obra (formato de `utils.pipeline.calcular_obra`). Seus próprios fator de
+                     ajuste, honorários e redução são usados nos eixos não informados.
+        fatores: Fatores de ajuste, em % (ver `grade`).
+        honorarios: Percentuais de honorários (ver `grade`).
+        reducoes: Percentuais de redução do INSS (ex.: 0, 65 para Reforma, 90 para Demolição).
+        selic_rates (dict, opcional): Taxas SELIC já obtidas, com chave "YYYY-MM".
+        cache (CacheResultados, opcional): Cache de resultados do pipeline (ver `utils.cache`).
+
+    Returns:
+        dict: Identificação, RMT total, período, os eixos da grade ("eixos"), os nomes das colunas
+              ("colunas") e a matriz de resultados ("matriz", ndarray com uma linha por cenário).
+
+    Raises:
+        ValueError: Se a grade for inválida ou exceder `MAXIMO_CENARIOS`.
+    """
+    eixo_fatores = grade(fatores, obra.get('fatorAjuste', FATOR_AJUSTE_PADRAO))
+    eixo_honorarios = grade(honorarios, obra.get('honorarios', HONORARIOS_PADRAO))
+    eixo_reducoes = None if reducoes is None else grade(reducoes, 0)
+    n_cenarios = eixo_fatores.size * eixo_honorarios.size * (1 if eixo_reducoes is None else eixo_reducoes.size)
+    if n_cenarios > MAXIMO_CENARIOS:
+        raise ValueError(f"a grade tem {n_cenarios} cenários (máximo: {MAXIMO_CENARIOS})")
+
+    # Áreas, RMT total e taxas SELIC: uma única vez para todos os cenários
+    validada = validar_obra(obra)
+    inicio, fim = periodo_obra(obra)
+    if selic_rates is None:
+        selic_rates = get_selic_store().obter(*intervalo_selic([(inicio, fim)]))
+    cronograma_areas = validada.cronograma == CRONOGRAMA_AREAS
+    base = calcular_obra(obra, selic_rates, detalhado=cronograma_areas, cache=cache)
+    rmt_total = base['rmt_total']
+    meses_execucao = base['meses_execucao']
+    if eixo_reducoes is None:
+        eixo_reducoes = np.array([float(percentual_reducao([area['categoria'] for area in obra.get('areas', [])]))])
+
+    # Eixo 0: fator de ajuste (aferição indireta e tabela financeira)
+    fator = eixo_fatores / 100.0
+    # Arredondado como `round(valor, 2)` na aferição do pipeline (np.round pode diferir nos empates)
+    rmt_ajustado = para_centavos(rmt_total * fator) / 100
+    remuneracao_mensal = rmt_total * fator / meses_execucao if meses_execucao > 0 else np.zeros_like(fator)
+    if cronograma_areas:
+        financeiro = _totais_cronograma(base['tabela_areas'], periodos_areas(validada.areas, inicio, fim),
+                                        fator, inicio, fim, selic_rates)
+    else:
+        financeiro = totais_financeiros(inicio, fim, rmt_ajustado, selic_rates)
+
+    # Eixo 2: redução; eixos 1 e 2: honorários
+    inss_devido, inss_a_pagar, economia_gerada = calcular_inss_economizado(rmt_total, eixo_reducoes)
+    inss_devido = np.broadcast_to(inss_devido, eixo_reducoes.shape)
+    valor_honorarios = economia_gerada[None, :] * (eixo_honorarios[:, None] / 100.0)
+    economia_real = economia_gerada[None, :] - valor_honorarios
+
+    por_fator = (slice(None), None, None)
+    por_reducao = (None, None, slice(None))
+    colunas = {
+        'fator_ajuste': eixo_fatores[por_fator],
+        'honorarios_percentual': eixo_honorarios[None, :, None],
+        'reducao_percentual': eixo_reducoes[por_reducao],
+        'rmt_ajustado': rmt_ajustado[por_fator],
+        'remuneracao_mensal': remuneracao_mensal[por_fator],
+        'financeira_remuneracao': financeiro['remuneracao'][por_fator],
+        'financeira_valor_atualizado': financeiro['valor_atualizado'][por_fator],
+        'financeira_total': financeiro['total'][por_fator],
+        'inss_devido': inss_devido[por_reducao],
+        'inss_a_pagar': inss_a_pagar[por_reducao],
+        'economia_gerada': economia_gerada[por_reducao],
+        'honorarios': valor_honorarios[None, :, :],
+        'economia_real': economia_real[None, :, :],
+    }
+    forma = (eixo_fatores.size, eixo_honorarios.size, eixo_reducoes.size)
+    matriz = np.empty((n_cenarios, len(COLUNAS)))
+    for indice, nome in enumerate(COLUNAS):
+        matriz[:, indice] = np.broadcast_to(colunas[nome], forma).reshape(-1)
+
+    return {
+        'identificacao': obra.get('identificacao'),
+        'rmt_total': rmt_total,
+        'meses_execucao': meses_execucao,
+        'inicio': inicio,
+        'fim': fim,
+        'eixos': {
+            'fator_ajuste': eixo_fatores,
+            'honorarios_percentual': eixo_honorarios,
+            'reducao_percentual': eixo_reducoes,
+        },
+        'colunas': list(COLUNAS),
+        'matriz': matriz,
+    }
@@ -0,0 +1,214 @@
+"""
+Linha de comando da calculadora, sem passar pela aplicação web.
+
+    python -m utils.cli calcular carteira.csv -o resultados.jsonl --workers 8
+    python -m utils.cli calcular carteira.jsonl --offline selic.json
+    python -m utils.cli exportar obras.jsonl --tabela financeira --formato parquet -o financeira.parquet
+
+As obras são lidas em fluxo de um arquivo JSONL (uma obra por linha), JSON (uma lista de obras) ou CSV
+(uma área por linha; ver `ler_obras_csv`), no formato de `utils.pipeline.calcular_obra`. Use "-" para
+ler da entrada padrão (JSONL).
+
+Códigos de saída: 0 quando todas as obras foram calculadas; 1 quando alguma obra é inválida (os
+resultados das demais são gravados normalmente); 2 para argumentos inválidos ou uma entrada que não
+pode ser lida (arquivo inexistente, JSON malformado).
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import groupby
+
+from utils import esquema
+from utils.exportacao import exportar_arquivo, TABELAS, FORMATOS
+from utils.lote import iterar_lote, iterar_ndjson
+from utils.selic import SelicStore, set_selic_store, ler_arquivo_selic
+from utils.serializacao import dumps
+
+# Campos da obra no CSV: os do esquema que não são também campos das áreas ("mesInicio" e "mesFim",
+# numa planilha com uma área por linha, são o período de cada área)
+CAMPOS_OBRA = tuple(campo.nome for campo in esquema.CAMPOS_OBRA
+                    if campo.nome not in {campo_area.nome for campo_area in esquema.CAMPOS_AREA})
+INTERVALO_PROGRESSO = 2.0  # segundos entre relatórios de progresso
+
+SAIDA_OK = 0
+SAIDA_OBRAS_COM_ERRO = 1
+SAIDA_USO = 2  # o mesmo código do argparse para argumentos inválidos
+
+
+def ler_obras_csv(arquivo):
+    """
+    Lê obras de um CSV com uma área por linha, com os campos do esquema de `utils.esquema` (o mesmo
+    do JSON e do formulário). A coluna "obra" identifica a obra (linhas consecutivas com a mesma obra
+    são agrupadas); as colunas `CAMPOS_OBRA` ("fatorAjuste", "cronograma", "mesAfericao" etc.) são
+    lidas da primeira linha de cada obra em que estiverem preenchidas, e as demais colunas são os
+    campos da área ("identificacao", "categoria", "areaTotal", "mesInicio", "mesFim" etc.). O período
+    da obra vai do menor "mesInicio" ao maior "mesFim" das áreas; com "cronograma" igual a "areas",
+    cada área usa o seu. Células vazias são ignoradas (valem os padrões do esquema).
+
+    As obras são validadas pelo pipeline como as do JSON (`utils.esquema.validar_obra`): uma obra
+    inválida produz um resultado com "erro" e "erros", sem interromper as demais.
+
+    Yields:
+        dict: Cada obra, no formato de `utils.pipeline.calcular_obra`.
+    """
+    for identificacao, linhas in groupby(csv.DictReader(arquivo), key=lambda linha: linha.get('obra')):
+        obra = {'identificacao': identificacao, 'areas': []}
+        for linha in linhas:
+            for campo in CAMPOS_OBRA:
+                if linha.get(campo) and campo not in obra:
+                    obra[campo] = linha[campo]
+            obra['areas'].append({campo: valor for campo, valor in linha.items()
+                                  if campo != 'obra' and campo not in CAMPOS_OBRA and valor not in ('', None)})
+        yield obra
+
+
+def ler_obras(caminho):
+    """
+    Lê as obras de um arquivo JSONL ou CSV (de forma preguiçosa) ou JSON (lista ou {"obras": [...]}).
+
+    Yields:
+        dict: Cada obra, no formato de `utils.pipeline.calcular_obra`.
+    """
+    arquivo = sys.stdin if caminho == '-' else open(caminho, encoding='utf-8', newline='')
+    try:
+        if caminho.endswith('.json'):
+            dados = json.load(arquivo)
+            yield from dados.get('obras', [dados]) if isinstance(dados, dict) else dados
+        elif caminho.endswith('.csv'):
+            yield from ler_obras_csv(arquivo)
+        else:
+            yield from iterar_ndjson(arquivo)
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def com_progresso(resultados, intervalo=INTERVALO_PROGRESSO, saida=sys.stderr):
+    """
+    Repassa os resultados, relatando periodicamente em `saida` a quantidade de obras calculadas,
+    os erros e a vazão (obras/s), e um resumo ao final.
+    """
+    inicio = ultimo = time.perf_counter()
+    total = erros = 0
+    for resultado in resultados:
+        total += 1
+        erros += 'erro' in resultado
+        yield resultado
+        agora = time.perf_counter()
+        if agora - ultimo >= intervalo:
+            ultimo = agora
+            print(f"{total} obras calculadas ({erros} com erro), {total / (agora - inicio):.1f} obras/s",
+                  file=saida, flush=True)
+    decorrido = time.perf_counter() - inicio
+    print(f"Concluído: {total} obras ({erros} com erro) em {decorrido:.2f} s, "
+          f"{total / decorrido if decorrido else 0:.1f} obras/s", file=saida, flush=True)
+
+
+def contar_erros(resultados, contagem):
+    """
+    Repassa os resultados, somando em `contagem['erros']` os das obras inválidas.
+    """
+    for resultado in resultados:
+        contagem['erros'] += 'erro' in resultado
+        yield resultado
+
+
+def configurar_selic(args):
+    """
+    Com --offline, usa apenas taxas locais: as do arquivo informado (em um armazenamento em memória)
+    ou, sem arquivo, as já gravadas no armazenamento padrão.
+    """
+    if args.offline is None:
+        return
+    if args.offline:
+        store = SelicStore(':memory:', offline=True)
+        store.importar(ler_arquivo_selic(args.offline))
+    else:
+        store = SelicStore(offline=True)
+    set_selic_store(store)
+
+
+def comando_calcular(args):
+    configurar_selic(args)
+    contagem = {'erros': 0}
+    resultados = contar_erros(iterar_lote(ler_obras(args.entrada), workers=args.workers, detalhado=args.detalhado),
+                              contagem)
+    if args.progresso:
+        resultados = com_progresso(resultados)
+    saida = sys.stdout.buffer if args.saida == '-' else open(args.saida, 'wb')
+    try:
+        for resultado in resultados:
+            saida.write(dumps(resultado) + b'\n')
+    finally:
+        if saida is not sys.stdout.buffer:
+            saida.close()
+    return SAIDA_OBRAS_COM_ERRO if contagem['erros'] else SAIDA_OK
+
+
+def comando_exportar(args):
+    configurar_selic(args)
+    formato = args.formato or args.saida.rsplit('.', 1)[-1]
+    if formato not in FORMATOS:
+        print(f"Formato desconhecido: {formato}. Use --formato com um de: {', '.join(FORMATOS)}", file=sys.stderr)
+        return SAIDA_USO
+    contagem = {'erros': 0}
+    resultados = contar_erros(iterar_lote(ler_obras(args.entrada), workers=args.workers, detalhado=True), contagem)
+    if args.progresso:
+        resultados = com_progresso(resultados)
+    tamanho = exportar_arquivo(resultados, args.tabela, formato, args.saida)
+    print(f"Tabela {args.tabela} exportada em {args.saida} ({tamanho} bytes)", file=sys.stderr)
+    return SAIDA_OBRAS_COM_ERRO if contagem['erros'] else SAIDA_OK
+
+
+def _argumentos_comuns(parser):
+    parser.add_argument('entrada', help="Arquivo de obras (.jsonl, .json ou .csv); '-' para JSONL na entrada padrão")
+    parser.add_argument('--workers', type=int, help="Número de processos (padrão: quantidade de CPUs)")
+    parser.add_argument('--offline', nargs='?', const='', metavar='ARQUIVO_SELIC',
+                        help="Não consulta a API do Banco Central. Com um arquivo (.json da série SGS ou .csv "
+                             "com as colunas mes,valor), usa apenas as taxas dele")
+    parser.add_argument('--sem-progresso', dest='progresso', action='store_false',
+                        help="Não relata o progresso na saída de erro")
+
+
+def montar_parser():
+    parser = argparse.ArgumentParser(prog='python -m utils.cli', description="Calculadora de INSS de obras")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    calcular = subparsers.add_parser('calcular', help="Calcula um lote de obras, gravando os resultados em JSONL")
+    _argumentos_comuns(calcular)
+    calcular.add_argument('-o', '--saida', default='-', help="Arquivo JSONL de saída (padrão: saída padrão)")
+    calcular.add_argument('--detalhado', action='store_true',
+                          help="Inclui as tabelas de áreas e financeira em cada resultado")
+    calcular.set_defaults(funcao=comando_calcular)
+
+    exportar = subparsers.add_parser('exportar', help="Exporta uma tabela de resultados em CSV, XLSX ou Parquet")
+    _argumentos_comuns(exportar)
+    exportar.add_argument('--tabela', choices=TABELAS, required=True)
+    exportar.add_argument('--formato', choices=FORMATOS,
+                          help="Formato de saída. Por padrão, a extensão do arquivo de saída")
+    exportar.add_argument('-o', '--saida', required=True, help="Arquivo de saída")
+    exportar.set_defaults(funcao=comando_exportar)
+    return parser
+
+
+def main(argv=None):
+    """
+    Executa a linha de comando.
+
+    Returns:
+        int: Código de saída (`SAIDA_OK`, `SAIDA_OBRAS_COM_ERRO` ou `SAIDA_USO`).
+    """
+    args = montar_parser().parse_args(argv)
+    try:
+        return args.funcao(args)
+    except (OSError, ValueError) as e:
+        # Arquivo de entrada inexistente ou ilegível, JSON malformado etc.
+        print(f"Erro: {e}", file=sys.stderr)
+        return SAIDA_USO
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Histórico local do CUB (Custo Unitário Básico), indexado por UF, padrão e mês.
+
+Os valores são lidos dos arquivos CSV de `data/cub` (ou do diretório indicado por `INSS_CUB_DIR`),
+com as colunas:
+
+    uf,padrao,mes,valor
+    SP,R1-N,2023-08,1985.32
+
+A coluna "padrao" aceita o código do padrão do CUB (ex.: "R8-N") ou o nome da destinação
+(ex.: "Residencial Multifamiliar"); na consulta, o nome da destinação tem precedência e, na falta dele,
+é usado o padrão correspondente (`PADRAO_POR_DESTINACAO`). Nenhum acesso à rede é necessário.
+
+Áreas sem CUB informado recebem o CUB do mês anterior ao da aferição (`mes_referencia_cub`).
+
+O repositório traz apenas o cabeçalho de `data/cub/cub.csv`: os valores publicados pelos Sinduscons
+precisam ser fornecidos. Com o histórico vazio, as áreas sem CUB são rejeitadas com uma mensagem que
+indica onde preenchê-lo (`mensagem_sem_cub`).
+"""
+
+import csv
+import glob
+import logging
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from utils.selic import mes_para_indice, indice_para_mes
+
+logger = logging.getLogger('inss.cub')
+
+DIRETORIO_CUB = os.environ.get(
+    'INSS_CUB_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cub')
+)
+
+# Padrão do CUB usado para cada destinação
+PADRAO_POR_DESTINACAO = {
+    'Residencial Unifamiliar': 'R1-N',
+    'Residencial Multifamiliar': 'R8-N',
+    'Comercial Salas e Lojas': 'CSL-8-N',
+    'Edifício de Garagens': 'CSL-8-N',
+    'Galpão Industrial': 'GI',
+    'Casa Popular': 'RP1Q',
+    'Conjunto Habitacional Popular': 'PIS',
+}
+
+
+class HistoricoCub:
+    """
+    Valores do CUB por (UF, padrão), com os meses como índices inteiros ordenados.
+
+    Args:
+        registros (iterable): Tuplas (uf, padrao, mes "YYYY-MM", valor).
+    """
+
+    def __init__(self, registros=()):
+        series = {}
+        for uf, padrao, mes, valor in registros:
+            series.setdefault((uf, padrao), {})[mes_para_indice(mes)] = float(valor)
+        self._series = {}
+        for chave, valores in series.items():
+            meses = np.array(sorted(valores), dtype=np.int64)
+            self._series[chave] = (meses, np.array([valores[mes] for mes in meses.tolist()]))
+        self.valor = lru_cache(maxsize=4096)(self._valor)
+
+    def __len__(self):
+        return sum(len(meses) for meses, _ in self._series.values())
+
+    def _serie(self, uf, destinacao):
+        serie = self._series.get((uf, destinacao))
+        if serie is None and destinacao in PADRAO_POR_DESTINACAO:
+            serie = self._series.get((uf, PADRAO_POR_DESTINACAO[destinacao]))
+        return serie
+
+    def _valor(self, uf, destinacao, mes):
+        """
+        Retorna o CUB da UF e destinação (ou padrão) no mês "YYYY-MM", ou None se não houver.
+        """
+        serie = self._serie(uf, destinacao)
+        if serie is None:
+            return None
+        meses, valores = serie
+        indice = mes_para_indice(mes)
+        posicao = np.searchsorted(meses, indice)
+        if posicao < len(meses) and meses[posicao] == indice:
+            return float(valores[posicao])
+        return None
+
+    def valores(self, ufs, destinacoes, meses):
+        """
+        Consulta o CUB de colunas inteiras (por exemplo, todas as áreas de um lote).
+
+        Args:
+            ufs (array-like): UF de cada linha.
+            destinacoes (array-like): Destinação (ou padrão do CUB) de cada linha.
+            meses (array-like): Mês "YYYY-MM" de cada linha.
+
+        Returns:
+            ndarray: CUB de cada linha; NaN quando não houver valor no histórico.
+        """
+        resultado = np.full(len(ufs), np.nan)
+        linhas_por_serie = {}
+        for linha, chave in enumerate(zip(ufs, destinacoes)):
+            linhas_por_serie.setdefault(chave, []).append(linha)
+        for (uf, destinacao), linhas in linhas_por_serie.items():
+            serie = self._serie(uf, destinacao)
+            if serie is None:
+                continue
+            serie_meses, serie_valores = serie
+            linhas = np.array(linhas, dtype=np.intp)
+            indices = np.fromiter((mes_para_indice(meses[linha]) for linha in linhas.tolist()),
+                                  dtype=np.int64, count=len(linhas))
+            posicoes = np.minimum(np.searchsorted(serie_meses, indices), len(serie_meses) - 1)
+            encontrados = serie_meses[posicoes] == indices
+            resultado[linhas[encontrados]] = serie_valores[posicoes[encontrados]]
+        return resultado
+
+
+def carregar_historico(diretorio=DIRETORIO_CUB):
+    """
+    Lê todos os arquivos CSV do diretório do histórico do CUB.
+
+    Returns:
+        HistoricoCub: Histórico carregado (vazio se não houver arquivos ou linhas).
+    """
+    registros = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, '*.csv'))):
+        with open(caminho, encoding='utf-8', newline='') as arquivo:
+            registros.extend((linha['uf'], linha['padrao'], linha['mes'], linha['valor'])
+                             for linha in csv.DictReader(arquivo))
+    return HistoricoCub(registros)
+
+
+_historico_padrao = None
+
+
+def get_historico_cub():
+    """
+    Retorna o histórico do CUB compartilhado pelo processo, carregando-o na primeira chamada.
+    """
+    global _historico_padrao
+    if _historico_padrao is None:
+        _historico_padrao = carregar_historico()
+        if not len(_historico_padrao):
+            logger.warning("Histórico do CUB vazio em %s: áreas sem CUB informado serão rejeitadas", DIRETORIO_CUB)
+    return _historico_padrao
+
+
+def set_historico_cub(historico):
+    """
+    Substitui o histórico do CUB compartilhado (por exemplo, por um carregado de outro diretório).
+    """
+    global _historico_padrao
+    _historico_padrao = historico
+
+
+def mensagem_sem_cub(uf, destinacao, mes=None):
+    """
+    Descreve a falta do CUB de uma área no histórico, indicando quando o próprio histórico está vazio
+    (nenhum valor fornecido em `DIRETORIO_CUB`).
+    """
+    if not len(get_historico_cub()):
+        return (f"CUB não informado e o histórico do CUB está vazio: informe o CUB ou preencha {DIRETORIO_CUB} "
+                f"(colunas uf,padrao,mes,valor)")
+    no_mes = f" em {mes}" if mes else ''
+    return f"CUB não informado e não encontrado no histórico para {uf}, {destinacao}{no_mes}"
+
+
+def mes_referencia_cub(obra, fim):
+    """
+    Retorna o mês ("YYYY-MM") do CUB de uma obra: o mês anterior ao da aferição ("mesAfericao").
+    Sem mês de aferição informado, considera a aferição no mês seguinte ao fim da obra (`fim`).
+    """
+    if obra.get('mesAfericao'):
+        return indice_para_mes(mes_para_indice(obra['mesAfericao']) - 1)
+    return fim
+
+
+def _sem_cub(area):
+    return isinstance(area, dict) and area.get('CUB') in (None, '')
+
+
+def preencher_cub(obras, meses, historico=None):
+    """
+    Preenche, com o histórico do CUB, as áreas sem CUB informado. A consulta é feita de uma só vez
+    para todas as áreas de todas as obras. As obras com áreas preenchidas são copiadas; as demais são
+    devolvidas sem alteração.
+
+    Args:
+        obras (list): Obras no formato de `utils.pipeline.calcular_obra`.
+        meses (list): Mês de referência do CUB de cada obra (ver `mes_referencia_cub`).
+        historico (HistoricoCub, opcional): Histórico a consultar. Por padrão, o compartilhado.
+
+    Returns:
+        list: Obras com o CUB de todas as áreas que puderam ser resolvidas.
+    """
+    faltantes = [(i, j) for i, obra in enumerate(obras) for j, area in enumerate(obra.get('areas', []))
+                 if _sem_cub(area)]
+    if not faltantes:
+        return obras
+    historico = historico if historico is not None else get_historico_cub()
+    valores = historico.valores([obras[i]['areas'][j].get('uf') for i, j in faltantes],
+                                [obras[i]['areas'][j].get('destinacao') for i, j in faltantes],
+                                [meses[i] for i, _ in faltantes])
+
+    obras = list(obras)
+    copiadas = set()
+    for (i, j), valor in zip(faltantes, valores.tolist()):
+        if np.isnan(valor):
+            continue
+        if i not in copiadas:
+            obras[i] = {**obras[i], 'areas': [dict(area) for area in obras[i]['areas']]}
+            copiadas.add(i)
+        obras[i]['areas'][j]['CUB'] = valor
+    return obras
@@ -0,0 +1,142 @@
+"""
+Valores monetários em centavos inteiros (int64) e formatação em reais.
+
+Representação e ponto de arredondamento, os mesmos em toda a aplicação:
+
+    - cada valor é calculado em float (arrays NumPy), a partir de entradas em reais;
+    - é arredondado ao centavo uma única vez (`para_centavos`), pela sua representação decimal exata
+      (meio centavo para o par), o mesmo resultado de `f"{valor:.2f}"`;
+    - todo total é uma soma exata desses centavos (`somar`), nunca um valor recalculado em float.
+
+Na tabela financeira, o valor arredondado é o de cada mês (`utils.financeiro.centavos_mensais`):
+a linha de totais da tabela exibida e os totais sem a tabela (`utils.financeiro.totais_financeiros`,
+usados no lote, na linha de comando, nas páginas e nos cenários) somam os mesmos centavos e são
+iguais ao centavo.
+
+`formatar_brl` formata colunas inteiras de uma só vez ("R$ 1.245,50"), com operações vetorizadas
+do NumPy sobre os centavos, em vez da formatação e das substituições de texto célula a célula.
+"""
+
+from decimal import Decimal, ROUND_HALF_EVEN
+
+import numpy as np
+
+_CENTAVO = Decimal('0.01')
+# Perto de meio centavo (ou para valores muito grandes), o arredondamento de `valor * 100` pode ter
+# sido afetado pelo erro da multiplicação em ponto flutuante e é refeito com `Decimal`
+_TOLERANCIA_ABSOLUTA = 1e-7
+_TOLERANCIA_RELATIVA = 1e-12
+
+
+def para_centavos(valores):
+    """
+    Converte valores em reais (float) para centavos inteiros, com arredondamento exato.
+
+    Args:
+        valores (float ou array-like): Valores em reais. Devem ser finitos.
+
+    Returns:
+        ndarray: Centavos (int64), com a mesma forma de `valores`.
+    """
+    valores = np.asarray(valores, dtype=float)
+    escalados = valores * 100
+    centavos = np.rint(escalados).astype(np.int64)
+    distancia_empate = np.abs(np.abs(escalados - np.floor(escalados)) - 0.5)
+    duvidosos = distancia_empate < np.maximum(_TOLERANCIA_ABSOLUTA, np.abs(escalados) * _TOLERANCIA_RELATIVA)
+    if duvidosos.any():
+        centavos[duvidosos] = [int(Decimal(valor).quantize(_CENTAVO, ROUND_HALF_EVEN) * 100)
+                               for valor in valores[duvidosos].tolist()]
+    return centavos
+
+
+def somar(centavos):
+    """
+    Soma exata de centavos (int64).
+    """
+    return int(np.asarray(centavos, dtype=np.int64).sum())
+
+
+def formatar_centavos(centavos, negativos=None):
+    """
+    Formata centavos inteiros no padrão de moeda brasileira ("R$ 1.245,50").
+
+    Os textos são montados de uma só vez em uma matriz de bytes (um texto por linha, alinhado à
+    direita): os dígitos de todas as casas saem de uma única divisão vetorizada, e a matriz é
+    decodificada de uma vez.
+
+    Args:
+        centavos (array-like): Valores em centavos (int64).
+        negativos (array-like, opcional): Quais valores recebem o sinal "-" (por padrão, os
+                                          menores que zero).
+
+    Returns:
+        list: Textos formatados, um por valor.
+    """
+    centavos = np.asarray(centavos, dtype=np.int64).ravel()
+    negativos = centavos < 0 if negativos is None else np.asarray(negativos, dtype=bool).ravel()
+    if len(centavos) == 0:
+        return []
+    reais, resto = np.divmod(np.abs(centavos), 100)
+
+    # Casas dos reais (da menos para a mais significativa) e a coluna de cada uma, com um ponto
+    # antes de cada grupo de três casas; à direita ficam ",cc" e à esquerda, espaço para "R$ -"
+    casas = np.arange(len(str(int(reais.max()))))
+    largura = 4 + len(casas) + (len(casas) - 1) // 3 + 3
+    colunas = largura - 4 - (casas + casas // 3)
+    presentes = reais[:, None] >= 10 ** casas
+    presentes[:, 0] = True
+
+    matriz = np.full((len(centavos), largura), ord(' '), dtype=np.uint8)
+    matriz[:, colunas] = np.where(presentes, (reais[:, None] // 10 ** casas) % 10 + ord('0'), ord(' '))
+    milhares = casas[3::3]
+    matriz[:, colunas[milhares] + 1] = np.where(presentes[:, milhares], ord('.'), ord(' '))
+    matriz[:, -3] = ord(',')
+    matriz[:, -2] = resto // 10 + ord('0')
+    matriz[:, -1] = resto % 10 + ord('0')
+
+    # "R$ " e o sinal logo antes da casa mais significativa de cada valor
+    inicio = colunas[presentes.sum(axis=1) - 1] - negativos - 3
+    linhas = np.arange(len(centavos))
+    matriz[linhas[negativos], inicio[negativos] + 3] = ord('-')
+    for deslocamento, caractere in enumerate(b'R$ '):
+        matriz[linhas, inicio + deslocamento] = caractere
+
+    texto = matriz.tobytes().decode('ascii')
+    return [texto[linha * largura + coluna:(linha + 1) * largura] for linha, coluna in enumerate(inicio.tolist())]
+
+
+def formatar_brl(valores):
+    """
+    Formata valores em reais (float) no padrão de moeda brasileira, como `format_currency`, para
+    colunas inteiras de uma só vez. Valores não finitos (NaN, infinito) são formatados como texto.
+
+    Args:
+        valores (array-like): Valores em reais.
+
+    Returns:
+        list: Textos formatados ("R$ 1.245,50"), um por valor.
+    """
+    valores = np.asarray(valores, dtype=float).ravel()
+    finitos = np.isfinite(valores)
+    if finitos.all():
+        # np.signbit preserva o sinal de valores que arredondam para zero ("R$ -0,00")
+        return formatar_centavos(para_centavos(valores), np.signbit(valores))
+    textos = [f"R$ {valor}" for valor in valores.tolist()]
+    formatados = formatar_centavos(para_centavos(valores[finitos]), np.signbit(valores[finitos]))
+    for indice, texto in zip(np.flatnonzero(finitos).tolist(), formatados):
+        textos[indice] = texto
+    return textos
+
+
+def formatar_colunas_brl(*colunas):
+    """
+    Formata várias colunas de valores em reais com uma única chamada a `formatar_brl` (o custo
+    fixo da formatação vetorizada é pago uma vez por tabela, não por coluna).
+
+    Returns:
+        list: Uma lista de textos por coluna.
+    """
+    tamanhos = [len(coluna) for coluna in colunas]
+    textos = formatar_brl(np.concatenate([np.asarray(coluna, dtype=float).ravel() for coluna in colunas]))
+    limites = np.cumsum([0] + tamanhos).tolist()
+    return [textos[inicio:fim] for inicio, fim in zip(limites, limites[1:])]
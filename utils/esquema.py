@@ -0,0 +1,332 @@
+"""
+Esquema de entrada de uma obra: conversão e validação dos campos em uma única passada.
+
+O mesmo esquema vale para o formulário HTML (`utils.pipeline.obra_do_formulario`), o JSON das APIs
+e o CSV da linha de comando (`utils.cli.ler_obras_csv`): todos chegam como uma obra no formato de
+`utils.pipeline.calcular_obra`, com valores em texto (formulário e CSV) ou já numéricos (JSON).
+
+As áreas são convertidas coluna a coluna (uma coluna por campo, como arrays NumPy), e não área a
+área: cada coluna numérica é convertida de uma só vez, e só quando a conversão falha os valores
+são examinados um a um para localizar os inválidos. Todos os erros encontrados (de todas as áreas e
+campos) são reunidos em uma única exceção, `ErroValidacao`, em vez de parar no primeiro.
+"""
+
+import math
+import re
+
+import numpy as np
+
+NUMERO = 'numero'
+INTEIRO = 'inteiro'
+TEXTO = 'texto'
+MES = 'mes'
+
+FATOR_AJUSTE_PADRAO = 50
+MESES_EXECUCAO_PADRAO = 12
+HONORARIOS_PADRAO = 30
+
+# Cronograma da tabela financeira: um único período para a obra, ou um período por área
+CRONOGRAMA_OBRA = 'obra'
+CRONOGRAMA_AREAS = 'areas'
+CRONOGRAMAS = (CRONOGRAMA_OBRA, CRONOGRAMA_AREAS)
+
+_FORMATO_MES = re.compile(r'\d{4}-(0[1-9]|1[0-2])')
+
+
+class Campo:
+    """
+    Campo do esquema.
+
+    Args:
+        nome (str): Nome do campo (o mesmo do formulário, do JSON e do CSV).
+        tipo (str): `NUMERO`, `INTEIRO`, `TEXTO` ou `MES` ("YYYY-MM").
+        obrigatorio (bool): Se o campo precisa ser informado (vazio conta como não informado).
+        padrao: Valor usado quando o campo opcional não é informado.
+        minimo (float, opcional): Menor valor aceito, para campos numéricos.
+        opcoes (tuple, opcional): Valores aceitos, para campos de texto da obra.
+    """
+
+    __slots__ = ('nome', 'tipo', 'obrigatorio', 'padrao', 'minimo', 'opcoes')
+
+    def __init__(self, nome, tipo, obrigatorio=False, padrao=None, minimo=None, opcoes=None):
+        self.nome = nome
+        self.tipo = tipo
+        self.obrigatorio = obrigatorio
+        self.padrao = padrao
+        self.minimo = minimo
+        self.opcoes = opcoes
+
+
+# O CUB é opcional: quando omitido, é obtido do histórico (ver `utils.pipeline.calcular_obra`)
+CAMPOS_AREA = (
+    Campo('identificacao', TEXTO, padrao=''),
+    Campo('categoria', TEXTO, obrigatorio=True),
+    Campo('material', TEXTO, obrigatorio=True),
+    Campo('tipoArea', TEXTO, padrao='Principal'),
+    Campo('areaTotal', NUMERO, obrigatorio=True, minimo=0),
+    Campo('CUB', NUMERO, padrao=np.nan, minimo=0),
+    Campo('uf', TEXTO, obrigatorio=True),
+    Campo('concretoUsinado', TEXTO, padrao='Não'),
+    Campo('destinacao', TEXTO, obrigatorio=True),
+    Campo('valorNotasFiscais', NUMERO, padrao=0.0, minimo=0),
+    Campo('areaAferida', NUMERO, obrigatorio=True, minimo=0),
+    Campo('mesInicio', MES),
+    Campo('mesFim', MES),
+)
+
+_CAMPOS_NUMERICOS = tuple(campo for campo in CAMPOS_AREA if campo.tipo == NUMERO)
+_ORDEM_CAMPOS = {campo.nome: i for i, campo in enumerate(CAMPOS_AREA)}
+
+CAMPOS_OBRA = (
+    Campo('fatorAjuste', NUMERO, padrao=FATOR_AJUSTE_PADRAO, minimo=0),
+    Campo('mesesExecucao', INTEIRO, padrao=MESES_EXECUCAO_PADRAO, minimo=0),
+    Campo('honorarios', NUMERO, padrao=HONORARIOS_PADRAO, minimo=0),
+    Campo('mesInicio', MES),
+    Campo('mesFim', MES),
+    Campo('mesAfericao', MES),
+    Campo('cronograma', TEXTO, padrao=CRONOGRAMA_OBRA, opcoes=CRONOGRAMAS),
+)
+
+
+class ErroValidacao(ValueError):
+    """
+    Erros de validação de uma obra, todos de uma vez.
+
+    Args:
+        erros (list): Um dicionário por erro, com "area" (índice da área a partir de 1, ou None para
+                      os campos da obra), "campo", "valor" (o valor recebido) e "mensagem".
+    """
+
+    def __init__(self, erros):
+        self.erros = erros
+        super().__init__('; '.join(_descrever(erro) for erro in erros))
+
+
+def _descrever(erro):
+    local = f"área {erro['area']}, " if erro['area'] is not None else ''
+    return f"{local}{erro['campo']}: {erro['mensagem']}"
+
+
+def _erro(area, campo, valor, mensagem):
+    return {'area': area, 'campo': campo, 'valor': valor, 'mensagem': mensagem}
+
+
+def _ordenar(erros):
+    # Campos da obra primeiro; depois, por área e na ordem dos campos do esquema
+    return sorted(erros, key=lambda erro: (erro['area'] or 0, _ORDEM_CAMPOS.get(erro['campo'], 0)))
+
+
+class Areas:
+    """
+    Áreas validadas, como colunas (struct of arrays): `areas['areaTotal']` tem uma posição por
+    área. Colunas numéricas são arrays float (o CUB não informado fica NaN); as demais, listas.
+    """
+
+    __slots__ = ('colunas', 'n')
+
+    def __init__(self, colunas, n):
+        self.colunas = colunas
+        self.n = n
+
+    def __getitem__(self, campo):
+        return self.colunas[campo]
+
+    def __len__(self):
+        return self.n
+
+
+class Obra:
+    """
+    Obra validada: campos numéricos convertidos (com os padrões aplicados) e áreas em colunas.
+    """
+
+    __slots__ = ('identificacao', 'fator_ajuste', 'meses_execucao', 'honorarios', 'cronograma', 'areas')
+
+    def __init__(self, identificacao, fator_ajuste, meses_execucao, honorarios, areas, cronograma=CRONOGRAMA_OBRA):
+        self.identificacao = identificacao
+        self.fator_ajuste = fator_ajuste
+        self.meses_execucao = meses_execucao
+        self.honorarios = honorarios
+        self.cronograma = cronograma
+        self.areas = areas
+
+
+def _ausente(valor):
+    return valor is None or (isinstance(valor, str) and valor == '')
+
+
+def _converter_textos(campo, valores, erros):
+    """
+    Converte a coluna de um campo de texto ou mês das áreas (lista de valores, uma posição por
+    área), acrescentando a `erros` um erro por valor inválido.
+
+    Returns:
+        list: A coluna com o padrão do campo nas posições não informadas.
+    """
+    # Caso comum (texto informado em todas as áreas) verificado de uma vez, sem examinar valor a valor
+    if campo.tipo == TEXTO and None not in valores and '' not in valores:
+        return valores
+    convertidos = list(valores)
+    for i, valor in enumerate(valores):
+        if _ausente(valor):
+            if campo.obrigatorio:
+                erros.append(_erro(i + 1, campo.nome, valor, "campo obrigatório não informado"))
+            convertidos[i] = campo.padrao
+        elif campo.tipo == MES and not (isinstance(valor, str) and _FORMATO_MES.fullmatch(valor)):
+            erros.append(_erro(i + 1, campo.nome, valor, "mês inválido (esperado YYYY-MM)"))
+    return convertidos
+
+
+def _converter_numeros(campos, colunas, n, erros):
+    """
+    Converte de uma só vez todas as colunas numéricas das áreas, como uma matriz (campo × área),
+    acrescentando a `erros` um erro por valor inválido. Só as posições não finitas após a conversão
+    (valores não informados ou inválidos) são examinadas uma a uma.
+
+    Returns:
+        dict: Campo → array float (com o padrão do campo nas posições não informadas).
+    """
+    valores = [colunas[campo.nome] for campo in campos]
+    try:
+        if any('' in coluna for coluna in valores):
+            raise ValueError
+        matriz = np.array(valores, dtype=float).reshape(len(campos), n)  # None vira NaN
+    except (TypeError, ValueError):
+        matriz = np.array([[_numero(valor) for valor in coluna] for coluna in valores], dtype=float)
+        matriz = matriz.reshape(len(campos), n)
+
+    minimos = np.array([-np.inf if campo.minimo is None else campo.minimo for campo in campos])
+    linhas, posicoes = np.nonzero(~np.isfinite(matriz) | (matriz < minimos[:, None]))
+    for linha, i in zip(linhas.tolist(), posicoes.tolist()):
+        campo, valor = campos[linha], valores[linha][i]
+        if _ausente(valor):
+            if campo.obrigatorio:
+                erros.append(_erro(i + 1, campo.nome, valor, "campo obrigatório não informado"))
+            matriz[linha, i] = campo.padrao if campo.padrao is not None else np.nan
+        elif not np.isfinite(matriz[linha, i]):
+            erros.append(_erro(i + 1, campo.nome, valor, f"valor inválido (esperado {_esperado(campo)})"))
+        else:
+            erros.append(_erro(i + 1, campo.nome, valor, f"deve ser maior ou igual a {campo.minimo}"))
+    return {campo.nome: matriz[linha] for linha, campo in enumerate(campos)}
+
+
+def _converter_valor(campo, valor, erros):
+    """
+    Converte um campo da obra (um único valor), acrescentando a `erros` o erro, se houver.
+    """
+    if _ausente(valor):
+        if campo.obrigatorio:
+            erros.append(_erro(None, campo.nome, valor, "campo obrigatório não informado"))
+        return campo.padrao
+    if campo.tipo == TEXTO:
+        if campo.opcoes is not None and valor not in campo.opcoes:
+            erros.append(_erro(None, campo.nome, valor, f"valor inválido (esperado {' ou '.join(campo.opcoes)})"))
+        return valor
+    if campo.tipo == MES:
+        if not (isinstance(valor, str) and _FORMATO_MES.fullmatch(valor)):
+            erros.append(_erro(None, campo.nome, valor, "mês inválido (esperado YYYY-MM)"))
+        return valor
+    numero = _numero(valor)
+    if not math.isfinite(numero) or (campo.tipo == INTEIRO and not numero.is_integer()):
+        erros.append(_erro(None, campo.nome, valor, f"valor inválido (esperado {_esperado(campo)})"))
+        return campo.padrao
+    if campo.minimo is not None and numero < campo.minimo:
+        erros.append(_erro(None, campo.nome, valor, f"deve ser maior ou igual a {campo.minimo}"))
+    return numero
+
+
+def _esperado(campo):
+    return "um número inteiro" if campo.tipo == INTEIRO else "um número"
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _colunas_areas(areas):
+    """
+    Monta as colunas (listas) das áreas, recebidas como lista de dicionários (JSON e CSV) ou
+    dicionário de listas paralelas (campos do formulário).
+    """
+    if isinstance(areas, dict):
+        n = max((len(valores) for valores in areas.values()), default=0)
+        colunas = {}
+        for campo in CAMPOS_AREA:
+            valores = list(areas.get(campo.nome, []))
+            colunas[campo.nome] = valores + [None] * (n - len(valores))
+        return colunas, n
+    return {campo.nome: [area.get(campo.nome) for area in areas] for campo in CAMPOS_AREA}, len(areas)
+
+
+def validar_areas(areas, erros=None):
+    """
+    Converte e valida todas as áreas de uma obra.
+
+    Args:
+        areas (list | dict): Lista de dicionários com os campos de cada área, ou dicionário de
+                             listas paralelas (um campo por chave, como no formulário).
+        erros (list, opcional): Lista onde acumular os erros. Sem ela, os erros são levantados
+                                ao final em uma `ErroValidacao`.
+
+    Returns:
+        Areas: As colunas convertidas.
+
+    Raises:
+        ErroValidacao: Com todos os campos inválidos de todas as áreas (somente sem `erros`).
+    """
+    proprios = [] if erros is None else erros
+    if not isinstance(areas, dict) and not (isinstance(areas, (list, tuple))
+                                            and all(isinstance(area, dict) for area in areas)):
+        proprios.append(_erro(None, 'areas', None, "deve ser uma lista de áreas"))
+        areas = []
+    colunas, n = _colunas_areas(areas)
+    convertidas = {campo.nome: _converter_textos(campo, colunas[campo.nome], proprios)
+                   for campo in CAMPOS_AREA if campo.tipo != NUMERO}
+    convertidas.update(_converter_numeros(_CAMPOS_NUMERICOS, colunas, n, proprios))
+    if erros is None and proprios:
+        raise ErroValidacao(_ordenar(proprios))
+    return Areas(convertidas, n)
+
+
+def validar_mes(nome, valor):
+    """
+    Valida um mês ("YYYY-MM") recebido fora da obra, como um parâmetro da URL.
+
+    Returns:
+        str: O próprio mês.
+
+    Raises:
+        ErroValidacao: Com o erro do campo `nome`, se o mês for inválido.
+    """
+    erros = []
+    _converter_valor(Campo(nome, MES, obrigatorio=True), valor, erros)
+    if erros:
+        raise ErroValidacao(erros)
+    return valor
+
+
+def validar_obra(obra):
+    """
+    Converte e valida uma obra (formato de `utils.pipeline.calcular_obra`): os campos da obra e
+    todas as suas áreas.
+
+    Returns:
+        Obra: A obra validada.
+
+    Raises:
+        ErroValidacao: Com todos os campos inválidos da obra e das áreas.
+    """
+    if not isinstance(obra, dict):
+        raise ErroValidacao([_erro(None, 'obra', None, "deve ser um objeto com os campos da obra")])
+    erros = []
+    valores = {}
+    for campo in CAMPOS_OBRA:
+        valores[campo.nome] = _converter_valor(campo, obra.get(campo.nome), erros)
+    areas = validar_areas(obra.get('areas', []), erros)
+    if erros:
+        raise ErroValidacao(_ordenar(erros))
+    return Obra(obra.get('identificacao'), float(valores['fatorAjuste']), int(valores['mesesExecucao']),
+                float(valores['honorarios']), areas, valores['cronograma'])
@@ -0,0 +1,89 @@
+"""
+Arquivos estáticos com impressão digital (fingerprint) no nome.
+
+Cada arquivo de `static/` é servido também em `/assets/<nome>.<hash>.<extensão>`, em que o hash é
+derivado do conteúdo. Como a URL muda sempre que o arquivo muda, essas respostas podem ser
+guardadas pelo navegador e por proxies indefinidamente (Cache-Control: immutable).
+
+As bibliotecas de terceiros (Bootstrap e jQuery) não fazem parte de `static/`: os templates as
+carregam das CDNs, em versões fixas na própria URL.
+"""
+
+import hashlib
+import os
+import threading
+
+MAX_AGE_IMUTAVEL = 31536000  # 1 ano
+TAMANHO_IMPRESSAO = 10
+
+
+class Manifesto:
+    """
+    Mapeia os arquivos de uma pasta estática para os nomes com impressão digital e vice-versa.
+
+    Args:
+        pasta (str): Pasta dos arquivos estáticos.
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.nomes = {}
+        self.originais = {}
+        for raiz, _, arquivos in os.walk(pasta):
+            for arquivo in arquivos:
+                caminho = os.path.join(raiz, arquivo)
+                relativo = os.path.relpath(caminho, pasta).replace(os.sep, '/')
+                with open(caminho, 'rb') as f:
+                    impressao = hashlib.sha256(f.read()).hexdigest()[:TAMANHO_IMPRESSAO]
+                base, extensao = os.path.splitext(relativo)
+                nome = f"{base}.{impressao}{extensao}"
+                self.nomes[relativo] = nome
+                self.originais[nome] = relativo
+
+    def nome(self, arquivo):
+        """
+        Retorna o nome com impressão digital de um arquivo, ou None se ele não existir.
+        """
+        return self.nomes.get(arquivo)
+
+    def original(self, nome):
+        """
+        Retorna o arquivo correspondente a um nome com impressão digital, ou None.
+        """
+        return self.originais.get(nome)
+
+
+_manifestos = {}
+_lock = threading.Lock()
+
+
+def get_manifesto(pasta, recarregar=False):
+    """
+    Retorna o manifesto da pasta, montando-o na primeira chamada (ou sempre, com `recarregar`,
+    para que os arquivos editados durante o desenvolvimento ganhem novas URLs).
+    """
+    manifesto = _manifestos.get(pasta)
+    if manifesto is None or recarregar:
+        with _lock:
+            manifesto = _manifestos[pasta] = Manifesto(pasta)
+    return manifesto
+
+
+def url_estatico(manifesto, arquivo):
+    """
+    URL de um arquivo estático: a versão com impressão digital em `/assets/`.
+
+    Args:
+        manifesto (Manifesto): Manifesto da pasta estática.
+        arquivo (str): Caminho relativo a `static/` (ex.: "styles.css").
+
+    Returns:
+        str: URL do arquivo.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+    """
+    nome = manifesto.nome(arquivo)
+    if nome is not None:
+        return f"/assets/{nome}"
+    raise FileNotFoundError(f"Arquivo estático não encontrado: {arquivo}")
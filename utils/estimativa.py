@@ -0,0 +1,165 @@
+"""
+Estimativa instantânea do RMT e do INSS de uma obra de área única, antes da aferição completa.
+
+Para uma área principal isolada, o RMT do pipeline (`utils.areas.calcular_areas`) é
+
+    área × equivalência(área) × VAU × (categoria × fator social(área) × mão de obra
+                                       + uso na UF × abatimento da categoria × ajuste do concreto)
+
+com os percentuais divididos por 100. A equivalência e o fator social são constantes por faixas de
+área; todo o resto depende apenas da combinação (destinação, material, categoria, UF, concreto
+usinado). Assim, o RMT é linear por partes na área, proporcional ao VAU (CUB + 1%).
+
+`TabelaEstimativas` compila, para cada combinação, os limites das faixas (a união dos limites da
+equivalência da destinação e do fator social) e o coeficiente de cada faixa. A estimativa é uma
+busca binária nos limites e duas multiplicações, sem pandas. As tabelas são recompiladas quando
+mudam as regras vigentes (`utils.regras`) ou os percentuais por UF (`utils.percentuais`).
+`tests/test_estimativa.py` confere que a estimativa coincide ao centavo com o pipeline completo.
+"""
+
+import threading
+from bisect import bisect_left
+
+from utils.calculos import calcular_vau, calcular_inss_economizado, percentual_reducao
+from utils.cub import get_historico_cub, mensagem_sem_cub
+from utils.percentuais import dados_percentuais
+from utils.regras import regras_vigentes
+
+CONCRETO_USINADO = ('Sim', 'Não')
+
+
+class TabelaEstimativas:
+    """
+    Coeficientes do RMT por faixa de área, para cada combinação (destinação, material, categoria,
+    UF, concreto usinado) das regras e da tabela de percentuais.
+
+    Args:
+        regras (Regras): Regras vigentes (`utils.regras`).
+        percentuais (TabelaPercentuais): Percentuais de uso por UF (`utils.percentuais`).
+    """
+
+    def __init__(self, regras, percentuais):
+        self.regras = regras
+        self.percentuais = percentuais
+        self.versao = (regras.vigencia, percentuais.versao)
+        self.tabelas = {
+            (destinacao, material, categoria, uf, concreto): self._compilar(destinacao, material, categoria,
+                                                                            uf, concreto)
+            for destinacao in regras.destinacoes
+            for material in regras.materiais
+            for categoria in regras.categorias
+            for uf in percentuais.ufs
+            for concreto in CONCRETO_USINADO
+        }
+
+    def _compilar(self, destinacao, material, categoria, uf, concreto):
+        """
+        Compila os limites das faixas de área e o coeficiente de cada faixa (RMT por m² e por real
+        de VAU) de uma combinação.
+
+        Returns:
+            tuple: (limites, coeficientes), com `len(coeficientes) == len(limites) + 1`.
+        """
+        regras = self.regras
+        limites_equivalencia, equivalencias = regras.faixas_equivalencia(destinacao)
+        limites_fator_social, fatores_sociais = regras.faixas_fator_social()
+        limites = sorted(set(limites_equivalencia) | set(limites_fator_social))
+
+        # Mesma ordem das operações de `calcular_areas` (percentual de NF = 100)
+        categoria_mao_de_obra = regras.percentual_categoria(categoria) / 100
+        mao_de_obra = regras.percentual_mao_de_obra(destinacao, material) / 100
+        credito = (self.percentuais.percentual(uf, destinacao) / 100) \
+            * (regras.percentual_categoria_remuneracao(categoria) / 100) \
+            * ((5 if concreto == 'Sim' else 0) / 100)
+
+        coeficientes = []
+        for faixa in range(len(limites) + 1):
+            # Uma área da faixa fica acima de `limites[faixa - 1]` e até `limites[faixa]`
+            if faixa < len(limites):
+                equivalencia = equivalencias[bisect_left(limites_equivalencia, limites[faixa])]
+                fator_social = fatores_sociais[bisect_left(limites_fator_social, limites[faixa])]
+            else:
+                equivalencia, fator_social = equivalencias[-1], fatores_sociais[-1]
+            coeficientes.append((equivalencia / 100)
+                                * (categoria_mao_de_obra * (fator_social / 100) * mao_de_obra + credito))
+        return limites, coeficientes
+
+    def faixas(self, destinacao, material, categoria, uf, concreto='Não'):
+        """
+        Retorna (limites, coeficientes) da combinação. Combinações fora das tabelas (destinação,
+        material, categoria ou UF desconhecidos) são compiladas na hora, com os mesmos padrões do
+        pipeline.
+        """
+        chave = (destinacao, material, categoria, uf, concreto)
+        tabela = self.tabelas.get(chave)
+        return tabela if tabela is not None else self._compilar(*chave)
+
+    def estimar(self, destinacao, material, categoria, uf, area, cub, concreto='Não'):
+        """
+        Estima o RMT e o INSS de uma obra com uma única área principal.
+
+        Args:
+            destinacao (str): Destinação da área.
+            material (str): Material predominante.
+            categoria (str): Categoria da obra.
+            uf (str): UF da obra.
+            area (float): Área aferida para cálculo (m²).
+            cub (float): CUB do mês anterior à aferição.
+            concreto (str): "Sim" se houver concreto usinado.
+
+        Returns:
+            dict: RMT, coeficiente e limites da faixa de área, redução e valores do INSS.
+        """
+        limites, coeficientes = self.faixas(destinacao, material, categoria, uf, concreto)
+        faixa = bisect_left(limites, area)
+        rmt = area * coeficientes[faixa] * calcular_vau(cub)
+        reducao = percentual_reducao([categoria])
+        inss_devido, inss_a_pagar, economia_gerada = calcular_inss_economizado(rmt, reducao)
+        return {
+            'rmt': rmt,
+            'cub': cub,
+            'coeficiente': coeficientes[faixa],
+            'faixa': [limites[faixa - 1] if faixa > 0 else 0, limites[faixa] if faixa < len(limites) else None],
+            'reducao_percentual': reducao,
+            'inss_devido': inss_devido,
+            'inss_a_pagar': inss_a_pagar,
+            'economia_gerada': economia_gerada,
+        }
+
+
+_tabela = None
+_lock = threading.Lock()
+
+
+def get_tabela_estimativas():
+    """
+    Retorna a tabela de estimativas das regras vigentes e dos percentuais atuais, compilando-a na
+    primeira chamada e sempre que um deles mudar.
+    """
+    global _tabela
+    regras = regras_vigentes()
+    versao = (regras.vigencia, dados_percentuais.versao)
+    if _tabela is None or _tabela.versao != versao:
+        with _lock:
+            if _tabela is None or _tabela.versao != versao:
+                _tabela = TabelaEstimativas(regras, dados_percentuais)
+    return _tabela
+
+
+def estimar(destinacao, material, categoria, uf, area, cub=None, mes=None, concreto='Não'):
+    """
+    Estima o RMT e o INSS de uma obra de área única (ver `TabelaEstimativas.estimar`).
+
+    Sem `cub`, usa o CUB do histórico local (`utils.cub`) para a UF e a destinação no mês `mes`
+    ("YYYY-MM", o mês anterior ao da aferição).
+
+    Raises:
+        ValueError: Se a área for negativa ou o CUB não for informado nem encontrado no histórico.
+    """
+    if area < 0:
+        raise ValueError("a área deve ser maior ou igual a 0")
+    if cub is None:
+        cub = get_historico_cub().valor(uf, destinacao, mes) if mes else None
+        if cub is None:
+            raise ValueError(mensagem_sem_cub(uf, destinacao, mes))
+    return get_tabela_estimativas().estimar(destinacao, material, categoria, uf, area, cub, concreto)
@@ -0,0 +1,203 @@
+"""
+Exportação dos resultados de cálculo em CSV, XLSX e Parquet.
+
+As tabelas exportadas trazem os valores numéricos (sem formatação de moeda), com uma coluna
+"obra" identificando cada obra:
+    - "areas": tabela de áreas (uma linha por área).
+    - "afericao": aferição indireta (uma linha por obra).
+    - "financeira": tabela financeira (uma linha por mês).
+    - "inss": INSS detalhado (uma linha por obra).
+
+A escrita é feita em fluxo: os resultados chegam de um gerador (ex.: `utils.lote.iterar_lote`) e
+cada obra é escrita assim que calculada, de modo que uma carteira inteira nunca fica em memória.
+
+XLSX requer o pacote opcional `openpyxl` e Parquet requer `pyarrow`.
+"""
+
+import io
+import tempfile
+
+import pandas as pd
+
+TABELAS = ('areas', 'afericao', 'financeira', 'inss')
+FORMATOS = ('csv', 'xlsx', 'parquet')
+TIPOS_MIME = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+COLUNAS_FINANCEIRA = ['meses', 'remuneracao', 'icm', 'valor_atualizado', 'cpp', 'multa',
+                      'juros_mora', 'maed_minima', 'total']
+
+
+def tabela_da_obra(resultado, tabela):
+    """
+    Monta a tabela numérica (DataFrame) de uma obra a partir do resultado detalhado de
+    `utils.pipeline.calcular_obra`. Retorna None para resultados com erro.
+
+    Args:
+        resultado (dict): Resultado de `calcular_obra(..., detalhado=True)`.
+        tabela (str): Uma de "areas", "afericao", "financeira" ou "inss".
+
+    Returns:
+        DataFrame | None: Tabela da obra, com a coluna "obra" na frente.
+    """
+    if 'erro' in resultado:
+        return None
+    if tabela == 'areas':
+        df = pd.DataFrame(resultado['tabela_areas'])
+    elif tabela == 'afericao':
+        df = pd.DataFrame([{chave: resultado[chave] for chave in
+                            ('rmt_total', 'fator_ajuste', 'rmt_ajustado', 'meses_execucao', 'remuneracao_mensal')}])
+    elif tabela == 'financeira':
+        df = pd.DataFrame({coluna: resultado['tabela_financeira'][coluna] for coluna in COLUNAS_FINANCEIRA})
+        df = df.rename(columns={'meses': 'mes'})
+    elif tabela == 'inss':
+        df = pd.DataFrame([resultado['inss']])
+    else:
+        raise ValueError(f"Tabela desconhecida: {tabela}")
+    df.insert(0, 'obra', resultado.get('identificacao'))
+    return df
+
+
+def iterar_tabelas(resultados, tabela):
+    """
+    Converte um iterável de resultados em um gerador de DataFrames (um por obra), ignorando
+    obras com erro e tabelas vazias.
+    """
+    for resultado in resultados:
+        df = tabela_da_obra(resultado, tabela)
+        if df is not None and not df.empty:
+            yield df
+
+
+class _Coletor(io.RawIOBase):
+    """
+    Arquivo somente-escrita que acumula os bytes escritos até serem drenados.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def drenar(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        return dados
+
+
+def gerar_csv(partes):
+    """
+    Gera o CSV (bytes UTF-8) em partes, uma por DataFrame recebido. O cabeçalho vem do primeiro.
+    """
+    colunas = None
+    for df in partes:
+        if colunas is None:
+            colunas = list(df.columns)
+            yield df.to_csv(index=False).encode('utf-8')
+        else:
+            yield df.reindex(columns=colunas).to_csv(index=False, header=False).encode('utf-8')
+
+
+def gerar_parquet(partes):
+    """
+    Gera o arquivo Parquet (bytes) em partes: cada DataFrame recebido vira um row group.
+    O esquema é o do primeiro DataFrame.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    coletor = _Coletor()
+    escritor = None
+    for df in partes:
+        if escritor is None:
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            escritor = pq.ParquetWriter(coletor, tabela.schema)
+        else:
+            tabela = pa.Table.from_pandas(df.reindex(columns=escritor.schema.names), schema=escritor.schema,
+                                          preserve_index=False)
+        escritor.write_table(tabela)
+        yield coletor.drenar()
+    if escritor is not None:
+        escritor.close()
+    yield coletor.drenar()
+
+
+def gerar_xlsx(partes):
+    """
+    Gera a planilha XLSX (bytes). As linhas são gravadas em modo de escrita contínua do
+    `openpyxl` em um arquivo temporário, que é lido em partes ao final (o formato é um ZIP e
+    não pode ser produzido incrementalmente).
+    """
+    from openpyxl import Workbook
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet()
+    colunas = None
+    for df in partes:
+        if colunas is None:
+            colunas = list(df.columns)
+            planilha.append(colunas)
+        for linha in df.reindex(columns=colunas).itertuples(index=False, name=None):
+            planilha.append([None if pd.isna(valor) else valor for valor in linha])
+
+    with tempfile.TemporaryFile() as arquivo:
+        livro.save(arquivo)
+        arquivo.seek(0)
+        while True:
+            dados = arquivo.read(1 << 16)
+            if not dados:
+                return
+            yield dados
+
+
+GERADORES = {'csv': gerar_csv, 'xlsx': gerar_xlsx, 'parquet': gerar_parquet}
+
+
+def exportar(resultados, tabela, formato):
+    """
+    Gera o arquivo exportado de uma tabela, em partes (bytes), a partir de um iterável de resultados
+    detalhados. Adequado tanto para gravar em disco quanto para uma resposta HTTP em fluxo.
+
+    Args:
+        resultados (iterable): Resultados de `calcular_obra(..., detalhado=True)`.
+        tabela (str): Uma de `TABELAS`.
+        formato (str): Um de `FORMATOS`.
+
+    Yields:
+        bytes: Partes do arquivo.
+    """
+    if tabela not in TABELAS:
+        raise ValueError(f"Tabela desconhecida: {tabela}. Use uma de: {', '.join(TABELAS)}")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de: {', '.join(FORMATOS)}")
+    for dados in GERADORES[formato](iterar_tabelas(resultados, tabela)):
+        if dados:
+            yield dados
+
+
+def exportar_arquivo(resultados, tabela, formato, caminho):
+    """
+    Grava o arquivo exportado em disco, em fluxo.
+
+    Returns:
+        int: Quantidade de bytes gravados.
+    """
+    total = 0
+    with open(caminho, 'wb') as arquivo:
+        for dados in exportar(resultados, tabela, formato):
+            arquivo.write(dados)
+            total += len(dados)
+    return total
@@ -0,0 +1,395 @@
+"""
+Motor numérico da tabela financeira.
+
+Calcula, para todo o período de uma só vez, os encargos mensais (Valor Atualizado, CPP, Multa,
+Juros de Mora, MAED Mínima e Total) como arrays NumPy. Nenhum valor é formatado aqui: a conversão
+para texto acontece apenas na renderização (ver `utils.tabelas.formatar_tabela_financeira`). Os
+valores mensais são arredondados ao centavo em um único ponto (`centavos_mensais`), e todos os totais
+(tabela, totais sem a tabela, páginas, carteiras e cenários) somam esses centavos (ver
+`utils.dinheiro`).
+
+Períodos longos (regularizações de dez anos ou mais) podem ser consultados em páginas de meses
+(`pagina_financeira`): apenas os meses da página são formatados e serializados, e os totais
+acumulados até o fim da página saem de `totais_financeiros`, sem montar as linhas dos meses anteriores.
+
+A remuneração pode ser a mesma em todos os meses ou variar mês a mês, como no cronograma com um
+período por área (`remuneracoes_cronograma`), em que os períodos das áreas são combinados em um
+único cronograma mensal.
+"""
+
+import os
+
+import numpy as np
+
+from utils.dinheiro import para_centavos
+from utils.selic import mes_para_indice, indice_para_mes, iterar_meses
+
+ALIQUOTA_CPP = 0.20
+ALIQUOTA_MULTA = 0.20
+JUROS_MORA_DIARIO = 0.0333 / 100  # 0,0333% ao dia
+DIAS_ATRASO = 30
+MAED_INCREMENTO = 2  # pontos percentuais por mês
+MAED_LIMITE = 20     # teto da MAED, em %
+
+LIMITE_PAGINA = int(os.environ.get('INSS_FINANCEIRA_LIMITE', 120))  # meses por página
+LIMITE_PAGINA_MAXIMO = 1200
+COLUNAS_VALORES = ('remuneracao', 'valor_atualizado', 'cpp', 'multa', 'juros_mora', 'maed_minima', 'total')
+COLUNAS_TOTAIS = ('remuneracao', 'valor_atualizado', 'total')
+
+
+def deslocar_selic(selic_rates, inicio, n_meses):
+    """
+    Aplica cada taxa SELIC ao mês seguinte, retornando um array alinhado ao período.
+
+    Cada mês publicado recebe a taxa do mês publicado imediatamente anterior (o primeiro recebe 0).
+    Meses sem taxa publicada recebem 0.
+
+    Args:
+        selic_rates (dict): Taxas SELIC com chave no formato "YYYY-MM".
+        inicio (int): Índice sequencial do primeiro mês do período (ver `utils.selic.mes_para_indice`).
+        n_meses (int): Quantidade de meses do período.
+
+    Returns:
+        ndarray: Taxa aplicada (em %) a cada mês do período.
+    """
+    taxas = np.zeros(max(n_meses, 0))
+    if not selic_rates or n_meses <= 0:
+        return taxas
+
+    meses = sorted(selic_rates)
+    indices = np.fromiter((mes_para_indice(mes) for mes in meses), dtype=np.int64, count=len(meses))
+    valores = np.fromiter((selic_rates[mes] for mes in meses), dtype=float, count=len(meses))
+    deslocadas = np.concatenate(([0.0], valores[:-1]))
+
+    no_periodo = (indices >= inicio) & (indices < inicio + n_meses)
+    taxas[indices[no_periodo] - inicio] = deslocadas[no_periodo]
+    return taxas
+
+
+def rampa_maed(n_meses, deslocamento=0):
+    """
+    Retorna o percentual da MAED Mínima de cada mês: 2, 4, 6, ... limitado a 20. Com `deslocamento`,
+    a rampa começa no mês de posição `deslocamento` do período (ex.: numa página de meses).
+    """
+    posicoes = np.arange(deslocamento + 1, deslocamento + max(n_meses, 0) + 1)
+    return np.minimum(MAED_INCREMENTO * posicoes, MAED_LIMITE).astype(float)
+
+
+def calcular_financeiro(start_date, end_date, remuneration, selic_rates, deslocamento=0, limite=None):
+    """
+    Calcula os encargos mensais do período em arrays NumPy.
+
+    Args:
+        start_date (str): Data inicial no formato "YYYY-MM".
+        end_date (str): Data final no formato "YYYY-MM".
+        remuneration (float ou array-like): Valor da remuneração base de cada mês: o mesmo para
+                                            todo o período, ou um valor por mês do período.
+        selic_rates (dict): Taxas SELIC com chave "YYYY-MM", cobrindo ao menos do mês anterior
+                            a `start_date` até `end_date`.
+        deslocamento (int): Quantidade de meses iniciais do período a pular. A MAED Mínima continua
+                            contada a partir de `start_date`.
+        limite (int, opcional): Quantidade máxima de meses calculados a partir do deslocamento.
+
+    Returns:
+        dict: Dicionário com a lista "meses" ("YYYY-MM") e os arrays "remuneracao", "icm",
+              "valor_atualizado", "cpp", "multa", "juros_mora", "maed_minima" e "total".
+    """
+    inicio = mes_para_indice(start_date)
+    n_periodo = max(mes_para_indice(end_date) - inicio + 1, 0)
+    deslocamento = min(deslocamento, n_periodo)
+    n_meses = n_periodo - deslocamento if limite is None else min(n_periodo - deslocamento, limite)
+    inicio += deslocamento
+
+    icm = deslocar_selic(selic_rates, inicio, n_meses)
+    if np.ndim(remuneration):
+        remuneracao = np.asarray(remuneration, dtype=float)
+        if len(remuneracao) != n_periodo:
+            raise ValueError(f"{len(remuneracao)} remunerações mensais para um período de {n_periodo} meses")
+        remuneracao = remuneracao[deslocamento:deslocamento + n_meses]
+    else:
+        remuneracao = np.full(n_meses, float(remuneration))
+    return {
+        'meses': list(iterar_meses(indice_para_mes(inicio), indice_para_mes(inicio + n_meses - 1))),
+        'remuneracao': remuneracao,
+        'icm': icm,
+        **_encargos(remuneracao, icm, rampa_maed(n_meses, deslocamento)),
+    }
+
+
+def _encargos(remuneracao, icm, maed):
+    """
+    Encargos mensais a partir da remuneração, da taxa aplicada e do percentual da MAED Mínima de
+    cada mês. Aceita linhas de vários períodos ou remunerações (arrays de duas dimensões, um mês por
+    coluna); as operações são as mesmas, na mesma ordem, em todos os casos.
+    """
+    valor_atualizado = remuneracao * (1 + icm / 100)
+    cpp = valor_atualizado * ALIQUOTA_CPP
+    multa = cpp * ALIQUOTA_MULTA
+    juros_mora = JUROS_MORA_DIARIO * valor_atualizado * DIAS_ATRASO
+    maed_minima = valor_atualizado * (maed / 100)
+    total = cpp + multa + juros_mora + maed_minima
+    return {
+        'valor_atualizado': valor_atualizado,
+        'cpp': cpp,
+        'multa': multa,
+        'juros_mora': juros_mora,
+        'maed_minima': maed_minima,
+        'total': total,
+    }
+
+
+class SerieSelic:
+    """
+    Taxas SELIC já deslocadas para o mês de aplicação (ver `deslocar_selic`), em um único array
+    contínuo, para recortar as taxas de qualquer período sem percorrer o dicionário. Pode ser montada
+    uma única vez e compartilhada por todas as obras de uma carteira.
+
+    Args:
+        selic_rates (dict): Taxas SELIC com chave no formato "YYYY-MM".
+    """
+
+    __slots__ = ('inicio', 'taxas')
+
+    def __init__(self, selic_rates):
+        self.inicio = 0
+        self.taxas = np.zeros(0)
+        if not selic_rates:
+            return
+        meses = sorted(selic_rates)
+        indices = np.fromiter((mes_para_indice(mes) for mes in meses), dtype=np.int64, count=len(meses))
+        valores = np.fromiter((selic_rates[mes] for mes in meses), dtype=float, count=len(meses))
+        self.inicio = int(indices[0])
+        self.taxas = np.zeros(int(indices[-1]) - self.inicio + 1)
+        self.taxas[indices - self.inicio] = np.concatenate(([0.0], valores[:-1]))
+
+    def periodo(self, inicio, n_meses):
+        """
+        Retorna a taxa aplicada a cada um dos `n_meses` a partir do índice `inicio` (0 nos meses sem
+        taxa publicada). Com um array de inícios, retorna uma linha por início.
+        """
+        n_meses = max(n_meses, 0)
+        if np.ndim(inicio) == 0:
+            # Um único período: recorte contíguo da série
+            taxas = np.zeros(n_meses)
+            a, b = max(inicio - self.inicio, 0), min(inicio - self.inicio + n_meses, len(self.taxas))
+            if b > a:
+                taxas[a - (inicio - self.inicio):b - (inicio - self.inicio)] = self.taxas[a:b]
+            return taxas
+        posicoes = np.asarray(inicio)[:, None] - self.inicio + np.arange(n_meses)
+        if len(self.taxas) == 0:
+            return np.zeros(posicoes.shape)
+        dentro = (posicoes >= 0) & (posicoes < len(self.taxas))
+        return np.where(dentro, self.taxas[np.clip(posicoes, 0, len(self.taxas) - 1)], 0.0)
+
+
+# Valores mensais calculados por bloco nos totais, para limitar a memória de carteiras e cenários
+_VALORES_BLOCO = 1 << 18
+
+
+def _centavos_totais(remuneracao, icm, maed):
+    # Somas, por linha, dos valores mensais arredondados ao centavo, como na tabela exibida
+    encargos = _encargos(remuneracao, icm, maed)
+    encargos['remuneracao'] = np.broadcast_to(remuneracao, encargos['total'].shape)
+    return dict(zip(COLUNAS_TOTAIS, centavos_mensais(encargos, COLUNAS_TOTAIS).sum(axis=-1)))
+
+
+def totais_financeiros(start_date, end_date, remuneracoes, selic_rates):
+    """
+    Calcula apenas os totais da tabela financeira (Remuneração, Valor Atualizado e Total), sem
+    montar a tabela: os valores mensais ficam em arrays NumPy, são arredondados ao centavo e somados
+    (ver `utils.dinheiro`), sem linhas, dicionários nem textos por mês. Os totais são os mesmos da
+    linha "Total" de `utils.tabelas.formatar_tabela_financeira`, ao centavo.
+
+    Args:
+        start_date (str): Data inicial no formato "YYYY-MM".
+        end_date (str): Data final no formato "YYYY-MM".
+        remuneracoes (float ou array-like): Remuneração base de cada mês. Um array calcula os totais
+                                            de várias remunerações (ex.: cenários) de uma só vez, e
+                                            uma matriz (remunerações × meses), de várias remunerações
+                                            que variam mês a mês.
+        selic_rates (dict ou SerieSelic): Taxas SELIC (ver `calcular_financeiro`), ou a série já
+                                          montada.
+
+    Returns:
+        dict: "meses" (quantidade) e os totais "remuneracao", "valor_atualizado" e "total"
+              (floats, ou arrays quando `remuneracoes` é um array).
+    """
+    serie = selic_rates if isinstance(selic_rates, SerieSelic) else SerieSelic(selic_rates)
+    inicio = mes_para_indice(start_date)
+    n_meses = max(mes_para_indice(end_date) - inicio + 1, 0)
+    remuneracoes = np.asarray(remuneracoes, dtype=float)
+    linhas = remuneracoes.reshape(-1, 1) if remuneracoes.ndim < 2 else remuneracoes
+    if linhas.shape[1] not in (1, n_meses):
+        raise ValueError(f"{linhas.shape[1]} remunerações mensais para um período de {n_meses} meses")
+
+    icm, maed = serie.periodo(inicio, n_meses), rampa_maed(n_meses)
+    centavos = {coluna: np.zeros(len(linhas), dtype=np.int64) for coluna in COLUNAS_TOTAIS}
+    passo = max(_VALORES_BLOCO // max(n_meses, 1), 1)
+    for a in range(0, len(linhas), passo):
+        for coluna, valores in _centavos_totais(linhas[a:a + passo], icm, maed).items():
+            centavos[coluna][a:a + passo] = valores
+    if remuneracoes.ndim == 0:
+        return {'meses': n_meses, **{coluna: int(valores[0]) / 100 for coluna, valores in centavos.items()}}
+    return {'meses': n_meses, **{coluna: valores / 100 for coluna, valores in centavos.items()}}
+
+
+def totais_carteira(inicios, fins, remuneracoes, selic_rates):
+    """
+    Totais da tabela financeira (ver `totais_financeiros`) de uma carteira inteira de uma só vez,
+    com um período e uma remuneração por obra. As obras são agrupadas pela quantidade de meses, e
+    cada grupo é calculado em blocos de linhas (uma por obra).
+
+    Args:
+        inicios (iterable): Mês inicial ("YYYY-MM") de cada obra.
+        fins (iterable): Mês final ("YYYY-MM") de cada obra.
+        remuneracoes (array-like): Remuneração base mensal de cada obra.
+        selic_rates (dict ou SerieSelic): Taxas SELIC que cobrem todos os períodos.
+
+    Returns:
+        dict: Arrays "meses", "remuneracao", "valor_atualizado" e "total", um valor por obra.
+    """
+    serie = selic_rates if isinstance(selic_rates, SerieSelic) else SerieSelic(selic_rates)
+    inicio = np.fromiter((mes_para_indice(mes) for mes in inicios), dtype=np.int64)
+    fim = np.fromiter((mes_para_indice(mes) for mes in fins), dtype=np.int64, count=len(inicio))
+    n_meses = np.maximum(fim - inicio + 1, 0)
+    remuneracoes = np.asarray(remuneracoes, dtype=float).reshape(-1, 1)
+
+    centavos = {coluna: np.zeros(len(inicio), dtype=np.int64) for coluna in COLUNAS_TOTAIS}
+    for n in np.unique(n_meses).tolist():
+        obras = np.flatnonzero(n_meses == n)
+        maed = rampa_maed(n)
+        passo = max(_VALORES_BLOCO // max(n, 1), 1)
+        for a in range(0, len(obras), passo):
+            bloco = obras[a:a + passo]
+            for coluna, valores in _centavos_totais(remuneracoes[bloco], serie.periodo(inicio[bloco], n),
+                                                    maed).items():
+                centavos[coluna][bloco] = valores
+    return {'meses': n_meses, **{coluna: valores / 100 for coluna, valores in centavos.items()}}
+
+
+def centavos_mensais(financeiro, colunas=COLUNAS_VALORES):
+    """
+    Valores mensais das colunas arredondados ao centavo: o único ponto de arredondamento dos valores
+    da tabela financeira (ver `utils.dinheiro`).
+
+    Args:
+        financeiro (dict): Arrays de valores mensais (ver `calcular_financeiro`), de uma ou mais linhas.
+        colunas (tuple): Colunas a arredondar.
+
+    Returns:
+        ndarray: Centavos (int64), uma linha por coluna (na ordem de `colunas`).
+    """
+    return para_centavos(np.stack([financeiro[coluna] for coluna in colunas]))
+
+
+def somar_mensais(financeiro, colunas=COLUNAS_TOTAIS):
+    """
+    Totais das colunas: somas dos valores mensais arredondados ao centavo (`centavos_mensais`), em reais.
+
+    Returns:
+        dict: Total de cada coluna.
+    """
+    return dict(zip(colunas, (centavos_mensais(financeiro, colunas).sum(axis=-1) / 100).tolist()))
+
+
+def pagina_financeira(start_date, end_date, remuneration, selic_rates, cursor=None, limite=LIMITE_PAGINA):
+    """
+    Calcula uma página de meses da tabela financeira, sem calcular nem serializar os demais meses.
+
+    Args:
+        start_date (str): Data inicial do período no formato "YYYY-MM".
+        end_date (str): Data final do período no formato "YYYY-MM".
+        remuneration (float ou array-like): Remuneração base de cada mês (ver `calcular_financeiro`).
+        selic_rates (dict): Taxas SELIC (ver `calcular_financeiro`).
+        cursor (str, opcional): Primeiro mês ("YYYY-MM") da página; por padrão, o início do período.
+        limite (int): Quantidade máxima de meses da página (1 a `LIMITE_PAGINA_MAXIMO`).
+
+    Returns:
+        dict: "cursor" (primeiro mês da página), "proximo" (cursor da página seguinte, ou None na
+              última), "tabela_financeira" (meses e arrays da página, como em `calcular_financeiro`),
+              "subtotais" da página e "acumulado" (totais do início do período até o fim da página),
+              somas dos valores mensais arredondados ao centavo, como na tabela exibida.
+
+    Raises:
+        ValueError: Se o cursor estiver fora do período ou o limite fora do intervalo permitido.
+    """
+    if not 1 <= limite <= LIMITE_PAGINA_MAXIMO:
+        raise ValueError(f"o limite deve estar entre 1 e {LIMITE_PAGINA_MAXIMO} meses")
+    inicio = mes_para_indice(start_date)
+    n_periodo = max(mes_para_indice(end_date) - inicio + 1, 0)
+    deslocamento = 0 if cursor is None else mes_para_indice(cursor) - inicio
+    if not 0 <= deslocamento < max(n_periodo, 1):
+        raise ValueError(f"cursor {cursor} fora do período {start_date} a {end_date}")
+
+    financeiro = calcular_financeiro(start_date, end_date, remuneration, selic_rates, deslocamento, limite)
+    fim_pagina = deslocamento + len(financeiro['meses'])
+    if np.ndim(remuneration):
+        # Remuneração mês a mês: os acumulados somam os valores mensais desde o início do período
+        anteriores = calcular_financeiro(start_date, end_date, remuneration, selic_rates, 0, fim_pagina)
+        acumulado = {'meses': fim_pagina, **somar_mensais(anteriores)}
+    else:
+        acumulado = totais_financeiros(start_date, indice_para_mes(inicio + fim_pagina - 1), remuneration,
+                                       selic_rates)
+    return {
+        'cursor': indice_para_mes(inicio + deslocamento),
+        'proximo': indice_para_mes(inicio + fim_pagina) if fim_pagina < n_periodo else None,
+        'tabela_financeira': financeiro,
+        'subtotais': somar_mensais(financeiro, COLUNAS_VALORES),
+        'acumulado': acumulado,
+    }
+
+
+def remuneracoes_cronograma(start_date, end_date, inicios, fins, valores):
+    """
+    Combina vários períodos (ex.: uma fase da obra por área) em um único cronograma mensal: cada
+    período soma o seu valor a todos os seus meses. Os limites dos períodos são percorridos uma única
+    vez, em ordem, mantendo a soma dos períodos ativos; cada trecho entre dois limites recebe essa
+    soma de uma vez, sem montar um array por período. A soma é compensada (Neumaier), para que
+    entradas e saídas de períodos não acumulem erro de arredondamento.
+
+    Args:
+        start_date (str): Primeiro mês ("YYYY-MM") do cronograma.
+        end_date (str): Último mês ("YYYY-MM") do cronograma.
+        inicios (iterable): Mês inicial ("YYYY-MM") de cada período.
+        fins (iterable): Mês final ("YYYY-MM") de cada período. Períodos vazios são ignorados, e os
+                         meses fora do cronograma, descartados.
+        valores (array-like): Valor mensal de cada período.
+
+    Returns:
+        ndarray: Soma dos valores dos períodos ativos em cada mês do cronograma (0 nos meses sem
+                 período ativo).
+    """
+    primeiro = mes_para_indice(start_date)
+    n_meses = max(mes_para_indice(end_date) - primeiro + 1, 0)
+    valores = np.asarray(valores, dtype=float)
+    inicio = np.fromiter((mes_para_indice(mes) for mes in inicios), dtype=np.int64, count=len(valores)) - primeiro
+    fim = np.fromiter((mes_para_indice(mes) for mes in fins), dtype=np.int64, count=len(valores)) - primeiro + 1
+    inicio, fim = np.clip(inicio, 0, n_meses), np.clip(fim, 0, n_meses)
+    validos = fim > inicio
+
+    # Eventos: o valor entra no primeiro mês do período e sai no mês seguinte ao último
+    limites = np.concatenate((inicio[validos], fim[validos]))
+    deltas = np.concatenate((valores[validos], -valores[validos]))
+    entradas = np.concatenate((np.ones(validos.sum(), dtype=np.int64), -np.ones(validos.sum(), dtype=np.int64)))
+    ordem = np.argsort(limites, kind='stable')
+    limites, deltas, entradas = limites[ordem].tolist(), deltas[ordem].tolist(), entradas[ordem].tolist()
+
+    remuneracoes = np.zeros(n_meses)
+    soma = compensacao = 0.0
+    ativos = 0
+    for k, (limite, delta, entrada) in enumerate(zip(limites, deltas, entradas)):
+        ativos += entrada
+        if ativos == 0:
+            # Sem períodos ativos, a soma é exatamente zero (sem resíduo de arredondamento)
+            soma = compensacao = 0.0
+        else:
+            parcial = soma + delta
+            if abs(soma) >= abs(delta):
+                compensacao += (soma - parcial) + delta
+            else:
+                compensacao += (delta - parcial) + soma
+            soma = parcial
+        proximo = limites[k + 1] if k + 1 < len(limites) else n_meses
+        if proximo > limite:
+            remuneracoes[limite:proximo] = soma + compensacao
+    return remuneracoes
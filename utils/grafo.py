@@ -0,0 +1,192 @@
+"""
+Grafo de dependências das etapas de cálculo, com recálculo incremental.
+
+Cada etapa declara explicitamente suas entradas (parâmetros da obra ou resultados de outras etapas).
+Em uma `Sessao`, o resultado de cada etapa fica memorizado junto com as entradas que o produziram: ao
+executar o grafo de novo, apenas as etapas com alguma entrada alterada são recalculadas. Se uma etapa
+recalculada produzir o mesmo valor de antes (por exemplo, o mesmo RMT total), as etapas seguintes
+também são poupadas.
+
+As sessões ficam em memória no processo (`SessoesCalculo`), com descarte LRU.
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+from utils.cache import chave_canonica
+from utils.metricas import medir
+
+TAMANHO_SESSOES = int(os.environ.get('INSS_SESSOES', 1024))
+
+
+def _iguais(a, b):
+    """
+    Compara valores de entrada: identidade, ou igualdade quando ela é bem definida (números, textos,
+    listas e dicionários sem arrays). Valores não comparáveis são considerados diferentes.
+    """
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+class Etapa:
+    """
+    Etapa do grafo.
+
+    Args:
+        nome (str): Nome da etapa (também o nome do seu resultado).
+        funcao (callable): Função que recebe as entradas, na ordem declarada.
+        entradas (tuple): Nomes das entradas (parâmetros ou outras etapas).
+        chave (callable, opcional): Recebe as entradas e retorna as partes da chave do cache de
+                                    resultados (`utils.cache`). Sem ela, a etapa não usa o cache.
+    """
+
+    __slots__ = ('nome', 'funcao', 'entradas', 'chave')
+
+    def __init__(self, nome, funcao, entradas, chave=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = tuple(entradas)
+        self.chave = chave
+
+
+class Grafo:
+    """
+    Grafo acíclico de etapas, executado em ordem topológica.
+
+    Args:
+        etapas (list): Lista de `Etapa`.
+
+    Raises:
+        ValueError: Se houver nomes repetidos ou ciclos.
+    """
+
+    def __init__(self, etapas):
+        por_nome = {}
+        for etapa in etapas:
+            if etapa.nome in por_nome:
+                raise ValueError(f"Etapa repetida: {etapa.nome}")
+            por_nome[etapa.nome] = etapa
+
+        ordem, visitando, visitadas = [], set(), set()
+
+        def visitar(nome):
+            if nome in visitadas or nome not in por_nome:
+                return
+            if nome in visitando:
+                raise ValueError(f"Ciclo no grafo de etapas, passando por {nome}")
+            visitando.add(nome)
+            for entrada in por_nome[nome].entradas:
+                visitar(entrada)
+            visitando.discard(nome)
+            visitadas.add(nome)
+            ordem.append(por_nome[nome])
+
+        for etapa in etapas:
+            visitar(etapa.nome)
+        self.etapas = ordem
+        self.parametros = tuple(sorted({entrada for etapa in ordem for entrada in etapa.entradas} - set(por_nome)))
+
+    def executar(self, entradas, sessao=None, cache=None):
+        """
+        Executa o grafo.
+
+        Args:
+            entradas (dict): Valores dos parâmetros. Também pode trazer o resultado pronto de uma
+                             etapa (pelo nome dela), que então não é executada.
+            sessao (Sessao, opcional): Sessão com os resultados memorizados da execução anterior.
+            cache (CacheResultados, opcional): Cache de resultados para as etapas com chave.
+
+        Returns:
+            dict: Parâmetros e resultados de todas as etapas.
+        """
+        faltantes = [parametro for parametro in self.parametros if parametro not in entradas]
+        if faltantes:
+            raise ValueError(f"Entradas ausentes: {', '.join(faltantes)}")
+
+        valores = dict(entradas)
+        recalculadas = []
+        for etapa in self.etapas:
+            if etapa.nome in entradas:
+                continue
+            argumentos = tuple(valores[entrada] for entrada in etapa.entradas)
+            if sessao is not None:
+                memorizado = sessao.memoria.get(etapa.nome)
+                if memorizado is not None and len(memorizado[0]) == len(argumentos) and all(
+                        _iguais(anterior, atual) for anterior, atual in zip(memorizado[0], argumentos)):
+                    valores[etapa.nome] = memorizado[1]
+                    continue
+            with medir(etapa.nome):
+                if cache is not None and etapa.chave is not None:
+                    valor = cache.obter_ou_calcular(chave_canonica(etapa.nome, *etapa.chave(*argumentos)),
+                                                    etapa.funcao, *argumentos)
+                else:
+                    valor = etapa.funcao(*argumentos)
+            valores[etapa.nome] = valor
+            recalculadas.append(etapa.nome)
+            if sessao is not None:
+                sessao.memoria[etapa.nome] = (argumentos, valor)
+        if sessao is not None:
+            sessao.recalculadas = recalculadas
+        return valores
+
+
+class Sessao:
+    """
+    Resultados memorizados das etapas para uma sessão de cálculo (ex.: um usuário variando o fator
+    de ajuste de uma mesma obra).
+    """
+
+    __slots__ = ('id', 'memoria', 'recalculadas', 'lock')
+
+    def __init__(self, id=None):
+        self.id = id or uuid.uuid4().hex
+        self.memoria = {}        # nome da etapa -> (entradas, resultado)
+        self.recalculadas = []   # etapas recalculadas na última execução
+        self.lock = threading.Lock()
+
+
+class SessoesCalculo:
+    """
+    Sessões de cálculo em memória, com descarte LRU.
+
+    Args:
+        tamanho (int): Quantidade máxima de sessões mantidas.
+    """
+
+    def __init__(self, tamanho=TAMANHO_SESSOES):
+        self.tamanho = tamanho
+        self._sessoes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, id=None):
+        """
+        Retorna a sessão com o id informado, ou uma nova sessão se o id for omitido ou desconhecido.
+        """
+        with self._lock:
+            sessao = self._sessoes.get(id) if id else None
+            if sessao is None:
+                sessao = Sessao()
+                self._sessoes[sessao.id] = sessao
+                while len(self._sessoes) > self.tamanho:
+                    self._sessoes.popitem(last=False)
+            self._sessoes.move_to_end(sessao.id)
+            return sessao
+
+
+_sessoes_padrao = None
+
+
+def get_sessoes():
+    """
+    Retorna as sessões de cálculo compartilhadas pelo processo, criando-as na primeira chamada.
+    """
+    global _sessoes_padrao
+    if _sessoes_padrao is None:
+        _sessoes_padrao = SessoesCalculo()
+    return _sessoes_padrao
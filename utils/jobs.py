@@ -0,0 +1,411 @@
+"""
+Fila de cálculos em segundo plano, gravada em SQLite (sem broker externo).
+
+    fila = get_fila()
+    id, duplicado = fila.submeter('lote', obras)
+    fila.estado(id)      # {"estado": "executando", "total": 5000, "concluidas": 1200, ...}
+    fila.resultado(id)   # JSON (bytes) quando concluído
+
+Os jobs ("calcular", uma obra, ou "lote", uma lista de obras) são gravados em `INSS_JOBS_DB` e
+executados por threads trabalhadoras no próprio processo da aplicação (`INSS_JOBS_WORKERS`) ou por
+um processo dedicado:
+
+    python -m utils.jobs --workers 2
+
+O estado fica no SQLite: um job interrompido (reinício do worker) volta para a fila quando seu
+último sinal de vida fica mais antigo que `INSS_JOBS_TIMEOUT` segundos, até `TENTATIVAS_MAXIMAS`
+vezes. A aplicação inicia as threads trabalhadoras na primeira requisição de cada processo (ou na
+subida, no modo ASGI; ver `app.iniciar_jobs`), e os jobs pendentes ou abandonados deixados por uma
+execução anterior são retomados sem esperar por uma nova submissão. Um job idêntico (mesmo tipo e
+mesma entrada) a outro ainda pendente ou em execução não é criado de novo: o id do existente é
+devolvido.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from utils.cache import chave_canonica
+
+CAMINHO_PADRAO = os.environ.get(
+    'INSS_JOBS_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'jobs.sqlite3')
+)
+WORKERS_PADRAO = int(os.environ.get('INSS_JOBS_WORKERS', 1))
+TIMEOUT_PADRAO = float(os.environ.get('INSS_JOBS_TIMEOUT', 60))                # segundos
+RETENCAO_PADRAO = float(os.environ.get('INSS_JOBS_RETENCAO', 7 * 24 * 60 * 60))  # segundos
+TENTATIVAS_MAXIMAS = 3
+TIPOS = ('calcular', 'lote')
+
+logger = logging.getLogger('inss.jobs')
+
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+
+# Intervalo mínimo, em segundos, entre as gravações de progresso de um job
+INTERVALO_PROGRESSO = 1.0
+# Quantidade de obras calculadas por vez em um job de lote
+BLOCO_LOTE = 500
+
+
+def executar_job(tipo, entrada, progresso=None):
+    """
+    Executa o cálculo de um job.
+
+    Args:
+        tipo (str): "calcular" (uma obra, resultado detalhado como em `/api/calcular`) ou "lote"
+                    (lista de obras, como em `/api/batch`).
+        entrada: Obra ou lista de obras.
+        progresso (callable, opcional): Chamada com a quantidade de obras já calculadas.
+
+    Returns:
+        bytes: Resultado em JSON.
+    """
+    from utils.cache import get_cache
+    from utils.lote import iterar_lote
+    from utils.pipeline import calcular_obra
+    from utils.serializacao import dumps
+
+    if tipo == 'calcular':
+        return dumps(calcular_obra(entrada, detalhado=True, cache=get_cache()))
+    resultados = []
+    for resultado in iterar_lote(entrada, bloco=BLOCO_LOTE):
+        resultados.append(resultado)
+        if progresso is not None:
+            progresso(len(resultados))
+    return dumps({'resultados': resultados})
+
+
+class FilaJobs:
+    """
+    Fila de jobs persistida em SQLite.
+
+    Args:
+        caminho (str): Arquivo SQLite. Use ":memory:" para uma fila volátil (apenas no processo).
+        timeout (float): Segundos sem sinal de vida após os quais um job em execução é retomado.
+        executor (callable): Função `(tipo, entrada, progresso) -> bytes` que executa um job.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO, timeout=TIMEOUT_PADRAO, executor=executar_job):
+        self.caminho = caminho
+        self.timeout = timeout
+        self.executor = executor
+        self._conexao = None
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = os.getpid()
+        self._parar = threading.Event()
+        self._novos = threading.Condition()
+
+    def _conectar(self):
+        if self._conexao is None:
+            if self.caminho != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False,
+                                            isolation_level=None)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " chave TEXT NOT NULL,"
+                " tipo TEXT NOT NULL,"
+                " estado TEXT NOT NULL,"
+                " entrada TEXT NOT NULL,"
+                " resultado BLOB,"
+                " erro TEXT,"
+                " total INTEGER NOT NULL,"
+                " concluidas INTEGER NOT NULL DEFAULT 0,"
+                " tentativas INTEGER NOT NULL DEFAULT 0,"
+                " criado_em REAL NOT NULL,"
+                " iniciado_em REAL,"
+                " finalizado_em REAL,"
+                " sinal_em REAL)"
+            )
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS jobs_estado ON jobs (estado, criado_em)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS jobs_chave ON jobs (chave, estado)")
+        return self._conexao
+
+    def submeter(self, tipo, entrada):
+        """
+        Enfileira um job, ou devolve o id de um job idêntico ainda pendente ou em execução.
+
+        Args:
+            tipo (str): "calcular" ou "lote".
+            entrada: Obra (dict) ou lista de obras, conforme o tipo.
+
+        Returns:
+            tuple: (id do job, True se for um job já existente).
+
+        Raises:
+            ValueError: Se o tipo ou a entrada forem inválidos.
+        """
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de job desconhecido: {tipo}")
+        if tipo == 'calcular' and not isinstance(entrada, dict):
+            raise ValueError("um job 'calcular' recebe uma obra")
+        if tipo == 'lote' and not isinstance(entrada, list):
+            raise ValueError("um job 'lote' recebe uma lista de obras")
+
+        chave = chave_canonica('job', tipo, entrada)
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                linha = conexao.execute(
+                    "SELECT id FROM jobs WHERE chave = ? AND estado IN (?, ?) ORDER BY criado_em LIMIT 1",
+                    (chave, PENDENTE, EXECUTANDO)).fetchone()
+                if linha is None:
+                    id = uuid.uuid4().hex
+                    conexao.execute(
+                        "INSERT INTO jobs (id, chave, tipo, estado, entrada, total, criado_em)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (id, chave, tipo, PENDENTE, json.dumps(entrada, ensure_ascii=False),
+                         1 if tipo == 'calcular' else len(entrada), time.time()))
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        if linha is not None:
+            return linha[0], True
+        with self._novos:
+            self._novos.notify()
+        return id, False
+
+    def estado(self, id):
+        """
+        Retorna o estado de um job (sem o resultado), ou None se o id for desconhecido.
+        """
+        with self._lock:
+            linha = self._conectar().execute(
+                "SELECT id, tipo, estado, erro, total, concluidas, tentativas, criado_em, iniciado_em,"
+                " finalizado_em FROM jobs WHERE id = ?", (id,)).fetchone()
+        if linha is None:
+            return None
+        estado = dict(zip(('id', 'tipo', 'estado', 'erro', 'total', 'concluidas', 'tentativas', 'criado_em',
+                           'iniciado_em', 'finalizado_em'), linha))
+        estado['progresso'] = estado['concluidas'] / estado['total'] if estado['total'] else 1.0
+        return estado
+
+    def resultado(self, id):
+        """
+        Retorna o resultado (JSON em bytes) de um job concluído, ou None.
+        """
+        with self._lock:
+            linha = self._conectar().execute(
+                "SELECT resultado FROM jobs WHERE id = ? AND estado = ?", (id, CONCLUIDO)).fetchone()
+        return None if linha is None else bytes(linha[0])
+
+    def _encerrar_esgotados(self, conexao, agora):
+        """
+        Encerra com erro os jobs abandonados (sem sinal de vida há mais de `timeout` segundos) que já
+        esgotaram as tentativas. Executado dentro da transação de quem reserva ou recupera jobs.
+        """
+        conexao.execute(
+            "UPDATE jobs SET estado = ?, erro = ?, finalizado_em = ?"
+            " WHERE estado = ? AND sinal_em < ? AND tentativas >= ?",
+            (ERRO, "Job interrompido repetidamente", agora, EXECUTANDO, agora - self.timeout, TENTATIVAS_MAXIMAS))
+
+    def _reservar(self):
+        """
+        Reserva o próximo job pendente (ou em execução sem sinal de vida recente).
+
+        Returns:
+            tuple: (id, tipo, entrada) ou None se não houver job disponível.
+        """
+        agora = time.time()
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                self._encerrar_esgotados(conexao, agora)
+                linha = conexao.execute(
+                    "SELECT id, tipo, entrada FROM jobs"
+                    " WHERE estado = ? OR (estado = ? AND sinal_em < ?)"
+                    " ORDER BY criado_em LIMIT 1",
+                    (PENDENTE, EXECUTANDO, agora - self.timeout)).fetchone()
+                if linha is not None:
+                    conexao.execute(
+                        "UPDATE jobs SET estado = ?, tentativas = tentativas + 1, concluidas = 0,"
+                        " iniciado_em = ?, sinal_em = ? WHERE id = ?",
+                        (EXECUTANDO, agora, agora, linha[0]))
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        if linha is None:
+            return None
+        return linha[0], linha[1], json.loads(linha[2])
+
+    def recuperar(self):
+        """
+        Devolve à fila os jobs em execução sem sinal de vida há mais de `timeout` segundos
+        (abandonados por um worker que parou), ou os encerra com erro se já esgotaram as tentativas.
+        Jobs com sinal de vida recente podem estar com outro processo e não são alterados.
+
+        Returns:
+            int: Quantidade de jobs devolvidos à fila.
+        """
+        agora = time.time()
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                self._encerrar_esgotados(conexao, agora)
+                recuperados = conexao.execute(
+                    "UPDATE jobs SET estado = ?, concluidas = 0 WHERE estado = ? AND sinal_em < ?",
+                    (PENDENTE, EXECUTANDO, agora - self.timeout)).rowcount
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        if recuperados:
+            logger.info("%d job(s) abandonado(s) devolvido(s) à fila %s", recuperados, self.caminho)
+        return recuperados
+
+    def _atualizar(self, sql, parametros):
+        with self._lock:
+            self._conectar().execute(sql, parametros)
+
+    def processar_proximo(self):
+        """
+        Executa o próximo job disponível, se houver.
+
+        Returns:
+            bool: True se algum job foi executado.
+        """
+        reservado = self._reservar()
+        if reservado is None:
+            return False
+        id, tipo, entrada = reservado
+        ultimo = [time.monotonic()]
+
+        def progresso(concluidas):
+            agora = time.monotonic()
+            if agora - ultimo[0] >= INTERVALO_PROGRESSO:
+                ultimo[0] = agora
+                self._atualizar("UPDATE jobs SET concluidas = ? WHERE id = ?", (concluidas, id))
+
+        # Sinal de vida periódico enquanto o job executa (um job sem sinal é considerado abandonado)
+        finalizado = threading.Event()
+
+        def sinal_de_vida():
+            while not finalizado.wait(self.timeout / 3):
+                self._atualizar("UPDATE jobs SET sinal_em = ? WHERE id = ?", (time.time(), id))
+
+        threading.Thread(target=sinal_de_vida, name=f'jobs-sinal-{id[:8]}', daemon=True).start()
+        try:
+            resultado = self.executor(tipo, entrada, progresso)
+        except Exception as e:
+            logger.error("Erro no job %s (%s): %s", id, tipo, e, exc_info=True)
+            self._atualizar("UPDATE jobs SET estado = ?, erro = ?, finalizado_em = ? WHERE id = ?",
+                            (ERRO, f"{type(e).__name__}: {e}", time.time(), id))
+        else:
+            self._atualizar("UPDATE jobs SET estado = ?, resultado = ?, concluidas = total, finalizado_em = ?"
+                            " WHERE id = ?", (CONCLUIDO, resultado, time.time(), id))
+        finally:
+            finalizado.set()
+        return True
+
+    def limpar(self, retencao=RETENCAO_PADRAO):
+        """
+        Remove os jobs finalizados há mais de `retencao` segundos.
+        """
+        self._atualizar("DELETE FROM jobs WHERE estado IN (?, ?) AND finalizado_em < ?",
+                        (CONCLUIDO, ERRO, time.time() - retencao))
+
+    def _trabalhar(self, preparar=False):
+        if preparar:
+            # Feito na thread, e não em `iniciar`, para não atrasar a subida da aplicação
+            try:
+                self.recuperar()
+                self.limpar()
+            except sqlite3.Error as e:
+                logger.error("Erro na fila de jobs %s: %s", self.caminho, e)
+        while not self._parar.is_set():
+            try:
+                if self.processar_proximo():
+                    continue
+            except sqlite3.Error as e:
+                logger.error("Erro na fila de jobs %s: %s", self.caminho, e)
+            with self._novos:
+                self._novos.wait(timeout=min(self.timeout / 2, 5))
+
+    def iniciar(self, workers=WORKERS_PADRAO):
+        """
+        Inicia as threads trabalhadoras no processo (apenas na primeira chamada). A primeira thread
+        devolve à fila os jobs abandonados (ver `recuperar`) antes de começar; os jobs pendentes são
+        executados em seguida.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                # Processo filho de um fork (ex.: gunicorn --preload): as threads e a conexão do
+                # processo pai não existem aqui
+                self._threads, self._conexao, self._pid = [], None, os.getpid()
+            if self._threads or workers <= 0:
+                return
+            for numero in range(workers):
+                thread = threading.Thread(target=self._trabalhar, args=(numero == 0,), name=f'jobs-{numero}',
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def parar(self):
+        """
+        Sinaliza às threads trabalhadoras que terminem após o job em andamento.
+        """
+        self._parar.set()
+        with self._novos:
+            self._novos.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._parar.clear()
+
+
+_fila_padrao = None
+
+
+def get_fila():
+    """
+    Retorna a fila de jobs compartilhada pelo processo, criando-a na primeira chamada.
+    """
+    global _fila_padrao
+    if _fila_padrao is None:
+        _fila_padrao = FilaJobs()
+    return _fila_padrao
+
+
+def set_fila(fila):
+    """
+    Substitui a fila de jobs compartilhada (por exemplo, por uma em memória nos testes).
+    """
+    global _fila_padrao
+    _fila_padrao = fila
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m utils.jobs',
+                                     description="Executa os jobs da fila de cálculos em segundo plano.")
+    parser.add_argument('--workers', type=int, default=max(WORKERS_PADRAO, 1), help="Threads trabalhadoras")
+    args = parser.parse_args(argv)
+
+    fila = get_fila()
+    fila.iniciar(args.workers)
+    print(f"Processando jobs de {fila.caminho} com {args.workers} worker(s). Ctrl+C para sair.", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fila.parar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Cálculo em lote (carteira de obras).
+
+O trabalho compartilhado é feito uma única vez por bloco de obras: as taxas SELIC são obtidas em
+uma só consulta, cobrindo a união dos períodos do bloco (em `calcular_lote`, o bloco é o lote
+inteiro), e os CUBs não informados são resolvidos no histórico de uma só vez para todas as áreas. O
+cálculo de cada obra é distribuído em um pool de processos.
+
+Para carteiras grandes, `iterar_lote` consome as obras de qualquer iterável e devolve os
+resultados à medida que cada bloco termina, sem manter o lote inteiro em memória.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+from utils.cub import preencher_cub, mes_referencia_cub
+from utils.esquema import ErroValidacao
+from utils.pipeline import calcular_obra, periodo_obra, intervalo_selic
+from utils.selic import get_selic_store, indice_para_mes, mes_para_indice
+
+# Abaixo deste tamanho o custo de subir o pool de processos supera o ganho
+LOTE_MINIMO_PARALELO = 64
+# Quantidade de obras lidas e calculadas por vez em `iterar_lote`
+TAMANHO_BLOCO = 2000
+
+
+def _calcular_obra_segura(obra, selic_rates, detalhado=False):
+    """
+    Calcula uma obra, convertendo qualquer erro em um resultado com a chave "erro".
+    """
+    try:
+        return calcular_obra(obra, selic_rates, detalhado=detalhado)
+    except Exception as e:
+        identificacao = obra.get('identificacao') if isinstance(obra, dict) else None
+        resultado = {'identificacao': identificacao, 'erro': f"{type(e).__name__}: {e}"}
+        if isinstance(e, ErroValidacao):
+            resultado['erros'] = e.erros
+        return resultado
+
+
+def intervalo_selic_bloco(obras):
+    """
+    Retorna o intervalo de meses de taxas SELIC que cobre os períodos das obras do bloco, ou None se
+    nenhuma obra tiver um período legível. Obras com meses malformados (ex.: "2021/01") ficam de fora
+    do intervalo e são reportadas individualmente no cálculo.
+    """
+    periodos = []
+    for obra in obras:
+        try:
+            inicio, fim = periodo_obra(obra)
+            periodos.append((indice_para_mes(mes_para_indice(inicio)), indice_para_mes(mes_para_indice(fim))))
+        except Exception:
+            continue  # A obra inválida será reportada individualmente no cálculo
+    return intervalo_selic(periodos) if periodos else None
+
+
+def _selic_do_bloco(obras):
+    """
+    Obtém, em uma única consulta, as taxas SELIC que cobrem os períodos de todas as obras do bloco.
+    """
+    intervalo = intervalo_selic_bloco(obras)
+    return get_selic_store().obter(*intervalo) if intervalo is not None else {}
+
+
+def _cub_do_bloco(obras):
+    """
+    Preenche, em uma única consulta ao histórico do CUB, as áreas sem CUB de todas as obras do bloco.
+    """
+    indices, meses = [], []
+    for i, obra in enumerate(obras):
+        try:
+            meses.append(mes_referencia_cub(obra, periodo_obra(obra)[1]))
+            indices.append(i)
+        except Exception:
+            continue  # A obra inválida será reportada individualmente no cálculo
+    preenchidas = preencher_cub([obras[i] for i in indices], meses)
+    obras = list(obras)
+    for i, obra in zip(indices, preenchidas):
+        obras[i] = obra
+    return obras
+
+
+def iterar_lote(obras, workers=None, chunksize=None, detalhado=False, bloco=TAMANHO_BLOCO):
+    """
+    Calcula as obras de um iterável em blocos, produzindo os resultados na mesma ordem.
+
+    Args:
+        obras (iterable): Obras no formato de `utils.pipeline.calcular_obra` (pode ser um gerador).
+        workers (int, opcional): Número de processos. Por padrão, usa a quantidade de CPUs;
+                                 com 1 (ou blocos pequenos) o cálculo é feito no próprio processo.
+        chunksize (int, opcional): Quantidade de obras enviada a cada processo por vez.
+        detalhado (bool): Inclui as tabelas de áreas e financeira em cada resultado.
+        bloco (int): Quantidade de obras lidas, calculadas e devolvidas por vez.
+
+    Yields:
+        dict: Resultado numérico de cada obra. Obras inválidas produzem um dicionário com
+              "identificacao" e "erro", sem interromper o restante do lote.
+    """
+    workers = workers or os.cpu_count() or 1
+    obras = iter(obras)
+    executor = None
+    try:
+        while True:
+            obras_bloco = list(islice(obras, bloco))
+            if not obras_bloco:
+                return
+            selic_rates = _selic_do_bloco(obras_bloco)
+            obras_bloco = _cub_do_bloco(obras_bloco)
+
+            if workers <= 1 or len(obras_bloco) < LOTE_MINIMO_PARALELO:
+                for obra in obras_bloco:
+                    yield _calcular_obra_segura(obra, selic_rates, detalhado)
+                continue
+
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            tamanho = chunksize or max(1, len(obras_bloco) // (workers * 4))
+            yield from executor.map(_calcular_obra_segura, obras_bloco, repeat(selic_rates),
+                                    repeat(detalhado), chunksize=tamanho)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def calcular_lote(obras, workers=None, chunksize=None):
+    """
+    Calcula uma lista de obras, retornando os resultados na mesma ordem.
+
+    Args:
+        obras (list): Lista de obras no formato de `utils.pipeline.calcular_obra`.
+        workers (int, opcional): Número de processos. Por padrão, usa a quantidade de CPUs;
+                                 com 1 (ou lotes pequenos) o cálculo é feito no próprio processo.
+        chunksize (int, opcional): Quantidade de obras enviada a cada processo por vez.
+
+    Returns:
+        list: Resultados numéricos de cada obra. Obras inválidas retornam um dicionário com
+              "identificacao" e "erro", sem interromper o restante do lote.
+    """
+    obras = list(obras)
+    return list(iterar_lote(obras, workers, chunksize, bloco=max(len(obras), 1)))
+
+
+def ler_ndjson(linhas):
+    """
+    Lê obras no formato NDJSON (um objeto JSON por linha), ignorando linhas em branco.
+    """
+    return list(iterar_ndjson(linhas))
+
+
+def iterar_ndjson(linhas):
+    """
+    Lê obras no formato NDJSON (um objeto JSON por linha) de forma preguiçosa, ignorando linhas em branco.
+    """
+    return (json.loads(linha) for linha in linhas if linha.strip())
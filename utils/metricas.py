@@ -0,0 +1,248 @@
+"""
+Instrumentação do cálculo: tempos por etapa, contadores e exposição no formato Prometheus.
+
+    with medir('areas'):
+        ...
+
+    @cronometrado('formatar_financeira')
+    def formatar_tabela_financeira(...):
+        ...
+
+Os tempos são acumulados em histogramas (`inss_etapa_segundos`) e os eventos em contadores
+(ex.: acertos e faltas no armazenamento SELIC); `exportar_prometheus` gera o texto servido em
+`/metrics`. Com `INSS_METRICAS=0`, `medir` devolve um contexto vazio e `cronometrado` devolve a
+própria função, de modo que a instrumentação não tem custo.
+
+Com `INSS_LOG_TEMPOS=1`, cada requisição também registra uma linha JSON (logger "inss.tempos")
+com a duração total e o tempo de cada etapa executada.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+
+ATIVO = os.environ.get('INSS_METRICAS', '1') != '0'
+LOG_TEMPOS = os.environ.get('INSS_LOG_TEMPOS', '0') == '1'
+
+# Limites (em segundos) dos buckets dos histogramas
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger('inss.tempos')
+if LOG_TEMPOS and not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+# Tempos das etapas da requisição em andamento (None quando o log de tempos está desativado)
+_tempos_requisicao = ContextVar('tempos_requisicao', default=None)
+
+_NULO = nullcontext()
+
+
+class Histograma:
+    """
+    Histograma cumulativo no formato do Prometheus, com buckets fixos (`BUCKETS`).
+    """
+
+    __slots__ = ('contagens', 'soma', 'total')
+
+    def __init__(self):
+        self.contagens = [0] * (len(BUCKETS) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(BUCKETS, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Registro:
+    """
+    Registro de métricas do processo: contadores e histogramas, identificados pelo nome e
+    pelos rótulos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = {}   # nome -> {rótulos: valor}
+        self._histogramas = {}  # nome -> {rótulos: Histograma}
+        self._descricoes = {}
+
+    def descrever(self, nome, descricao):
+        self._descricoes[nome] = descricao
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def observar(self, nome, valor, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._histogramas.setdefault(nome, {})
+            histograma = serie.get(chave)
+            if histograma is None:
+                histograma = serie[chave] = Histograma()
+            histograma.observar(valor)
+
+    def valor(self, nome, **rotulos):
+        """
+        Retorna o valor atual de um contador (0 se ainda não incrementado).
+        """
+        return self._contadores.get(nome, {}).get(tuple(sorted(rotulos.items())), 0)
+
+    def limpar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def exportar_prometheus(self):
+        """
+        Gera o texto das métricas no formato de exposição do Prometheus (versão 0.0.4).
+        """
+        linhas = []
+        with self._lock:
+            for nome, serie in sorted(self._contadores.items()):
+                self._cabecalho(linhas, nome, 'counter')
+                for chave, valor in sorted(serie.items()):
+                    linhas.append(f"{nome}{_rotulos(chave)} {valor}")
+            for nome, serie in sorted(self._histogramas.items()):
+                self._cabecalho(linhas, nome, 'histogram')
+                for chave, histograma in sorted(serie.items()):
+                    acumulado = 0
+                    for limite, contagem in zip(BUCKETS + ('+Inf',), histograma.contagens):
+                        acumulado += contagem
+                        linhas.append(f"{nome}_bucket{_rotulos(chave + (('le', str(limite)),))} {acumulado}")
+                    linhas.append(f"{nome}_sum{_rotulos(chave)} {histograma.soma}")
+                    linhas.append(f"{nome}_count{_rotulos(chave)} {histograma.total}")
+        return '\n'.join(linhas) + '\n'
+
+    def _cabecalho(self, linhas, nome, tipo):
+        if nome in self._descricoes:
+            linhas.append(f"# HELP {nome} {self._descricoes[nome]}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(chave):
+    if not chave:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in chave) + '}'
+
+
+registro = Registro()
+registro.descrever('inss_etapa_segundos', 'Duração das etapas do cálculo, em segundos.')
+registro.descrever('inss_requisicao_segundos', 'Duração das requisições HTTP, em segundos.')
+registro.descrever('inss_requisicoes_total', 'Requisições HTTP atendidas, por rota e status.')
+registro.descrever('inss_erros_total', 'Erros reportados ao usuário, por rota.')
+registro.descrever('selic_consultas_total', 'Consultas ao armazenamento SELIC, por resultado (acerto ou falta).')
+registro.descrever('selic_api_segundos', 'Latência das consultas à API do Banco Central, em segundos.')
+registro.descrever('selic_api_falhas_total', 'Consultas à API do Banco Central que falharam.')
+registro.descrever('cache_resultados_total', 'Consultas ao cache de resultados, por resultado (acerto ou falta).')
+
+
+class _Cronometro:
+    __slots__ = ('etapa', 'inicio')
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracao = time.perf_counter() - self.inicio
+        registro.observar('inss_etapa_segundos', duracao, etapa=self.etapa)
+        tempos = _tempos_requisicao.get()
+        if tempos is not None:
+            tempos[self.etapa] = tempos.get(self.etapa, 0.0) + duracao
+        return False
+
+
+def medir(etapa):
+    """
+    Contexto que mede a duração de uma etapa.
+
+    Args:
+        etapa (str): Nome da etapa (rótulo "etapa" do histograma `inss_etapa_segundos`).
+    """
+    return _Cronometro(etapa) if ATIVO else _NULO
+
+
+def cronometrado(etapa):
+    """
+    Decorador que mede a duração de cada chamada da função como uma etapa (ver `medir`).
+    """
+    def decorador(funcao):
+        if not ATIVO:
+            return funcao
+
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            with _Cronometro(etapa):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+
+def incrementar(nome, valor=1, **rotulos):
+    """
+    Incrementa um contador do registro do processo.
+    """
+    if ATIVO:
+        registro.incrementar(nome, valor, **rotulos)
+
+
+def observar(nome, valor, **rotulos):
+    """
+    Registra uma observação (ex.: uma latência em segundos) em um histograma do registro do processo.
+    """
+    if ATIVO:
+        registro.observar(nome, valor, **rotulos)
+
+
+def iniciar_requisicao():
+    """
+    Marca o início de uma requisição. Retorna o instante inicial, a ser passado a `finalizar_requisicao`.
+    """
+    if LOG_TEMPOS:
+        _tempos_requisicao.set({})
+    return time.perf_counter()
+
+
+def finalizar_requisicao(inicio, rota, metodo, status):
+    """
+    Registra a duração da requisição e, com `INSS_LOG_TEMPOS=1`, a linha de log com os tempos das etapas.
+    """
+    duracao = time.perf_counter() - inicio
+    if ATIVO:
+        registro.observar('inss_requisicao_segundos', duracao, rota=rota)
+        registro.incrementar('inss_requisicoes_total', rota=rota, metodo=metodo, status=status)
+    tempos = _tempos_requisicao.get()
+    if tempos is not None:
+        _tempos_requisicao.set(None)
+        logger.info(json.dumps({
+            'rota': rota,
+            'metodo': metodo,
+            'status': status,
+            'duracao_ms': round(duracao * 1000, 3),
+            'etapas_ms': {etapa: round(segundos * 1000, 3) for etapa, segundos in tempos.items()},
+        }, ensure_ascii=False))
+
+
+def exportar_prometheus():
+    """
+    Retorna as métricas do processo no formato de exposição do Prometheus.
+    """
+    return registro.exportar_prometheus()
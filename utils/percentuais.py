@@ -0,0 +1,140 @@
+"""
+Tabela de percentuais de uso por UF e destinação, em forma compacta.
+
+UFs e destinações recebem códigos inteiros que indexam uma pequena matriz de percentuais. Como várias
+UFs têm exatamente os mesmos percentuais, cada linha distinta é armazenada uma única vez e as UFs
+apontam para ela (`linha_da_uf`).
+
+A tabela continua acessível como um dicionário de dicionários (`tabela['SP']['Casa Popular']`,
+`tabela.get(uf, {}).get(destinacao, 0)`), e `percentuais` consulta colunas inteiras de uma só vez.
+
+Os valores são lidos de `data/percentuais_uf.csv` (ou do arquivo indicado por `INSS_PERCENTUAIS_CSV`),
+com uma coluna "UF" e uma coluna por destinação. Para aplicar percentuais atualizados pela RFB, basta
+substituir o CSV.
+"""
+
+import csv
+import hashlib
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+CAMINHO_PADRAO = os.environ.get(
+    'INSS_PERCENTUAIS_CSV',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'percentuais_uf.csv')
+)
+
+
+class _LinhaUF(Mapping):
+    """
+    Percentuais de uma UF, acessíveis pelo nome da destinação.
+    """
+
+    __slots__ = ('_tabela', '_linha')
+
+    def __init__(self, tabela, linha):
+        self._tabela = tabela
+        self._linha = linha
+
+    def __getitem__(self, destinacao):
+        valor = self._tabela.matriz[self._linha, self._tabela.codigo_destinacao[destinacao]]
+        if np.isnan(valor):
+            raise KeyError(destinacao)
+        return float(valor)
+
+    def __iter__(self):
+        linha = self._tabela.matriz[self._linha]
+        return (destinacao for destinacao, valor in zip(self._tabela.destinacoes, linha) if not np.isnan(valor))
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self._tabela.matriz[self._linha])))
+
+
+class TabelaPercentuais(Mapping):
+    """
+    Percentuais de uso por UF e destinação.
+
+    Args:
+        percentuais (dict): Dicionário {UF: {destinação: percentual}}.
+    """
+
+    def __init__(self, percentuais):
+        self.ufs = tuple(percentuais)
+        self.destinacoes = tuple(sorted({destinacao for linha in percentuais.values() for destinacao in linha}))
+        self.codigo_uf = {uf: codigo for codigo, uf in enumerate(self.ufs)}
+        self.codigo_destinacao = {destinacao: codigo for codigo, destinacao in enumerate(self.destinacoes)}
+
+        # Linhas distintas armazenadas uma única vez; NaN marca destinação sem percentual na UF
+        linhas = {}
+        linha_da_uf = []
+        for uf in self.ufs:
+            valores = tuple(float(percentuais[uf].get(destinacao, np.nan)) for destinacao in self.destinacoes)
+            chave = tuple('nan' if np.isnan(valor) else valor for valor in valores)
+            if chave not in linhas:
+                linhas[chave] = (len(linhas), valores)
+            linha_da_uf.append(linhas[chave][0])
+        self.matriz = np.array([valores for _, valores in linhas.values()], dtype=float).reshape(
+            len(linhas), len(self.destinacoes))
+        self.linha_da_uf = np.array(linha_da_uf, dtype=np.intp)
+        self.versao = hashlib.sha256(repr((self.ufs, self.destinacoes, self.linha_da_uf.tolist(),
+                                           self.matriz.tolist())).encode('utf-8')).hexdigest()[:16]
+
+    def __getitem__(self, uf):
+        return _LinhaUF(self, self.linha_da_uf[self.codigo_uf[uf]])
+
+    def __iter__(self):
+        return iter(self.ufs)
+
+    def __len__(self):
+        return len(self.ufs)
+
+    def percentual(self, uf, destinacao, padrao=0):
+        """
+        Retorna o percentual de uso de uma UF e destinação, ou `padrao` se não houver.
+        """
+        codigo_uf = self.codigo_uf.get(uf)
+        codigo_destinacao = self.codigo_destinacao.get(destinacao)
+        if codigo_uf is None or codigo_destinacao is None:
+            return padrao
+        valor = self.matriz[self.linha_da_uf[codigo_uf], codigo_destinacao]
+        return padrao if np.isnan(valor) else float(valor)
+
+    def percentuais(self, ufs, destinacoes, padrao=0):
+        """
+        Consulta os percentuais de colunas inteiras de UFs e destinações.
+
+        Args:
+            ufs (array-like): UF de cada linha.
+            destinacoes (array-like): Destinação de cada linha.
+            padrao (float): Valor usado para UF ou destinação sem percentual.
+
+        Returns:
+            ndarray: Percentual de cada linha (float).
+        """
+        codigos_uf = np.fromiter((self.codigo_uf.get(uf, -1) for uf in ufs), dtype=np.intp)
+        codigos_destinacao = np.fromiter((self.codigo_destinacao.get(destinacao, -1) for destinacao in destinacoes),
+                                         dtype=np.intp, count=len(codigos_uf))
+        validos = (codigos_uf >= 0) & (codigos_destinacao >= 0)
+        resultado = np.full(len(codigos_uf), float(padrao))
+        valores = self.matriz[self.linha_da_uf[codigos_uf[validos]], codigos_destinacao[validos]]
+        resultado[validos] = np.where(np.isnan(valores), padrao, valores)
+        return resultado
+
+
+def carregar_percentuais(caminho=CAMINHO_PADRAO):
+    """
+    Lê a tabela de percentuais de um CSV com a coluna "UF" e uma coluna por destinação
+    (células vazias indicam destinação sem percentual na UF).
+
+    Returns:
+        TabelaPercentuais: Tabela carregada.
+    """
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        return TabelaPercentuais({
+            linha.pop('UF'): {destinacao: float(valor) for destinacao, valor in linha.items() if valor not in ('', None)}
+            for linha in csv.DictReader(arquivo)
+        })
+
+
+dados_percentuais = carregar_percentuais()
@@ -0,0 +1,500 @@
+"""
+Pipeline de cálculo de uma obra, independente do Flask.
+
+Executa as mesmas etapas do formulário (`app.submit`): tabela de áreas, aferição indireta,
+tabela financeira e INSS detalhado, retornando apenas os valores numéricos.
+
+Uma obra é um dicionário com os mesmos nomes de campo do formulário HTML:
+
+    {
+        "identificacao": "Obra 1",
+        "mesInicio": "2022-10",
+        "mesFim": "2023-09",
+        "fatorAjuste": 50,
+        "mesesExecucao": 12,
+        "honorarios": 30,
+        "areas": [
+            {"identificacao": "Torre A", "categoria": "Obra Nova", "material": "Alvenaria",
+             "tipoArea": "Principal", "areaTotal": 150, "CUB": 2100.5, "uf": "SP",
+             "concretoUsinado": "Sim", "destinacao": "Residencial Unifamiliar",
+             "valorNotasFiscais": 0, "areaAferida": 140}
+        ]
+    }
+
+O campo "CUB" de cada área é opcional: quando omitido, é obtido do histórico local do CUB
+(`utils.cub`) para a UF e a destinação da área, no mês anterior ao da aferição ("mesAfericao",
+também opcional; por padrão, o mês seguinte ao fim da obra).
+
+Por padrão, a tabela financeira usa um único período para a obra (o menor "mesInicio" e o maior
+"mesFim", da obra ou das áreas), com o RMT ajustado de todas as áreas em todos os meses. Com
+"cronograma": "areas", cada área tem o seu próprio período ("mesInicio"/"mesFim" da área; sem eles,
+o período da obra), e a remuneração de cada mês soma o RMT das áreas em execução naquele mês,
+ajustado pelo fator: fases escalonadas não contam o RMT de uma área fora dos seus meses.
+"""
+
+from itertools import zip_longest
+
+import numpy as np
+
+from utils.areas import calcular_areas, ordem_areas
+from utils.cache import chave_canonica
+from utils.cub import get_historico_cub, mensagem_sem_cub, mes_referencia_cub
+from utils.calculos import calcular_inss_economizado, percentual_reducao
+from utils.esquema import (
+    Areas,
+    ErroValidacao,
+    validar_areas,
+    validar_mes,
+    validar_obra,
+    FATOR_AJUSTE_PADRAO,
+    MESES_EXECUCAO_PADRAO,
+    HONORARIOS_PADRAO,
+    CRONOGRAMA_AREAS
+)
+from utils.financeiro import (
+    calcular_financeiro,
+    somar_mensais,
+    totais_financeiros,
+    pagina_financeira,
+    remuneracoes_cronograma,
+    LIMITE_PAGINA
+)
+from utils.grafo import Grafo, Etapa
+from utils.percentuais import dados_percentuais
+from utils.regras import regras_vigentes
+from utils.selic import get_selic_store, mes_para_indice, indice_para_mes
+
+MES_INICIO_PADRAO = '2022-10'
+MES_FIM_PADRAO = '2023-09'
+
+# Campo do esquema (`utils.esquema.CAMPOS_AREA`) → coluna dos dados de `calcular_areas`
+COLUNAS_DADOS = {
+    'identificacao': 'Identificação',
+    'categoria': 'Categoria',
+    'material': 'Material',
+    'tipoArea': 'Tipo area',
+    'areaTotal': 'Área Total',
+    'CUB': 'CUB',
+    'uf': 'UF',
+    'concretoUsinado': 'Concreto usinado',
+    'destinacao': 'destinacao',
+    'valorNotasFiscais': 'valor_notas_fiscais',
+    'areaAferida': 'Área Total Aferida para Cálculo',
+}
+
+
+def montar_dados_areas(areas):
+    """
+    Converte as áreas de uma obra (campos do formulário) no formato usado por
+    `gerar_tabela_areas_principais`.
+
+    Args:
+        areas (list | Areas): Lista de dicionários com os campos de cada área, ou as áreas já
+                              validadas (`utils.esquema.validar_areas`).
+
+    Returns:
+        dict: Colunas (listas) com os dados das áreas, uma posição por área.
+
+    Raises:
+        ErroValidacao: Com todos os campos inválidos das áreas, inclusive as áreas sem CUB.
+    """
+    if not isinstance(areas, Areas):
+        areas = validar_areas(areas)
+    sem_cub = np.flatnonzero(np.isnan(areas['CUB']))
+    if len(sem_cub):
+        raise ErroValidacao([_erro_cub(areas, i) for i in sem_cub.tolist()])
+    return {coluna: list(areas[campo]) if isinstance(areas[campo], list) else areas[campo].tolist()
+            for campo, coluna in COLUNAS_DADOS.items()}
+
+
+def _erro_cub(areas, i):
+    return {'area': i + 1, 'campo': 'CUB', 'valor': None,
+            'mensagem': f"{mensagem_sem_cub(areas['uf'][i], areas['destinacao'][i])} "
+                        f"(área '{areas['identificacao'][i]}')"}
+
+
+def completar_cub(areas, mes):
+    """
+    Preenche, com o histórico do CUB no mês `mes`, o CUB das áreas validadas que não o informam.
+    """
+    sem_cub = np.flatnonzero(np.isnan(areas['CUB']))
+    if len(sem_cub):
+        areas['CUB'][sem_cub] = get_historico_cub().valores(
+            [areas['uf'][i] for i in sem_cub.tolist()], [areas['destinacao'][i] for i in sem_cub.tolist()],
+            [mes] * len(sem_cub))
+    return areas
+
+
+def periodo_obra(obra):
+    """
+    Retorna o período (mês inicial, mês final) da tabela financeira de uma obra.
+
+    Assim como no formulário, usa o menor mês de início e o maior mês de fim informados,
+    seja na obra ou em cada área.
+    """
+    inicios = [obra['mesInicio']] if obra.get('mesInicio') else []
+    fins = [obra['mesFim']] if obra.get('mesFim') else []
+    for area in obra.get('areas', []):
+        if area.get('mesInicio'):
+            inicios.append(area['mesInicio'])
+        if area.get('mesFim'):
+            fins.append(area['mesFim'])
+    return (min(inicios) if inicios else MES_INICIO_PADRAO,
+            max(fins) if fins else MES_FIM_PADRAO)
+
+
+def intervalo_selic(periodos):
+    """
+    Retorna o intervalo de meses ("YYYY-MM", "YYYY-MM") de taxas SELIC que cobre todos os períodos,
+    incluindo o mês anterior ao início (cada taxa é aplicada ao mês seguinte).
+    """
+    inicio = min(inicio for inicio, _ in periodos)
+    fim = max(fim for _, fim in periodos)
+    return indice_para_mes(mes_para_indice(inicio) - 1), fim
+
+
+def periodos_areas(areas, inicio, fim):
+    """
+    Períodos de execução das áreas validadas, na ordem da tabela de áreas (`utils.areas.ordem_areas`).
+    As áreas sem "mesInicio" ou "mesFim" usam o início ou o fim do período da obra.
+
+    Returns:
+        tuple: (meses iniciais, meses finais), listas com um mês "YYYY-MM" por área.
+    """
+    ordem = ordem_areas(areas['destinacao']).tolist()
+    return ([areas['mesInicio'][i] or inicio for i in ordem],
+            [areas['mesFim'][i] or fim for i in ordem])
+
+
+def obra_do_formulario(form):
+    """
+    Monta uma obra (ver documentação do módulo) a partir dos campos do formulário HTML.
+
+    O período da obra vem de "mesInicio"/"mesFim". Com um "mesInicio[]"/"mesFim[]" por área, cada
+    área mantém o seu período (para o cronograma por área, campo "cronograma"); com outra
+    quantidade, eles apenas ampliam o período da obra (menor início e maior término).
+
+    Args:
+        form: `request.form` (MultiDict) com os campos em listas ("identificacao[]", "CUB[]" etc.).
+
+    Returns:
+        dict: Dados da obra.
+    """
+    campos = ['identificacao', 'categoria', 'material', 'tipoArea', 'areaTotal', 'CUB', 'uf',
+              'concretoUsinado', 'destinacao', 'valorNotasFiscais', 'areaAferida']
+    colunas = [form.getlist(f'{campo}[]') for campo in campos]
+    obra = {
+        # Colunas de tamanhos diferentes não descartam áreas: os campos faltantes são reportados na validação
+        'areas': [dict(zip(campos, valores)) for valores in zip_longest(*colunas)],
+        'fatorAjuste': form.get('fatorAjuste', FATOR_AJUSTE_PADRAO),
+        'mesesExecucao': form.get('mesesExecucao', MESES_EXECUCAO_PADRAO),
+    }
+    if form.get('cronograma'):
+        obra['cronograma'] = form.get('cronograma')
+    mes_inicios = form.getlist('mesInicio[]')
+    mes_fins = form.getlist('mesFim[]')
+    if len(mes_inicios) == len(mes_fins) == len(obra['areas']):
+        for area, mes_inicio, mes_fim in zip(obra['areas'], mes_inicios, mes_fins):
+            # Campos vazios: a área usa o período da obra
+            if mes_inicio:
+                area['mesInicio'] = mes_inicio
+            if mes_fim:
+                area['mesFim'] = mes_fim
+        mes_inicios = mes_fins = []
+    mes_inicios = [mes for mes in [form.get('mesInicio')] + mes_inicios if mes]
+    mes_fins = [mes for mes in [form.get('mesFim')] + mes_fins if mes]
+    if mes_inicios:
+        obra['mesInicio'] = min(mes_inicios)
+    if mes_fins:
+        obra['mesFim'] = max(mes_fins)
+    return obra
+
+
+def etapa_areas(dados):
+    """
+    Etapa de áreas: calcula a tabela de áreas (colunas numéricas) e o RMT total.
+
+    Returns:
+        tuple: (tabela_areas, rmt_total).
+    """
+    tabela_areas = calcular_areas(dados)
+    rmt_total = float(tabela_areas['RMT'].sum()) if tabela_areas else 0.0
+    return tabela_areas, rmt_total
+
+
+def etapa_afericao(rmt_total, fator_de_ajuste, meses_execucao):
+    """
+    Etapa de aferição indireta: RMT ajustado (a remuneração usada na tabela financeira é a exibida,
+    em centavos) e remuneração mensal mínima.
+
+    Returns:
+        tuple: (rmt_ajustado, remuneracao_mensal).
+    """
+    rmt_ajustado = round(rmt_total * fator_de_ajuste, 2)
+    remuneracao_mensal = rmt_total * fator_de_ajuste / meses_execucao if meses_execucao > 0 else 0
+    return rmt_ajustado, remuneracao_mensal
+
+
+def etapa_financeira(inicio, fim, rmt_ajustado, selic_rates):
+    """
+    Etapa financeira: valores mensais e totais da tabela financeira.
+
+    Returns:
+        tuple: (financeiro, totais), onde `financeiro` é o resultado de
+               `utils.financeiro.calcular_financeiro` e `totais` resume o período com as somas dos
+               valores mensais arredondados ao centavo (a linha "Total" da tabela exibida), as
+               mesmas de `utils.financeiro.totais_financeiros`.
+    """
+    financeiro = calcular_financeiro(inicio, fim, rmt_ajustado, selic_rates)
+    totais = {
+        'inicio': inicio,
+        'fim': fim,
+        'meses': len(financeiro['meses']),
+        **somar_mensais(financeiro)
+    }
+    return financeiro, totais
+
+
+def etapa_totais_financeiros(inicio, fim, rmt_ajustado, selic_rates):
+    """
+    Etapa financeira apenas com os totais, sem montar a tabela mensal (ver
+    `utils.financeiro.totais_financeiros`).
+
+    Returns:
+        dict: Totais do período, no mesmo formato dos totais de `etapa_financeira`.
+    """
+    totais = totais_financeiros(inicio, fim, rmt_ajustado, selic_rates)
+    return {'inicio': inicio, 'fim': fim, **totais}
+
+
+def rmt_cronograma(tabela_areas, periodos, inicio, fim):
+    """
+    RMT das áreas em execução em cada mês do período, antes do fator de ajuste
+    (`utils.financeiro.remuneracoes_cronograma`).
+
+    Args:
+        tabela_areas (dict): Colunas da tabela de áreas (ver `etapa_areas`).
+        periodos (tuple): Meses iniciais e finais das áreas (ver `periodos_areas`).
+
+    Returns:
+        ndarray: RMT de cada mês de `inicio` a `fim`.
+    """
+    inicios, fins = periodos
+    rmt = tabela_areas['RMT'] if tabela_areas else []
+    return remuneracoes_cronograma(inicio, fim, inicios, fins, rmt)
+
+
+def etapa_remuneracoes(areas, periodos, fator_de_ajuste, inicio, fim):
+    """
+    Etapa do cronograma por área: remuneração de cada mês do período, com o RMT das áreas em
+    execução no mês (`rmt_cronograma`) ajustado pelo fator e arredondado em centavos, como o RMT
+    ajustado do cronograma único.
+
+    Returns:
+        list: Remuneração de cada mês de `inicio` a `fim`.
+    """
+    mensais = rmt_cronograma(areas[0], periodos, inicio, fim)
+    return [round(valor * fator_de_ajuste, 2) for valor in mensais.tolist()]
+
+
+def _totais_cronograma(inicio, fim, remuneracoes, selic_rates):
+    # Com a remuneração variando mês a mês, os totais somam os valores mensais
+    return etapa_financeira(inicio, fim, remuneracoes, selic_rates)[1]
+
+
+def etapa_inss(rmt_total, reducao, honorarios_percentual):
+    """
+    Etapa de INSS detalhado: INSS devido, a pagar, economia, honorários e economia real.
+
+    Returns:
+        dict: Valores do INSS detalhado.
+    """
+    inss_devido, inss_a_pagar, economia_gerada = calcular_inss_economizado(rmt_total, reducao)
+    honorarios = economia_gerada * (honorarios_percentual / 100.0)
+    return {
+        'reducao_percentual': reducao,
+        'inss_devido': inss_devido,
+        'inss_a_pagar': inss_a_pagar,
+        'economia_gerada': economia_gerada,
+        'honorarios_percentual': honorarios_percentual,
+        'honorarios': honorarios,
+        'economia_real': economia_gerada - honorarios
+    }
+
+
+def _chave_financeira(inicio, fim, rmt_ajustado, selic_rates):
+    # Apenas as taxas do período entram na chave (inclui o mês anterior ao início)
+    anterior = indice_para_mes(mes_para_indice(inicio) - 1)
+    taxas_periodo = sorted((mes, taxa) for mes, taxa in selic_rates.items() if anterior <= mes <= fim)
+    return inicio, fim, rmt_ajustado, taxas_periodo
+
+
+# Grafo das etapas de uma obra. As etapas "rmt_total" e "rmt_ajustado" apenas extraem o valor usado
+# adiante: se a etapa anterior for recalculada e o valor não mudar, as seguintes não são recalculadas.
+_ETAPAS_COMUNS = [
+    Etapa('areas', etapa_areas, ('dados',),
+          chave=lambda dados: (regras_vigentes().vigencia, dados_percentuais.versao, dados)),
+    Etapa('rmt_total', lambda areas: areas[1], ('areas',)),
+    Etapa('afericao', etapa_afericao, ('rmt_total', 'fator_de_ajuste', 'meses_execucao')),
+    Etapa('rmt_ajustado', lambda afericao: afericao[0], ('afericao',)),
+    Etapa('selic', lambda inicio, fim: get_selic_store().obter(*intervalo_selic([(inicio, fim)])), ('inicio', 'fim')),
+    Etapa('reducao', percentual_reducao, ('categorias',)),
+    Etapa('inss', etapa_inss, ('rmt_total', 'reducao', 'honorarios_percentual')),
+]
+GRAFO_OBRA = Grafo(_ETAPAS_COMUNS + [
+    Etapa('financeira', etapa_financeira, ('inicio', 'fim', 'rmt_ajustado', 'selic'), chave=_chave_financeira),
+])
+# Sem os valores mensais (`calcular_obra(..., detalhado=False)`): apenas os totais financeiros
+GRAFO_TOTAIS = Grafo(_ETAPAS_COMUNS + [
+    Etapa('totais_financeiros', etapa_totais_financeiros, ('inicio', 'fim', 'rmt_ajustado', 'selic'),
+          chave=_chave_financeira),
+])
+# Cronograma por área ("cronograma": "areas"): a remuneração de cada mês vem dos períodos das áreas
+_ETAPA_REMUNERACOES = Etapa('remuneracoes', etapa_remuneracoes,
+                            ('areas', 'periodos', 'fator_de_ajuste', 'inicio', 'fim'))
+GRAFO_CRONOGRAMA = Grafo(_ETAPAS_COMUNS + [
+    _ETAPA_REMUNERACOES,
+    Etapa('financeira', etapa_financeira, ('inicio', 'fim', 'remuneracoes', 'selic'), chave=_chave_financeira),
+])
+GRAFO_CRONOGRAMA_TOTAIS = Grafo(_ETAPAS_COMUNS + [
+    _ETAPA_REMUNERACOES,
+    Etapa('totais_financeiros', _totais_cronograma, ('inicio', 'fim', 'remuneracoes', 'selic'),
+          chave=_chave_financeira),
+])
+
+
+def calcular_obra(obra, selic_rates=None, detalhado=False, cache=None, sessao=None):
+    """
+    Executa o pipeline completo de uma obra e retorna os resultados numéricos.
+
+    As etapas formam um grafo com entradas explícitas (`GRAFO_OBRA`): áreas → RMT total → aferição →
+    financeira, e RMT total → INSS detalhado. As etapas de áreas e financeira podem ser reaproveitadas
+    de um cache de resultados: a etapa de áreas depende apenas das áreas, e a financeira apenas do
+    período, do RMT ajustado e das taxas SELIC. Com uma sessão (`utils.grafo.Sessao`), os resultados
+    da execução anterior ficam memorizados e só as etapas com entradas alteradas são recalculadas:
+    alterar o fator de ajuste recalcula a aferição e a tabela financeira; alterar os honorários,
+    somente o INSS detalhado.
+
+    Args:
+        obra (dict): Dados da obra (ver documentação do módulo).
+        selic_rates (dict, opcional): Taxas SELIC já obtidas, com chave "YYYY-MM". Quando omitidas,
+                                      são buscadas no armazenamento SELIC para o período da obra.
+        detalhado (bool): Quando verdadeiro, inclui também as colunas da tabela de áreas
+                          ("tabela_areas") e os valores mensais da tabela financeira
+                          ("tabela_financeira"), como arrays NumPy. Sem ele, apenas os totais
+                          financeiros são calculados (`GRAFO_TOTAIS`), os mesmos da tabela.
+        cache (CacheResultados, opcional): Cache para os resultados das etapas (ver `utils.cache`).
+        sessao (Sessao, opcional): Sessão de cálculo com os resultados da execução anterior
+                                   (ver `utils.grafo`). As etapas recalculadas ficam em
+                                   `sessao.recalculadas`.
+
+    Returns:
+        dict: Resultados numéricos da obra (RMT, aferição, totais financeiros e INSS detalhado).
+    """
+    validada = validar_obra(obra)
+    inicio, fim = periodo_obra(obra)
+    areas = completar_cub(validada.areas, mes_referencia_cub(obra, fim))
+    entradas = {
+        'dados': montar_dados_areas(areas),
+        'categorias': list(areas['categoria']),
+        'fator_de_ajuste': validada.fator_ajuste / 100.0,
+        'meses_execucao': validada.meses_execucao,
+        'honorarios_percentual': validada.honorarios,
+        'inicio': inicio,
+        'fim': fim,
+    }
+    if selic_rates is not None:
+        entradas['selic'] = selic_rates
+
+    cronograma_areas = validada.cronograma == CRONOGRAMA_AREAS
+    if cronograma_areas:
+        entradas['periodos'] = periodos_areas(areas, inicio, fim)
+        grafo = GRAFO_CRONOGRAMA if detalhado else GRAFO_CRONOGRAMA_TOTAIS
+    else:
+        grafo = GRAFO_OBRA if detalhado else GRAFO_TOTAIS
+    if sessao is None:
+        valores = grafo.executar(entradas, cache=cache)
+    else:
+        with sessao.lock:
+            valores = grafo.executar(entradas, sessao=sessao, cache=cache)
+
+    tabela_areas, rmt_total = valores['areas']
+    rmt_ajustado, remuneracao_mensal = valores['afericao']
+    financeiro, totais = valores['financeira'] if detalhado else (None, valores['totais_financeiros'])
+    resultado = {
+        'identificacao': validada.identificacao,
+        'rmt_total': rmt_total,
+        'fator_ajuste': entradas['fator_de_ajuste'],
+        'rmt_ajustado': rmt_ajustado,
+        'meses_execucao': entradas['meses_execucao'],
+        'remuneracao_mensal': remuneracao_mensal,
+        'financeiro': totais,
+        'inss': valores['inss']
+    }
+    if cronograma_areas:
+        resultado['remuneracoes'] = valores['remuneracoes']
+    if detalhado:
+        resultado['tabela_areas'] = tabela_areas
+        resultado['tabela_financeira'] = financeiro
+    return resultado
+
+
+def pagina_financeira_obra(obra, cursor=None, limite=LIMITE_PAGINA, cache=None):
+    """
+    Calcula uma obra e uma página de meses da sua tabela financeira (ver
+    `utils.financeiro.pagina_financeira`). A obra é calculada apenas com os totais financeiros, e
+    somente os meses da página são montados. As taxas SELIC do período são obtidas uma
+    única vez, para a obra e para a página.
+
+    Args:
+        obra (dict): Dados da obra (ver documentação do módulo).
+        cursor (str, opcional): Primeiro mês ("YYYY-MM") da página; por padrão, o início do período.
+        limite (int): Quantidade máxima de meses da página.
+        cache (CacheResultados, opcional): Cache para os resultados das etapas.
+
+    Returns:
+        dict: Identificação, RMT ajustado, totais do período ("financeiro") e a página de meses.
+
+    Raises:
+        ErroValidacao: Se a obra tiver campos inválidos ou o cursor não for um mês "YYYY-MM".
+        ValueError: Se o cursor estiver fora do período ou o limite fora do intervalo permitido.
+    """
+    validar_obra(obra)
+    if cursor is not None:
+        validar_mes('cursor', cursor)
+    selic_rates = get_selic_store().obter(*intervalo_selic([periodo_obra(obra)]))
+    resultado = calcular_obra(obra, selic_rates, cache=cache)
+    totais = resultado['financeiro']
+    # No cronograma por área, a remuneração varia mês a mês
+    remuneracao = resultado.get('remuneracoes', resultado['rmt_ajustado'])
+    pagina = pagina_financeira(totais['inicio'], totais['fim'], remuneracao, selic_rates,
+                               cursor=cursor, limite=limite)
+    return {
+        'identificacao': resultado['identificacao'],
+        'rmt_ajustado': resultado['rmt_ajustado'],
+        'financeiro': totais,
+        **pagina,
+    }
+
+def chave_resultado(obra):
+    """
+    Chave do resultado de uma obra: o hash de tudo de que o resultado depende (a obra, as regras
+    vigentes, os percentuais por UF, o CUB do histórico das áreas que não o informam e as taxas
+    SELIC do período). Identifica a página de resultado em cache e serve de ETag.
+
+    Args:
+        obra (dict): Dados da obra (ver documentação do módulo).
+
+    Returns:
+        tuple: (chave, taxas SELIC do período), para reaproveitar as taxas em `calcular_obra`.
+
+    Raises:
+        ErroValidacao: Se a obra tiver campos inválidos.
+    """
+    validada = validar_obra(obra)
+    inicio, fim = periodo_obra(obra)
+    cub = completar_cub(validada.areas, mes_referencia_cub(obra, fim))['CUB']
+    selic_rates = get_selic_store().obter(*intervalo_selic([(inicio, fim)]))
+    chave = chave_canonica('resultado', regras_vigentes().vigencia, dados_percentuais.versao, obra,
+                           cub.tolist(), sorted(selic_rates.items()))
+    return chave, selic_rates
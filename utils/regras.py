@@ -0,0 +1,195 @@
+"""
+Tabelas de regras compiladas (percentuais e faixas da IN RFB nº 971/2009).
+
+As regras ficam em arquivos JSON no diretório `data/regras` (ou no indicado por `INSS_REGRAS_DIR`),
+um por versão, identificados pela data de início de vigência. Cada arquivo pode trazer apenas as
+tabelas que mudaram: as demais são herdadas da versão anterior. Assim, uma atualização da
+legislação exige apenas um novo arquivo, sem alteração de código.
+
+Os arquivos são lidos e compilados uma única vez, na importação do módulo:
+    - Destinações, materiais e categorias são internados em códigos inteiros.
+    - As faixas de área (equivalência e fator social) viram listas ordenadas de limites,
+      consultadas por busca binária (`bisect`).
+    - As tabelas de percentuais viram listas indexadas pelos códigos.
+"""
+
+import glob
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+DIRETORIO_REGRAS = os.environ.get(
+    'INSS_REGRAS_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'regras')
+)
+
+
+def _compilar_faixas(faixas):
+    """
+    Converte [[limite, valor], ..., [null, valor]] em (limites, valores) para busca binária.
+    O último limite nulo representa "acima de todos os limites".
+    """
+    limites = [limite for limite, _ in faixas if limite is not None]
+    valores = [valor for _, valor in faixas]
+    return limites, valores
+
+
+class Regras:
+    """
+    Versão compilada das regras vigentes a partir de uma data.
+
+    Args:
+        vigencia (str): Data de início de vigência, no formato "YYYY-MM-DD".
+        tabelas (dict): Tabelas da versão, no formato dos arquivos de `data/regras`.
+    """
+
+    __slots__ = ('vigencia', 'fonte', 'destinacoes', 'materiais', 'categorias',
+                 '_equivalencia', '_mao_de_obra', '_categoria', '_categoria_padrao',
+                 '_categoria_remuneracao', '_categoria_remuneracao_padrao',
+                 '_fator_social', '_rmt_faixas', '_rmt_percentuais')
+
+    def __init__(self, vigencia, tabelas):
+        self.vigencia = vigencia
+        self.fonte = tabelas.get('fonte', '')
+
+        # Códigos inteiros para destinação, material e categoria
+        self.destinacoes = {nome: codigo for codigo, nome in enumerate(
+            dict.fromkeys(list(tabelas['equivalencia']) + list(tabelas['mao_de_obra'])))}
+        self.materiais = {nome: codigo for codigo, nome in enumerate(
+            dict.fromkeys(material for linha in tabelas['mao_de_obra'].values() for material in linha))}
+        self.categorias = {nome: codigo for codigo, nome in enumerate(
+            dict.fromkeys(list(tabelas['categoria']['percentuais'])
+                          + list(tabelas['categoria_remuneracao']['percentuais'])))}
+
+        self._equivalencia = [None] * len(self.destinacoes)
+        for nome, faixas in tabelas['equivalencia'].items():
+            self._equivalencia[self.destinacoes[nome]] = _compilar_faixas(faixas)
+
+        self._mao_de_obra = [[0] * len(self.materiais) for _ in self.destinacoes]
+        for destinacao, linha in tabelas['mao_de_obra'].items():
+            for material, percentual in linha.items():
+                self._mao_de_obra[self.destinacoes[destinacao]][self.materiais[material]] = percentual
+
+        self._categoria_padrao = tabelas['categoria']['padrao']
+        self._categoria = [self._categoria_padrao] * len(self.categorias)
+        for nome, percentual in tabelas['categoria']['percentuais'].items():
+            self._categoria[self.categorias[nome]] = percentual
+
+        self._categoria_remuneracao_padrao = tabelas['categoria_remuneracao']['padrao']
+        self._categoria_remuneracao = [self._categoria_remuneracao_padrao] * len(self.categorias)
+        for nome, percentual in tabelas['categoria_remuneracao']['percentuais'].items():
+            self._categoria_remuneracao[self.categorias[nome]] = percentual
+
+        self._fator_social = _compilar_faixas(tabelas['fator_social'])
+        self._rmt_faixas = list(tabelas['rmt']['faixas'])
+        self._rmt_percentuais = {material: list(percentuais)
+                                 for material, percentuais in tabelas['rmt']['percentuais'].items()}
+
+    def percentual_equivalencia(self, area_total, destinacao):
+        codigo = self.destinacoes.get(destinacao)
+        if codigo is None or self._equivalencia[codigo] is None:
+            return 0
+        limites, valores = self._equivalencia[codigo]
+        return valores[bisect_left(limites, area_total)]
+
+    def percentual_mao_de_obra(self, destinacao, material):
+        codigo_destinacao = self.destinacoes.get(destinacao)
+        codigo_material = self.materiais.get(material)
+        if codigo_destinacao is None or codigo_material is None:
+            return 0
+        return self._mao_de_obra[codigo_destinacao][codigo_material]
+
+    def percentual_categoria(self, categoria):
+        codigo = self.categorias.get(categoria)
+        return self._categoria_padrao if codigo is None else self._categoria[codigo]
+
+    def percentual_categoria_remuneracao(self, categoria):
+        codigo = self.categorias.get(categoria)
+        return self._categoria_remuneracao_padrao if codigo is None else self._categoria_remuneracao[codigo]
+
+    def fator_social(self, area_total):
+        limites, valores = self._fator_social
+        return valores[bisect_left(limites, area_total)]
+
+    def faixas_equivalencia(self, destinacao):
+        """
+        Retorna (limites das faixas de área, percentual de cada faixa) da equivalência da destinação.
+        Destinações sem tabela têm uma única faixa com percentual 0.
+        """
+        codigo = self.destinacoes.get(destinacao)
+        if codigo is None or self._equivalencia[codigo] is None:
+            return [], [0]
+        return self._equivalencia[codigo]
+
+    def faixas_fator_social(self):
+        """
+        Retorna (limites das faixas de área, fator social de cada faixa).
+        """
+        return self._fator_social
+
+    def faixas_rmt(self, material):
+        """
+        Retorna (limites das faixas de área, percentual de cada faixa) para o material.
+        Alvenaria tem percentuais próprios; madeira e mista usam os da chave "outros".
+        """
+        chave = 'alvenaria' if material.lower() == 'alvenaria' else 'outros'
+        return self._rmt_faixas, self._rmt_percentuais[chave]
+
+
+def carregar_regras(diretorio=DIRETORIO_REGRAS):
+    """
+    Lê e compila todas as versões de regras do diretório, em ordem de vigência.
+    Cada versão herda as tabelas não informadas da versão anterior.
+
+    Returns:
+        list: Lista de `Regras`, ordenada pela data de vigência.
+    """
+    arquivos = []
+    for caminho in glob.glob(os.path.join(diretorio, '*.json')):
+        with open(caminho, encoding='utf-8') as arquivo:
+            arquivos.append(json.load(arquivo))
+    arquivos.sort(key=lambda tabelas: tabelas['vigencia'])
+
+    versoes = []
+    acumulado = {}
+    for tabelas in arquivos:
+        acumulado = {**acumulado, **tabelas}
+        versoes.append(Regras(tabelas['vigencia'], acumulado))
+    return versoes
+
+
+VERSOES = carregar_regras()
+_VIGENCIAS = [regras.vigencia for regras in VERSOES]
+
+# Versão vigente hoje, reaproveitada até a meia-noite (timestamp) para evitar a busca a cada chamada
+_hoje = [0.0, None]
+
+
+def regras_vigentes(data=None):
+    """
+    Retorna as regras vigentes na data informada (por padrão, hoje).
+
+    Args:
+        data (str | date, opcional): Data de referência ("YYYY-MM-DD" ou `date`).
+
+    Returns:
+        Regras: Versão das regras em vigor na data.
+
+    Raises:
+        LookupError: Se não houver regras vigentes na data.
+    """
+    if data is None:
+        if time.time() < _hoje[0]:
+            return _hoje[1]
+        hoje = date.today()
+        regras = regras_vigentes(hoje)
+        _hoje[:] = [datetime.combine(hoje + timedelta(days=1), datetime.min.time()).timestamp(), regras]
+        return regras
+    if isinstance(data, date):
+        data = data.isoformat()
+    posicao = bisect_right(_VIGENCIAS, data)
+    if posicao == 0:
+        raise LookupError(f"Não há regras vigentes em {data}")
+    return VERSOES[posicao - 1]
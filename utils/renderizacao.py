@@ -0,0 +1,111 @@
+"""
+Renderização leve das tabelas de resultado em HTML.
+
+`tabela_html` produz exatamente o mesmo HTML de `DataFrame.to_html(index=False)` para as tabelas
+exibidas em `resultado.html` (colunas de texto e colunas numéricas), sem passar pelo formatador do
+pandas: as células de cada coluna são formatadas de uma vez e o documento é montado com uma única
+junção de textos. A igualdade com o `to_html` é conferida por `tests/test_renderizacao.py`.
+
+Os números de colunas float seguem a formatação do pandas: seis casas decimais com os zeros finais
+aparados igualmente em toda a coluna, ou notação científica quando há valores muito pequenos, ou
+valores grandes que deixariam a coluna larga demais.
+"""
+
+import re
+
+import numpy as np
+
+CASAS_DECIMAIS = 6  # display.precision do pandas
+_ESCAPES_HTML = {'&': '&amp;', '<': '&lt;', '>': '&gt;'}
+_ESCAPES_CABECALHO = str.maketrans(_ESCAPES_HTML)
+_ESCAPES = str.maketrans({**_ESCAPES_HTML, '\t': r'\t', '\n': r'\n', '\r': r'\r'})
+_NUMERO_COM_DECIMAIS = re.compile(r'^\s*[+-]?[0-9]+\.[0-9]*$')
+
+
+def _celula(valor, escapes=_ESCAPES):
+    """
+    Texto de uma célula: caracteres especiais escapados, sem espaços nas pontas e com espaços
+    duplos preservados. Nos cabeçalhos, só os caracteres de HTML são escapados.
+    """
+    return str(valor).translate(escapes).strip().replace('  ', '&nbsp;&nbsp;')
+
+
+def _aparar_zeros(textos):
+    # Remove zeros finais igualmente de todos os números com decimais, deixando ao menos uma casa
+    numeros = [i for i, texto in enumerate(textos) if _NUMERO_COM_DECIMAIS.match(texto)]
+    if not numeros:
+        return textos
+    casas = min(len(textos[i]) - len(textos[i].rstrip('0')) for i in numeros)
+    casas = min(casas, min(len(textos[i]) - textos[i].index('.') - 2 for i in numeros))
+    if casas <= 0:
+        return textos
+    textos = list(textos)
+    for i in numeros:
+        textos[i] = textos[i][:-casas]
+    return textos
+
+
+def _formatar_floats(valores):
+    """
+    Formata uma coluna float como o pandas (`FloatArrayFormatter` com a precisão padrão).
+    """
+    nulos = np.isnan(valores)
+    lista = valores.tolist()
+    textos = _aparar_zeros(['NaN' if nulo else f"{valor:.{CASAS_DECIMAIS}f}"
+                            for valor, nulo in zip(lista, nulos.tolist())])
+    absolutos = np.abs(valores)
+    grandes = bool((absolutos > 1e6).any())
+    pequenos = bool(((absolutos < 10 ** -CASAS_DECIMAIS) & (absolutos > 0)).any())
+    longos = bool(textos) and max(len(texto) for texto in textos) > CASAS_DECIMAIS + 6
+    if pequenos or (longos and grandes):
+        textos = ['NaN' if nulo else f"{valor:.{CASAS_DECIMAIS}e}" for valor, nulo in zip(lista, nulos.tolist())]
+    return textos
+
+
+def _formatar_coluna(valores, tipo):
+    """
+    Formata os valores de uma coluna como textos de célula, conforme o tipo ("kind" do dtype).
+    """
+    if tipo == 'f':
+        return [_celula(texto) for texto in _formatar_floats(np.asarray(valores, dtype=float))]
+    if tipo in 'iub':
+        return [str(valor) for valor in valores]
+    return [_celula('NaN' if isinstance(valor, float) and valor != valor else valor) for valor in valores]
+
+
+def _colunas(tabela):
+    # Colunas (nome, valores, tipo). Extrair as colunas de um DataFrame uma a uma custa mais que
+    # formatá-las: os valores saem de uma única matriz de objetos.
+    if hasattr(tabela, 'columns'):
+        tipos = [getattr(dtype, 'kind', 'O') for dtype in tabela.dtypes]
+        return zip(tabela.columns, tabela.to_numpy(dtype=object).T.tolist(), tipos)
+    arrays = [np.asarray(valores) for valores in tabela.values()]
+    return zip(tabela, [array.tolist() for array in arrays], [array.dtype.kind for array in arrays])
+
+
+def tabela_html(tabela, classes=None):
+    """
+    Renderiza uma tabela em HTML, no formato de `DataFrame.to_html(classes=..., index=False)`.
+
+    Args:
+        tabela (DataFrame | dict): Tabela, ou dicionário de colunas (nome → valores).
+        classes (str, opcional): Classes CSS adicionais da tabela.
+
+    Returns:
+        str: HTML da tabela.
+    """
+    nomes, colunas = [], []
+    for nome, valores, tipo in _colunas(tabela):
+        nomes.append(nome)
+        colunas.append(_formatar_coluna(valores, tipo))
+    classe = f"dataframe {classes}" if classes else "dataframe"
+
+    partes = [f'<table border="1" class="{classe}">\n  <thead>\n    <tr style="text-align: right;">\n']
+    partes.extend(f'      <th>{_celula(nome, _ESCAPES_CABECALHO)}</th>\n' for nome in nomes)
+    partes.append('    </tr>\n  </thead>\n  <tbody>\n')
+    for linha in zip(*colunas):
+        partes.append('    <tr>\n')
+        partes.extend(f'      <td>{celula}</td>\n' for celula in linha)
+        partes.append('    </tr>\n')
+    partes.append('  </tbody>\n</table>')
+    return ''.join(partes)
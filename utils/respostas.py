@@ -0,0 +1,80 @@
+"""
+Compressão das respostas HTTP.
+
+As respostas de texto (HTML, JSON, CSS, JavaScript, CSV) acima de `INSS_COMPRESSAO_MINIMO` bytes são
+comprimidas conforme o cabeçalho Accept-Encoding do cliente: brotli, quando o pacote `brotli` estiver
+instalado, ou gzip (biblioteca padrão). Respostas em fluxo (exportação, lote NDJSON) e respostas já
+codificadas não são alteradas. Com INSS_COMPRESSAO=0 a compressão fica desligada (ex.: quando um
+proxy reverso já comprime).
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # dependência opcional
+    brotli = None
+
+COMPRESSAO = os.environ.get('INSS_COMPRESSAO', '1') == '1'
+COMPRESSAO_MINIMO = int(os.environ.get('INSS_COMPRESSAO_MINIMO', 1024))
+NIVEL_GZIP = int(os.environ.get('INSS_COMPRESSAO_NIVEL', 6))
+QUALIDADE_BROTLI = int(os.environ.get('INSS_COMPRESSAO_BROTLI', 5))
+
+TIPOS_COMPRIMIVEIS = frozenset({
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/x-ndjson',
+})
+CODIFICACOES = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def comprimir_dados(dados, codificacao):
+    """
+    Comprime um corpo de resposta.
+
+    Args:
+        dados (bytes): Corpo da resposta.
+        codificacao (str): "br" ou "gzip".
+
+    Returns:
+        bytes: Corpo comprimido.
+    """
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=QUALIDADE_BROTLI)
+    # mtime=0: a mesma página gera sempre os mesmos bytes
+    return gzip.compress(dados, compresslevel=NIVEL_GZIP, mtime=0)
+
+
+def comprimir(resposta, aceitas):
+    """
+    Comprime a resposta, se o tipo e o tamanho permitirem e o cliente aceitar alguma codificação.
+
+    A resposta passa a variar com o Accept-Encoding, e um ETag forte vira fraco (o corpo
+    comprimido não é byte a byte o mesmo representado pelo ETag).
+
+    Args:
+        resposta (Response): Resposta do Flask.
+        aceitas (Accept): Codificações aceitas pelo cliente (`request.accept_encodings`).
+
+    Returns:
+        Response: A mesma resposta, comprimida ou não.
+    """
+    if (not COMPRESSAO or resposta.direct_passthrough or resposta.is_streamed
+            or resposta.status_code < 200 or resposta.status_code in (204, 206, 304)
+            or 'Content-Encoding' in resposta.headers
+            or resposta.mimetype not in TIPOS_COMPRIMIVEIS):
+        return resposta
+    dados = resposta.get_data()
+    if len(dados) < COMPRESSAO_MINIMO:
+        return resposta
+
+    resposta.vary.add('Accept-Encoding')
+    codificacao = aceitas.best_match(CODIFICACOES)
+    if codificacao is None:
+        return resposta
+    resposta.set_data(comprimir_dados(dados, codificacao))
+    resposta.headers['Content-Encoding'] = codificacao
+    etag, fraco = resposta.get_etag()
+    if etag is not None and not fraco:
+        resposta.set_etag(etag, weak=True)
+    return resposta
@@ -0,0 +1,320 @@
+"""
+Armazenamento local das taxas SELIC (série SGS 4189 do Banco Central).
+
+As taxas mensais ficam gravadas em um banco SQLite, indexadas pelo mês ("YYYY-MM"), e espelhadas em
+memória no processo. A cada consulta apenas os meses ausentes (ou cuja validade expirou) são buscados
+na API do Banco Central, em uma única requisição com timeout e sessão HTTP reaproveitada.
+
+Meses já publicados e anteriores ao mês corrente são considerados definitivos e nunca são buscados
+novamente. Meses ainda não publicados (ou o mês corrente) são reconsultados após o TTL.
+
+Quando a API está lenta ou indisponível, a consulta segue no modo "stale-but-serve": devolve o que
+houver no armazenamento local, mesmo que vencido, em vez de falhar o cálculo. Após uma falha, novas
+buscas ficam suspensas por `SELIC_BACKOFF` segundos: nesse intervalo as consultas servem os dados
+locais imediatamente, sem aguardar outro timeout.
+"""
+
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from utils.metricas import incrementar, observar
+
+SGS_URL = os.environ.get('SELIC_SGS_URL', "https://api.bcb.gov.br/dados/serie/bcdata.sgs.4189/dados")
+
+CAMINHO_PADRAO = os.environ.get(
+    'SELIC_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'selic.sqlite3')
+)
+TTL_PADRAO = float(os.environ.get('SELIC_TTL', 6 * 60 * 60))  # 6 horas
+TIMEOUT_PADRAO = float(os.environ.get('SELIC_TIMEOUT', 5))     # segundos
+OFFLINE_PADRAO = os.environ.get('SELIC_OFFLINE', '0') == '1'
+BACKOFF_PADRAO = float(os.environ.get('SELIC_BACKOFF', 60))    # segundos sem buscar após uma falha
+
+logger = logging.getLogger('inss.selic')
+
+
+def mes_para_indice(mes):
+    """
+    Converte um mês no formato "YYYY-MM" em um índice inteiro sequencial (ano * 12 + mês - 1).
+    """
+    ano, numero = mes.split('-')
+    return int(ano) * 12 + int(numero) - 1
+
+
+def indice_para_mes(indice):
+    """
+    Converte um índice sequencial de mês de volta para o formato "YYYY-MM".
+    """
+    ano, numero = divmod(indice, 12)
+    return f"{ano:04d}-{numero + 1:02d}"
+
+
+def iterar_meses(inicio, fim):
+    """
+    Gera os meses ("YYYY-MM") de `inicio` a `fim`, inclusive, um a um, sem montar a lista do período.
+    """
+    for indice in range(mes_para_indice(inicio), mes_para_indice(fim) + 1):
+        yield indice_para_mes(indice)
+
+
+class SelicStore:
+    """
+    Armazenamento local das taxas SELIC com refresh por TTL.
+
+    Args:
+        caminho (str): Caminho do arquivo SQLite. Use ":memory:" para um armazenamento volátil.
+        ttl (float): Validade, em segundos, de meses ainda não definitivos.
+        timeout (float): Timeout, em segundos, da requisição ao Banco Central.
+        http: Objeto compatível com `requests.Session` (método `get`). Por padrão, uma sessão
+              `requests.Session` é criada na primeira busca.
+        offline (bool): Quando verdadeiro, nunca consulta a API e serve apenas os dados locais.
+        backoff (float): Tempo, em segundos, sem novas buscas após uma falha da API.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO, ttl=TTL_PADRAO, timeout=TIMEOUT_PADRAO, http=None,
+                 offline=OFFLINE_PADRAO, backoff=BACKOFF_PADRAO):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.timeout = timeout
+        self.offline = offline
+        self.backoff = backoff
+        self._falha_em = None     # timestamp da última busca que falhou
+        self._http = http
+        self._taxas = {}          # mês -> taxa (None quando o mês ainda não foi publicado)
+        self._consultado_em = {}  # mês -> timestamp da última consulta
+        self._conexao = None
+        self._carregado = False
+        self._lock = threading.Lock()
+        self._lock_busca = threading.Lock()
+
+    def _conectar(self):
+        if self._conexao is None:
+            if self.caminho != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS selic ("
+                " mes TEXT PRIMARY KEY,"
+                " valor REAL,"
+                " consultado_em REAL NOT NULL)"
+            )
+            self._conexao.commit()
+        return self._conexao
+
+    def _carregar(self):
+        """
+        Carrega para a memória, uma única vez, todas as taxas gravadas no SQLite.
+        """
+        if self._carregado:
+            return
+        with self._lock:
+            if self._carregado:
+                return
+            for mes, valor, consultado_em in self._conectar().execute(
+                    "SELECT mes, valor, consultado_em FROM selic"):
+                self._taxas[mes] = valor
+                self._consultado_em[mes] = consultado_em
+            self._carregado = True
+
+    def _expirado(self, mes, agora, mes_corrente):
+        consultado_em = self._consultado_em.get(mes)
+        if consultado_em is None:
+            return True
+        if self._taxas.get(mes) is not None and mes < mes_corrente:
+            return False  # Mês fechado e publicado: valor definitivo
+        return agora - consultado_em > self.ttl
+
+    def _faltantes(self, meses):
+        agora = time.time()
+        mes_corrente = datetime.fromtimestamp(agora).strftime("%Y-%m")
+        return [mes for mes in meses if self._expirado(mes, agora, mes_corrente)]
+
+    def meses_faltantes(self, inicio, fim):
+        """
+        Retorna os meses do período ("YYYY-MM") ausentes do armazenamento ou com validade expirada.
+        """
+        self._carregar()
+        return self._faltantes([indice_para_mes(i)
+                                for i in range(mes_para_indice(inicio), mes_para_indice(fim) + 1)])
+
+    def _sessao(self):
+        if self._http is None:
+            import requests
+            self._http = requests.Session()
+        return self._http
+
+    def parametros_busca(self, inicio, fim):
+        """
+        Retorna os parâmetros da consulta à série SGS para o período ("YYYY-MM").
+        """
+        return {
+            'formato': 'json',
+            'dataInicial': datetime.strptime(inicio, "%Y-%m").strftime("%d/%m/%Y"),
+            'dataFinal': datetime.strptime(fim, "%Y-%m").strftime("%d/%m/%Y"),
+        }
+
+    def _gravar(self, linhas):
+        """
+        Grava linhas (mês, valor, consultado_em) no SQLite e no espelho em memória.
+        """
+        with self._lock:
+            conexao = self._conectar()
+            conexao.executemany("INSERT OR REPLACE INTO selic (mes, valor, consultado_em) VALUES (?, ?, ?)",
+                                linhas)
+            conexao.commit()
+            for mes, valor, consultado_em in linhas:
+                self._taxas[mes] = valor
+                self._consultado_em[mes] = consultado_em
+
+    def registrar(self, inicio, fim, dados):
+        """
+        Grava a resposta da série SGS para o período de `inicio` a `fim` ("YYYY-MM").
+        Meses do intervalo que não vierem na resposta são gravados como não publicados.
+
+        Args:
+            inicio (str): Mês inicial consultado.
+            fim (str): Mês final consultado.
+            dados (list): Itens da resposta da API, com as chaves "data" (DD/MM/YYYY) e "valor".
+        """
+        recebidas = {}
+        for item in dados:
+            mes = datetime.strptime(item['data'], "%d/%m/%Y").strftime("%Y-%m")
+            recebidas[mes] = float(item['valor'])
+
+        agora = time.time()
+        linhas = [
+            (mes, recebidas.get(mes), agora)
+            for mes in map(indice_para_mes, range(mes_para_indice(inicio), mes_para_indice(fim) + 1))
+        ]
+        self._gravar(linhas)
+        self._falha_em = None  # A API voltou a responder
+
+    def importar(self, taxas):
+        """
+        Grava taxas obtidas fora da API (por exemplo, de um arquivo local; ver `ler_arquivo_selic`).
+
+        Args:
+            taxas (dict): Dicionário com chave no formato "YYYY-MM" e valor da taxa SELIC.
+
+        Returns:
+            int: Quantidade de meses gravados.
+        """
+        agora = time.time()
+        linhas = [(mes, float(valor), agora) for mes, valor in taxas.items()]
+        self._gravar(linhas)
+        return len(linhas)
+
+    def registrar_falha(self):
+        """
+        Registra uma falha de busca na API, suspendendo novas buscas pelo tempo de `backoff`.
+        """
+        self._falha_em = time.time()
+
+    def pode_buscar(self):
+        """
+        Indica se a API pode ser consultada agora: o armazenamento não está offline nem aguardando
+        o fim do intervalo após uma falha.
+        """
+        if self.offline:
+            return False
+        return self._falha_em is None or time.time() - self._falha_em >= self.backoff
+
+    def _buscar(self, inicio, fim):
+        """
+        Busca na API do Banco Central as taxas de `inicio` a `fim` ("YYYY-MM") e grava o resultado.
+        """
+        antes = time.perf_counter()
+        try:
+            resposta = self._sessao().get(SGS_URL, params=self.parametros_busca(inicio, fim), timeout=self.timeout)
+        finally:
+            observar('selic_api_segundos', time.perf_counter() - antes)
+        if resposta.status_code != 200:
+            raise RuntimeError(f"API do Banco Central respondeu {resposta.status_code}")
+        self.registrar(inicio, fim, resposta.json())
+
+    def dados_locais(self, inicio, fim):
+        """
+        Retorna as taxas do período já presentes no armazenamento, sem consultar a API.
+        """
+        self._carregar()
+        return {mes: self._taxas[mes]
+                for mes in map(indice_para_mes, range(mes_para_indice(inicio), mes_para_indice(fim) + 1))
+                if self._taxas.get(mes) is not None}
+
+    def obter(self, inicio, fim):
+        """
+        Retorna as taxas SELIC do período, buscando na API apenas os meses faltantes ou expirados.
+        Durante o intervalo após uma falha (ver `pode_buscar`), serve os dados locais sem buscar.
+
+        Args:
+            inicio (str): Mês inicial no formato "YYYY-MM".
+            fim (str): Mês final no formato "YYYY-MM".
+
+        Returns:
+            dict: Dicionário com chave no formato "YYYY-MM" e valor da taxa SELIC.
+        """
+        faltantes = self.meses_faltantes(inicio, fim)
+        incrementar('selic_consultas_total', resultado='falta' if faltantes else 'acerto')
+        if faltantes and self.pode_buscar():
+            # Apenas uma busca por vez: requisições concorrentes aguardam e reaproveitam o resultado
+            # (ou, se a busca falhou, servem os dados locais sem repeti-la)
+            with self._lock_busca:
+                faltantes = self.meses_faltantes(inicio, fim)
+                if faltantes and self.pode_buscar():
+                    try:
+                        self._buscar(faltantes[0], faltantes[-1])
+                    except Exception as e:
+                        self.registrar_falha()
+                        incrementar('selic_api_falhas_total')
+                        logger.warning("Falha ao buscar a SELIC (%s a %s), usando dados locais: %s",
+                                       faltantes[0], faltantes[-1], e)
+
+        return self.dados_locais(inicio, fim)
+
+
+def ler_arquivo_selic(caminho):
+    """
+    Lê taxas SELIC de um arquivo local, para uso sem acesso à API do Banco Central.
+
+    Formatos aceitos:
+        - JSON no formato da própria série SGS: [{"data": "01/01/2023", "valor": "1.12"}, ...]
+          ou um objeto {"2023-01": 1.12, ...}.
+        - CSV com as colunas "mes" (YYYY-MM) e "valor".
+
+    Returns:
+        dict: Dicionário com chave no formato "YYYY-MM" e valor da taxa SELIC.
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        if caminho.endswith('.csv'):
+            return {linha['mes']: float(linha['valor']) for linha in csv.DictReader(arquivo)}
+        dados = json.load(arquivo)
+    if isinstance(dados, dict):
+        return {mes: float(valor) for mes, valor in dados.items()}
+    return {datetime.strptime(item['data'], "%d/%m/%Y").strftime("%Y-%m"): float(item['valor']) for item in dados}
+
+
+_store_padrao = None
+
+
+def get_selic_store():
+    """
+    Retorna o armazenamento SELIC compartilhado pelo processo, criando-o na primeira chamada.
+    """
+    global _store_padrao
+    if _store_padrao is None:
+        _store_padrao = SelicStore()
+    return _store_padrao
+
+
+def set_selic_store(store):
+    """
+    Substitui o armazenamento SELIC compartilhado (por exemplo, por um com HTTP falso ou offline).
+    """
+    global _store_padrao
+    _store_padrao = store
@@ -0,0 +1,92 @@
+"""
+Consulta assíncrona das taxas SELIC, para o modo de serviço ASGI (ver `asgi.py`).
+
+Usa um cliente HTTP assíncrono (`httpx.AsyncClient`) com pool de conexões e timeout explícito, e
+grava as respostas no mesmo armazenamento local usado pelo modo síncrono (`utils.selic`). Requisições
+concorrentes que precisam do mesmo intervalo de meses compartilham uma única busca em andamento.
+
+Requer o pacote opcional `httpx` (`pip install httpx`).
+"""
+
+import asyncio
+import time
+
+from utils import selic
+from utils.metricas import incrementar, observar
+from utils.selic import get_selic_store, logger
+
+MAX_CONEXOES = 10
+
+
+class SelicAsync:
+    """
+    Cliente assíncrono da série SGS 4189 sobre um `SelicStore`.
+
+    Args:
+        store (SelicStore, opcional): Armazenamento das taxas. Por padrão, o compartilhado do processo.
+        cliente (httpx.AsyncClient, opcional): Cliente HTTP. Por padrão, um cliente com pool de
+                                               `MAX_CONEXOES` conexões e o timeout do armazenamento.
+    """
+
+    def __init__(self, store=None, cliente=None):
+        self.store = store if store is not None else get_selic_store()
+        self._cliente = cliente
+        self._em_andamento = {}  # (inicio, fim) -> Task da busca em andamento
+
+    def _cliente_http(self):
+        if self._cliente is None:
+            import httpx
+            self._cliente = httpx.AsyncClient(
+                timeout=self.store.timeout,
+                limits=httpx.Limits(max_connections=MAX_CONEXOES, max_keepalive_connections=MAX_CONEXOES)
+            )
+        return self._cliente
+
+    async def _buscar(self, inicio, fim):
+        antes = time.perf_counter()
+        try:
+            resposta = await self._cliente_http().get(selic.SGS_URL, params=self.store.parametros_busca(inicio, fim))
+        finally:
+            observar('selic_api_segundos', time.perf_counter() - antes)
+        if resposta.status_code != 200:
+            raise RuntimeError(f"API do Banco Central respondeu {resposta.status_code}")
+        self.store.registrar(inicio, fim, resposta.json())
+
+    def _encerrar_busca(self, chave):
+        self._em_andamento.pop(chave, None)
+
+    async def obter(self, inicio, fim):
+        """
+        Retorna as taxas SELIC do período ("YYYY-MM"), buscando de forma não bloqueante apenas os
+        meses faltantes ou expirados. Em caso de falha, serve os dados locais e registra a falha no
+        armazenamento, suspendendo novas buscas (síncronas ou assíncronas) pelo tempo de `backoff`.
+
+        Returns:
+            dict: Dicionário com chave no formato "YYYY-MM" e valor da taxa SELIC.
+        """
+        # A consulta é contada uma única vez, quando a rota obtém as taxas (`SelicStore.obter`)
+        faltantes = self.store.meses_faltantes(inicio, fim)
+        if faltantes and self.store.pode_buscar():
+            chave = (faltantes[0], faltantes[-1])
+            tarefa = self._em_andamento.get(chave)
+            if tarefa is None:
+                tarefa = asyncio.ensure_future(self._buscar(*chave))
+                self._em_andamento[chave] = tarefa
+                tarefa.add_done_callback(lambda _: self._encerrar_busca(chave))
+            try:
+                # shield: o cancelamento de uma requisição não cancela a busca compartilhada
+                await asyncio.shield(tarefa)
+            except Exception as e:
+                # O handler síncrono também encontra a falha registrada e não repete a busca
+                self.store.registrar_falha()
+                incrementar('selic_api_falhas_total')
+                logger.warning("Falha ao buscar a SELIC (%s a %s), usando dados locais: %s", *chave, e)
+        return self.store.dados_locais(inicio, fim)
+
+    async def fechar(self):
+        """
+        Fecha o cliente HTTP e suas conexões.
+        """
+        if self._cliente is not None:
+            await self._cliente.aclose()
+            self._cliente = None
@@ -0,0 +1,50 @@
+"""
+Serialização JSON dos resultados numéricos.
+
+Usa o `orjson` quando instalado (serializa arrays NumPy diretamente, sem conversão para listas
+Python); caso contrário, recorre ao módulo `json` da biblioteca padrão.
+"""
+
+import json
+import math
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def _padrao(valor):
+    """
+    Converte arrays e escalares NumPy (ou outros objetos com `tolist`) em tipos nativos.
+    """
+    if hasattr(valor, 'tolist'):
+        return valor.tolist()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _sem_nan(valor):
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if isinstance(valor, dict):
+        return {chave: _sem_nan(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_sem_nan(item) for item in valor]
+    if hasattr(valor, 'tolist'):
+        return _sem_nan(valor.tolist())
+    return valor
+
+
+def dumps(valor):
+    """
+    Serializa `valor` em JSON (bytes UTF-8). Valores NaN viram `null`.
+
+    Args:
+        valor: Dicionários, listas, números, textos e arrays/escalares NumPy.
+
+    Returns:
+        bytes: Documento JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(valor, option=orjson.OPT_SERIALIZE_NUMPY, default=_padrao)
+    return json.dumps(_sem_nan(valor), ensure_ascii=False).encode('utf-8')
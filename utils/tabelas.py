@@ -1,24 +1,25 @@
 from utils.calculos import (
     calcular_vau, 
-    calcular_percentual_equivalencia, 
-    calcular_fator_social, 
-    calcular_percentual_mao_de_obra, 
-    calcular_percentual_por_categoria, 
-    calcular_percentual_nf,
     calcular_inss_economizado
 )
-from data.dados_percentuais import dados_percentuais
+from utils.selic import get_selic_store, mes_para_indice, indice_para_mes
+from utils.financeiro import calcular_financeiro, centavos_mensais, COLUNAS_VALORES, COLUNAS_TOTAIS
+from utils.dinheiro import formatar_brl, formatar_colunas_brl, formatar_centavos, somar
+from utils.areas import calcular_areas
+from utils.metricas import cronometrado
+import numpy as np
 import pandas as pd
-import requests
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 
 def format_currency(value):
     """
     Formata um valor numérico no padrão de moeda brasileira.
     Exemplo: 1245.50 -> R$ 1.245,50
+
+    Para colunas inteiras, use `utils.dinheiro.formatar_brl` (ou `formatar_colunas_brl`), que
+    formata todos os valores de uma só vez.
     """
-    return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return formatar_brl([value])[0]
 
 def calcular_areas_totais(dados):
     """
@@ -50,6 +51,9 @@ def gerar_tabela_areas_principais(dados):
     """
     Gera uma tabela (DataFrame) contendo os principais dados e cálculos das áreas aferidas,
     utilizando as funções de conversão e os percentuais extraídos dos documentos e sites consultados.
+
+    O cálculo é feito de forma colunar por `utils.areas.calcular_areas`; esta função apenas
+    formata o resultado para exibição.
     
     Args:
         dados (list): Lista de dicionários com os dados de cada área.
@@ -57,87 +61,63 @@ def gerar_tabela_areas_principais(dados):
     Returns:
         DataFrame: Tabela com os resultados dos cálculos.
     """
-    resultados = []
-    total_por_destinacao = calcular_areas_totais(dados)
-    
-    for dest, info in total_por_destinacao.items():
-        area_total_em_afericao = info['total_area']
-        # Calcula o percentual de equivalência de acordo com a área e destinação
-        percentual_equivalencia = calcular_percentual_equivalencia(area_total_em_afericao, dest)
-        # Fator social aplicado conforme a área total
-        fator_social = calcular_fator_social(area_total_em_afericao)
-        # Usa o VAU calculado para o grupo
-        vau = info['VAU']
-
-        for dado in info['items']:
-            tipo_area = dado.get('Tipo area', 'Principal')
-            redutor = 1  # Sem redução para área principal por padrão
-
-            # Se a área for complementar, aplica o redutor conforme a cobertura
-            if tipo_area == 'Complementar':
-                redutor = 0.50 if dado.get('Cobertura', 'Coberta') == 'Coberta' else 0.25
-                area_total_para_calculo = dado['Área Total Aferida para Cálculo'] * redutor
-            else:
-                # Para área principal, aplica o percentual de equivalência
-                area_total_para_calculo = dado['Área Total Aferida para Cálculo'] * (percentual_equivalencia / 100)
+    return formatar_tabela_areas(calcular_areas(dados))
 
-            # Calcula o custo da obra para a destinação, utilizando o VAU
-            custo_da_obra = area_total_para_calculo * vau
+def _formatar_area(valor):
+    return f"{'N/A' if pd.isna(valor) else valor} m²"
 
-            # Percentual de mão de obra de acordo com o tipo de obra (destinação) e material
-            percentual_mao_obra = calcular_percentual_mao_de_obra(dado['destinacao'], dado['Material'])
-            
-            # Para a categoria, define um percentual reduzido para Reforma ou outro tipo, conforme os dados
-            categoria = dado['Categoria']
-            percentual_categoria_remu = 100 if categoria in ['Obra Nova', 'Acréscimo'] else 35 if categoria == 'Reforma' else 0
-            
-            # Percentual relacionado ao uso de pré-moldados ou pré-fabricados
-            percentual_nf = calcular_percentual_nf(dado)
-            # Percentual de cálculo conforme a categoria (pode ser diferente do utilizado para crédito)
-            percentual_categoria = calcular_percentual_por_categoria(categoria)
-            
-            # Cálculo da Remuneração da Mão de Obra Total (RMT)
-            rmt_valor = custo_da_obra * (percentual_categoria / 100) * (fator_social / 100) \
-                        * (percentual_mao_obra / 100) * (percentual_nf / 100)
-            
-            # Percentual de uso por UF conforme tabela de dados
-            percentual_uso_uf = dados_percentuais.get(dado['UF'], {}).get(dado['destinacao'], 0)
-            # Percentual de ajuste para Concreto Usinado (se aplicável)
-            percentual_ajuste = 5 if dado.get('Concreto usinado', 'Não') == 'Sim' else 0
-
-            # Crédito de remuneração adicional
-            credito_remuneracao = custo_da_obra * (percentual_uso_uf / 100) \
-                                  * (percentual_categoria_remu / 100) * (percentual_ajuste / 100)
-            rmt_valor += credito_remuneracao
+@cronometrado('formatar_areas')
+def formatar_tabela_areas(areas):
+    """
+    Monta a tabela de áreas formatada para exibição a partir do resultado numérico
+    de `utils.areas.calcular_areas`.
+    
+    Args:
+        areas (dict | DataFrame): Colunas da tabela de áreas com valores numéricos.
+    
+    Returns:
+        DataFrame: Tabela com os valores formatados (percentuais, áreas e moeda).
+    """
+    if len(areas) == 0:
+        return pd.DataFrame()
+    areas = pd.DataFrame(areas)
 
-            resultados.append({
-                'Identificação da Área': dado['Identificação'],
-                'Categoria': categoria,
-                'Material': dado['Material'],
-                'Tipo de Área': tipo_area,
-                'Redução de Área (%)': f"{redutor * 100}%" if tipo_area == 'Complementar' else "N/A",
-                'Área Total': f"{dado.get('Área Total', 'N/A')} m²",
-                'Área Total Aferida': f"{dado.get('Área Total Aferida', 'N/A')} m²",
-                'Área Total Aferida para Cálculo': f"{dado['Área Total Aferida para Cálculo']} m²",
-                'Área em Aferição': f"{dado.get('Área em Aferição', 'N/A')} m²",
-                'Área Total em Aferição': f"{area_total_em_afericao} m²",
-                'Percentual de Equivalência': f"{percentual_equivalencia}%" if tipo_area == 'Principal' else "N/A",
-                'Área Total para Cálculo': f"{area_total_para_calculo:.2f} m²",
-                'VAU': vau,
-                'Custo da Obra por Destinação': format_currency(custo_da_obra),
-                'Percentual de Mão de Obra': f"{percentual_mao_obra}%",
-                'Percentual de Calculo por Categoria de obra': f"{percentual_categoria}%",
-                'Percentual de NF': f"{percentual_nf}%",
-                'Fator Social (%)': f"{fator_social}%",
-                'Percentual de uso por UF': f"{percentual_uso_uf:.2f}%",
-                'Percentual de aplicação do abatimento por categoria': f"{percentual_categoria_remu}%",
-                'Percentual de ajuste': f"{percentual_ajuste}%",
-                'Crédito de remuneração': format_currency(credito_remuneracao),
-                'RMT': rmt_valor
-            })
+    principal = areas['Tipo de Área'] == 'Principal'
+    complementar = areas['Tipo de Área'] == 'Complementar'
+    custo, credito = formatar_colunas_brl(areas['Custo da Obra por Destinação'], areas['Crédito de remuneração'])
 
-    return pd.DataFrame(resultados)
+    return pd.DataFrame({
+        'Identificação da Área': areas['Identificação da Área'],
+        'Categoria': areas['Categoria'],
+        'Material': areas['Material'],
+        'Tipo de Área': areas['Tipo de Área'],
+        'Redução de Área (%)': [f"{reducao}%" if comp else "N/A"
+                                for reducao, comp in zip(areas['Redução de Área (%)'], complementar)],
+        'Área Total': areas['Área Total'].map(_formatar_area),
+        'Área Total Aferida': areas['Área Total Aferida'].map(_formatar_area),
+        'Área Total Aferida para Cálculo': areas['Área Total Aferida para Cálculo'].map(_formatar_area),
+        'Área em Aferição': areas['Área em Aferição'].map(_formatar_area),
+        'Área Total em Aferição': areas['Área Total em Aferição'].map(_formatar_area),
+        'Percentual de Equivalência': [f"{equivalencia}%" if princ else "N/A"
+                                       for equivalencia, princ in zip(areas['Percentual de Equivalência'].tolist(),
+                                                                      principal)],
+        'Área Total para Cálculo': [f"{area:.2f} m²" for area in areas['Área Total para Cálculo']],
+        'VAU': areas['VAU'],
+        'Custo da Obra por Destinação': custo,
+        'Percentual de Mão de Obra': [f"{p}%" for p in areas['Percentual de Mão de Obra'].tolist()],
+        'Percentual de Calculo por Categoria de obra': [
+            f"{p}%" for p in areas['Percentual de Calculo por Categoria de obra'].tolist()],
+        'Percentual de NF': [f"{p}%" for p in areas['Percentual de NF'].tolist()],
+        'Fator Social (%)': [f"{p}%" for p in areas['Fator Social (%)'].tolist()],
+        'Percentual de uso por UF': [f"{p:.2f}%" for p in areas['Percentual de uso por UF']],
+        'Percentual de aplicação do abatimento por categoria': [
+            f"{p}%" for p in areas['Percentual de aplicação do abatimento por categoria'].tolist()],
+        'Percentual de ajuste': [f"{p}%" for p in areas['Percentual de ajuste'].tolist()],
+        'Crédito de remuneração': credito,
+        'RMT': areas['RMT']
+    })
 
+@cronometrado('formatar_afericao')
 def gerar_tabela_aferecao_indireta(rmt_total, fator_de_ajuste, meses_execucao):
     """
     Gera uma tabela (DataFrame) com a aferição indireta, calculando o RMT ajustado e a remuneração mensal mínima.
@@ -152,6 +132,7 @@ def gerar_tabela_aferecao_indireta(rmt_total, fator_de_ajuste, meses_execucao):
     """
     rmt_ajustado = rmt_total * fator_de_ajuste
     remuneracao_mensal = rmt_ajustado / meses_execucao if meses_execucao > 0 else 0
+    rmt_total_brl, rmt_ajustado_brl, remuneracao_mensal_brl = formatar_brl([rmt_total, rmt_ajustado, remuneracao_mensal])
 
     data = {
         'Aferição indireta': [
@@ -161,18 +142,22 @@ def gerar_tabela_aferecao_indireta(rmt_total, fator_de_ajuste, meses_execucao):
             'REMUNERAÇÃO MENSAL (mínima)'
         ],
         'Valor': [
-            format_currency(rmt_total), 
+            rmt_total_brl, 
             f"{fator_de_ajuste * 100:.0f}%", 
-            format_currency(rmt_ajustado), 
-            format_currency(remuneracao_mensal)
+            rmt_ajustado_brl, 
+            remuneracao_mensal_brl
         ]
     }
 
     return pd.DataFrame(data)
 
+@cronometrado('selic')
 def fetch_selic_annualized(start_date, end_date):
     """
-    Busca os dados da taxa SELIC (anualizada) no período informado, utilizando a API do Banco Central.
+    Busca os dados da taxa SELIC (anualizada) no período informado.
+
+    As taxas são servidas pelo armazenamento local (ver `utils.selic`), que consulta a API do
+    Banco Central apenas para os meses ainda não armazenados ou expirados.
     
     Args:
         start_date (str): Data inicial no formato DD/MM/YYYY.
@@ -181,21 +166,11 @@ def fetch_selic_annualized(start_date, end_date):
     Returns:
         dict: Dicionário com chave no formato "YYYY-mm" e valor da taxa SELIC.
     """
-    url = f"https://api.bcb.gov.br/dados/serie/bcdata.sgs.4189/dados?formato=json&dataInicial={start_date}&dataFinal={end_date}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        print("Failed to fetch data")
-        return {}
-    
-    data = response.json()
-    selic_data = {}
-    for item in data:
-        date_key = datetime.strptime(item['data'], "%d/%m/%Y").strftime("%Y-%m")
-        selic_data[date_key] = float(item['valor'])
-
-    return selic_data
+    inicio = datetime.strptime(start_date, "%d/%m/%Y").strftime("%Y-%m")
+    fim = datetime.strptime(end_date, "%d/%m/%Y").strftime("%Y-%m")
+    return get_selic_store().obter(inicio, fim)
 
-def generate_financial_table(start_date, end_date, remuneration):
+def generate_financial_table(start_date, end_date, remuneration, selic_rates=None):
     """
     Gera uma tabela financeira com base na remuneração, aplicando os ajustes da SELIC e outros encargos.
     
@@ -206,70 +181,77 @@ def generate_financial_table(start_date, end_date, remuneration):
         - Juros de Mora (calculado com taxa diária para 30 dias de atraso)
         - MAED Mínima (acréscimo percentual, que aumenta 2 pontos percentuais por mês, limitado a 20%)
         - Total (soma dos encargos)
+
+    Os valores são calculados de uma só vez pelo motor numérico (`utils.financeiro`) e formatados
+    apenas ao montar a tabela.
     
     Args:
         start_date (str): Data inicial no formato "YYYY-MM".
         end_date (str): Data final no formato "YYYY-MM".
         remuneration (float): Valor da remuneração base.
+        selic_rates (dict, opcional): Taxas SELIC já obtidas (por exemplo, uma vez para um lote inteiro).
     
     Returns:
         DataFrame: Tabela financeira com os resultados.
     """
-    # Ajusta a data de início para buscar um mês antes
-    start = datetime.strptime(start_date, "%Y-%m") - relativedelta(months=1)
-    end_dt = datetime.strptime(end_date, "%Y-%m")
-    selic_rates = fetch_selic_annualized(start.strftime("%d/%m/%Y"), end_dt.strftime("%d/%m/%Y"))
-    
-    # Ajusta o mapeamento das taxas SELIC para o mês seguinte
-    adjusted_selic_rates = {}
-    previous_rate = 0
-    for month in sorted(selic_rates.keys()):
-        adjusted_selic_rates[month] = previous_rate
-        previous_rate = selic_rates[month]
-    
-    results = []
-    totals = {'Remuneração': 0, 'Atualizado': 0, 'Total': 0}
-    current_date = datetime.strptime(start_date, "%Y-%m")  # Inicia na data original
-    cont_maed = 0
-    while current_date <= end_dt:
-        if cont_maed < 20:
-            cont_maed += 2
-        month_key = current_date.strftime("%Y-%m")
-        selic_rate = adjusted_selic_rates.get(month_key, 0)
-        valor_atualizado = remuneration * (1 + selic_rate / 100)
-        cpp = valor_atualizado * 0.20
-        multa = cpp * 0.20
+    if selic_rates is None:
+        # Busca a partir de um mês antes do início, pois cada taxa é aplicada ao mês seguinte
+        start = datetime.strptime(indice_para_mes(mes_para_indice(start_date) - 1), "%Y-%m")
+        end_dt = datetime.strptime(end_date, "%Y-%m")
+        selic_rates = fetch_selic_annualized(start.strftime("%d/%m/%Y"), end_dt.strftime("%d/%m/%Y"))
 
-        # Juros de mora: taxa diária de 0,0333% para 30 dias de atraso
-        juros_mora = (0.0333 / 100) * valor_atualizado * 30
+    financeiro = calcular_financeiro(start_date, end_date, remuneration, selic_rates)
+    return formatar_tabela_financeira(financeiro)
 
-        maed_minima = valor_atualizado * (cont_maed / 100)
-        
-        total = cpp + multa + juros_mora + maed_minima
+@cronometrado('formatar_financeira')
+def formatar_tabela_financeira(financeiro):
+    """
+    Monta a tabela financeira (DataFrame) formatada a partir do resultado numérico
+    de `utils.financeiro.calcular_financeiro`.
 
-        results.append({
-            "Mês/Ano": month_key,
-            "Remuneração": format_currency(remuneration),
-            "ICM": f"{selic_rate:.2f}%",
-            "Valor Atualizado": format_currency(valor_atualizado),
-            "CPP - 20%": format_currency(cpp),
-            "Multa - 20%": format_currency(multa),
-            "Juros de MORA": format_currency(juros_mora),
-            "MAED Mínima": format_currency(maed_minima),
-            "Total": format_currency(total)
-        })
+    Os valores exibidos são os centavos de `utils.financeiro.centavos_mensais`, e a linha de totais
+    soma esses centavos (ver `utils.dinheiro`).
+    
+    Args:
+        financeiro (dict): Meses e arrays de valores calculados.
+    
+    Returns:
+        DataFrame: Tabela financeira com uma linha por mês e a linha de totais.
+    """
+    centavos = centavos_mensais(financeiro)
+    totais = np.array([somar(centavos[COLUNAS_VALORES.index(coluna)]) for coluna in COLUNAS_TOTAIS], dtype=np.int64)
 
-        totals['Remuneração'] += remuneration
-        totals['Atualizado'] += valor_atualizado
-        current_date += relativedelta(months=1)
+    # Todos os valores monetários (meses e totais) formatados de uma só vez; o sinal dos meses vem
+    # do valor calculado, para preservar "R$ -0,00"
+    negativos = np.signbit(np.stack([financeiro[coluna] for coluna in COLUNAS_VALORES]))
+    textos = formatar_centavos(np.concatenate((centavos.ravel(), totais)),
+                               np.concatenate((negativos.ravel(), totais < 0)))
+    n_meses = centavos.shape[1]
+    mensais = [textos[i * n_meses:(i + 1) * n_meses] for i in range(len(COLUNAS_VALORES))]
+    totais = textos[len(COLUNAS_VALORES) * n_meses:]
+
+    results = [
+        {
+            "Mês/Ano": mes,
+            "Remuneração": remuneracao,
+            "ICM": f"{icm:.2f}%",
+            "Valor Atualizado": valor_atualizado,
+            "CPP - 20%": cpp,
+            "Multa - 20%": multa,
+            "Juros de MORA": juros_mora,
+            "MAED Mínima": maed_minima,
+            "Total": total
+        }
+        for mes, icm, remuneracao, valor_atualizado, cpp, multa, juros_mora, maed_minima, total in zip(
+            financeiro['meses'], financeiro['icm'].tolist(), *mensais)
+    ]
 
     # Linha de totais
     results.append({
         "Mês/Ano": "Total",
-        "Remuneração": format_currency(totals['Remuneração']),
-        "Valor Atualizado": format_currency(totals['Atualizado']),
-        "Total": format_currency(sum([float(result['Total'].replace("R$ ", "").replace(".", "").replace(",", "."))
-                                       for result in results if result["Mês/Ano"] != "Total"]))
+        "Remuneração": totais[0],
+        "Valor Atualizado": totais[1],
+        "Total": totais[2]
     })
 
     return pd.DataFrame(results)
@@ -294,6 +276,29 @@ def gerar_tabela_inss_detalhado(rmt, reducao_percentual, honorarios_percentual=3
     honorarios = economia_gerada * (honorarios_percentual / 100.0)
     economia_real = economia_gerada - honorarios
 
+    return formatar_tabela_inss({
+        'inss_devido': inss_devido,
+        'inss_a_pagar': inss_a_pagar,
+        'economia_gerada': economia_gerada,
+        'honorarios_percentual': honorarios_percentual,
+        'honorarios': honorarios,
+        'economia_real': economia_real
+    })
+
+@cronometrado('formatar_inss')
+def formatar_tabela_inss(inss):
+    """
+    Monta a tabela de INSS detalhado formatada a partir dos valores numéricos.
+    
+    Args:
+        inss (dict): Valores com as chaves "inss_devido", "inss_a_pagar", "economia_gerada",
+                     "honorarios_percentual", "honorarios" e "economia_real".
+    
+    Returns:
+        DataFrame: Tabela com as colunas "Campo" e "Valor".
+    """
+    inss_devido, inss_a_pagar, economia_gerada, honorarios, economia_real = formatar_brl([
+        inss['inss_devido'], inss['inss_a_pagar'], inss['economia_gerada'], inss['honorarios'], inss['economia_real']])
     data = {
         "Campo": [
             "INSS Devido",
@@ -304,12 +309,12 @@ def gerar_tabela_inss_detalhado(rmt, reducao_percentual, honorarios_percentual=3
             "ECONOMIA REAL"
         ],
         "Valor": [
-            format_currency(inss_devido),
-            format_currency(inss_a_pagar),
-            format_currency(economia_gerada),
-            f"{honorarios_percentual:.0f}%",
-            format_currency(honorarios),
-            format_currency(economia_real)
+            inss_devido,
+            inss_a_pagar,
+            economia_gerada,
+            f"{inss['honorarios_percentual']:.0f}%",
+            honorarios,
+            economia_real
         ]
     }
     df = pd.DataFrame(data)